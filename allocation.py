@@ -1,11 +1,21 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 from datetime import datetime, timedelta
 import calendar
-import sqlite3
 import holidays
 import io
 from collections import defaultdict
+from schedule_result import ScheduleResult
+from opt_shift_schedule import solve_environment_team_schedule
+from solver_cache import cached_solve
+from calendar_cache import WEEKDAY_HEADER, cached_fragment, month_days, render_weeks
+from vacation_store import get_vacation_store
+from schedule_export import schedule_workbook_bytes
+from ical_feed import get_schedule_feeds
+from fairness_ledger import get_fairness_ledger
+from schedule_history import get_schedule_history
+from vacation_grid import client_grid_html, day_labels, grid_payload, vacation_status_grid
 
 # 한국의 공휴일 정보를 가져옵니다.
 kr_holidays = holidays.KR()
@@ -13,51 +23,29 @@ kr_holidays = holidays.KR()
 # 환경팀 멤버
 TEAM_MEMBERS = ["다혜실", "희진", "예지", "수현", "예진", "현옥", "다해"]
 
-# Database 설정
-DB_FILE = "environment_team_schedule.db"
-TABLE_NAME = "vacation_days"
+# Database 설정: 앱과 같은 DB 파일에 팀 이름으로 구분해 저장
+DB_FILE = st.secrets["database"]["file_path"]
+TEAM_NAME = "환경팀"
+# 예전에 이 페이지만 쓰던 파일. 처음 실행할 때 한 번 통합 DB 로 가져옴 (vacation_import)
+LEGACY_DB_FILE = "environment_team_schedule.db"
+LEGACY_TABLE_NAME = "vacation_days"
+# 모든 세션이 함께 쓰는 휴가 데이터
+vacation_store = get_vacation_store(DB_FILE, TEAM_NAME, legacy=(LEGACY_DB_FILE, LEGACY_TABLE_NAME))
 
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(
-        f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            worker TEXT NOT NULL
-        )
-    """
-    )
-    conn.commit()
-    conn.close()
+    # 휴가 테이블 스키마 확인 / 이전 파일 가져오기. 앱의 다른 페이지와 함께 프로세스에서 한 번만
+    vacation_store.ensure_schema()
 
 
 def save_vacation_data(date, worker):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    # 먼저 해당 날짜와 작업자의 조합이 이미 존재하는지 확인
-    c.execute(f"SELECT * FROM {TABLE_NAME} WHERE date = ? AND worker = ?", (date, worker))
-    if c.fetchone() is None:
-        # 존재하지 않는 경우에만 새로운 데이터 삽입
-        c.execute(f"INSERT INTO {TABLE_NAME} (date, worker) VALUES (?, ?)", (date, worker))
-        conn.commit()
-    conn.close()
+    # 이미 있는 조합이면 저장하지 않고 False
+    return vacation_store.add(date, worker)
 
 
 def load_vacation_data():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(f"SELECT date, worker FROM {TABLE_NAME}")
-    result = c.fetchall()
-    conn.close()
-    vacation_days = {}
-    for date, worker in result:
-        if date not in vacation_days:
-            vacation_days[date] = []
-        vacation_days[date].append(worker)
-    return vacation_days
+    # {"YYYY-MM-DD": (근무자, ...)} 읽기 전용 스냅샷
+    return vacation_store.snapshot()
 
 
 def get_kr_holidays(start_date, end_date):
@@ -67,115 +55,87 @@ def get_kr_holidays(start_date, end_date):
     return holiday_list
 
 
-def is_workday(date, selected_holidays=[]):
-    return date.weekday() < 6 and date not in selected_holidays and date not in kr_holidays
-
-
-def solve_environment_team_schedule(start_date, end_date, team_members, vacation_data, selected_holidays):
-    num_days = (end_date - start_date).days + 1
-    dates = [start_date + timedelta(days=i) for i in range(num_days)]
-    workdays = [date for date in dates if is_workday(date, selected_holidays)]
-
-    schedule = {date: {"morning": "", "afternoon": ""} for date in workdays}
-    member_shifts = {member: {"morning": 0, "afternoon": 0} for member in team_members}
-
-    for date in workdays:
-        date_str = date.strftime("%Y-%m-%d")
-        available_members = [m for m in team_members if m not in vacation_data.get(date_str, [])]
-
-        for shift in ["morning", "afternoon"]:
-            if not available_members:
-                continue
-
-            # 할당이 덜 된 순서대로 정렬
-            sorted_members = sorted(
-                available_members,
-                key=lambda m: (member_shifts[m][shift], member_shifts[m]["morning"] + member_shifts[m]["afternoon"]),
-            )
-
-            # 가장 적게 할당된 멤버 선택
-            selected_member = sorted_members[0]
-            schedule[date][shift] = selected_member
-            member_shifts[selected_member][shift] += 1
-
-    total_shifts = sum(sum(shifts.values()) for shifts in member_shifts.values())
-    target_shifts = total_shifts // len(team_members)
-
-    return schedule, member_shifts, {member: target_shifts for member in team_members}
-
-
-def create_calendar_html(year, month, schedule, vacation_data, selected_holidays):
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-
-    html = f"""
+CALENDAR_STYLE = """
     <style>
-        .calendar {{
+        .calendar {
             font-family: Arial, sans-serif;
             border-collapse: collapse;
             width: 100%;
-        }}
-        .calendar th, .calendar td {{
+        }
+        .calendar th, .calendar td {
             border: 1px solid #ddd;
             padding: 8px;
             text-align: center;
-        }}
-        .calendar th {{
+        }
+        .calendar th {
             background-color: #f2f2f2;
-        }}
-        .calendar .date {{
+        }
+        .calendar .date {
             font-weight: bold;
-        }}
-        .calendar .morning {{
+        }
+        .calendar .morning {
             color: #4CAF50;
-        }}
-        .calendar .afternoon {{
+        }
+        .calendar .afternoon {
             color: #2196F3;
-        }}
-        .calendar .vacation {{
+        }
+        .calendar .vacation {
             background-color: #FFCCCB;
-        }}
-        .calendar .holiday {{
+        }
+        .calendar .holiday {
             background-color: #FFD700;
-        }}
-        .calendar .saturday {{
+        }
+        .calendar .saturday {
             background-color: #E6E6FA;
-        }}
+        }
     </style>
-    <table class="calendar">
-        <caption>{month_name} {year}</caption>
-        <tr>
-            <th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th>
-        </tr>
-    """
-
-    for week in cal:
-        html += "<tr>"
-        for day_index, day in enumerate(week):
-            if day == 0:
-                html += "<td></td>"
-            else:
-                date = datetime(year, month, day).date()
-                date_str = date.strftime("%Y-%m-%d")
-                class_name = "vacation" if date_str in vacation_data else ""
-                class_name += " holiday" if date in selected_holidays else ""
-                class_name += " saturday" if day_index == 5 else ""  # 토요일 스타일 추가
-                html += f'<td class="{class_name}">'
-                html += f'<div class="date">{day}</div>'
-                if date in schedule:
-                    morning = schedule[date]["morning"]
-                    afternoon = schedule[date]["afternoon"]
-                    html += f'<div class="morning">아침: {morning}</div>'
-                    html += f'<div class="afternoon">오후: {afternoon}</div>'
-                if date_str in vacation_data:
-                    html += f'<div class="vacation">휴가: {", ".join(vacation_data[date_str])}</div>'
-                if date in selected_holidays:
-                    html += f'<div class="holiday">공휴일</div>'
-                html += "</td>"
-        html += "</tr>"
-
-    html += "</table>"
-    return html
+"""
+
+
+def create_calendar_html(year, month, schedule, vacation_data, selected_holidays):
+    # 그 달의 근무 배정, 휴가, 공휴일만 키에 포함 (바뀐 달만 다시 만듦)
+    days = tuple(
+        (
+            date_str,
+            (schedule[date]["morning"], schedule[date]["afternoon"]) if date in schedule else None,
+            tuple(vacation_data.get(date_str, ())),
+            date in selected_holidays,
+        )
+        for _, date, date_str, _ in month_days(year, month)
+    )
+    return cached_fragment(("shifts", year, month, days), lambda: build_calendar_html(year, month, days))
+
+
+def build_calendar_html(year, month, days):
+    day_data = {date_str: (shifts, vacation, is_holiday) for date_str, shifts, vacation, is_holiday in days}
+
+    def render_day(day, date, date_str, day_index):
+        shifts, vacation, is_holiday = day_data[date_str]
+        class_name = "vacation" if vacation else ""
+        class_name += " holiday" if is_holiday else ""
+        class_name += " saturday" if day_index == 5 else ""  # 토요일 스타일 추가
+        parts = [f'<td class="{class_name}">', f'<div class="date">{day}</div>']
+        if shifts is not None:
+            morning, afternoon = shifts
+            parts.append(f'<div class="morning">아침: {morning}</div>')
+            parts.append(f'<div class="afternoon">오후: {afternoon}</div>')
+        if vacation:
+            parts.append(f'<div class="vacation">휴가: {", ".join(vacation)}</div>')
+        if is_holiday:
+            parts.append(f'<div class="holiday">공휴일</div>')
+        parts.append("</td>")
+        return "".join(parts)
+
+    return "".join(
+        [
+            CALENDAR_STYLE,
+            '    <table class="calendar">\n',
+            f"        <caption>{calendar.month_name[month]} {year}</caption>\n",
+            f"        {WEEKDAY_HEADER}\n",
+            render_weeks(year, month, render_day),
+            "</table>",
+        ]
+    )
 
 
 def parse_csv_vacations(csv_contents):
@@ -191,47 +151,33 @@ def parse_csv_vacations(csv_contents):
 
 
 def save_vacation_data_from_csv(vacations):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    for date, workers in vacations.items():
-        for worker in workers:
-            date_str = date.strftime("%Y-%m-%d")
-            # 먼저 해당 날짜와 작업자의 조합이 이미 존재하는지 확인
-            c.execute(f"SELECT * FROM {TABLE_NAME} WHERE date = ? AND worker = ?", (date_str, worker))
-            if c.fetchone() is None:
-                # 존재하지 않는 경우에만 새로운 데이터 삽입
-                c.execute(f"INSERT INTO {TABLE_NAME} (date, worker) VALUES (?, ?)", (date_str, worker))
-    conn.commit()
-    conn.close()
+    # 날짜 키는 저장소에서 "YYYY-MM-DD" 로 통일됨
+    return vacation_store.add_many((date, worker) for date, workers in vacations.items() for worker in workers)
 
 
 def create_vacation_table(year, month, vacation_data):
     _, last_day = calendar.monthrange(year, month)
-    # dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, last_day + 1)]
-    dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, last_day + 1)]
+    start_date = datetime(year, month, 1).date()
+    end_date = datetime(year, month, last_day).date()
+    return vacation_status_grid(TEAM_MEMBERS, start_date, end_date, vacation_data)
 
-    df = pd.DataFrame(index=TEAM_MEMBERS, columns=dates)
-    df = df.fillna("")
 
-    for date, members in vacation_data.items():
-        if date in df.columns:
-            for member in members:
-                if member in df.index:
-                    df.at[member, date] = "●"
+def delete_vacation_data_by_month(year, month):
+    _, last_day = calendar.monthrange(year, month)
+    return vacation_store.remove_range(f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}")
 
-    return df
 
+def publish_schedule(result):
+    # 근무자별 .ics 구독 주소로 제공 (청소 페이지 사이드바의 "캘린더 구독 주소" 참고)
+    version = get_schedule_feeds().publish(TEAM_NAME, "shifts", result)
+    st.toast(f"환경팀 스케줄을 캘린더로 게시했습니다 (버전 {version}).")
 
-def delete_vacation_data_by_month(year, month):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    start_date = f"{year}-{month:02d}-01"
-    end_date = f"{year}-{month:02d}-31"  # 31일로 설정해도 괜찮습니다. SQLite는 자동으로 처리합니다.
-    c.execute(f"DELETE FROM {TABLE_NAME} WHERE date BETWEEN ? AND ?", (start_date, end_date))
-    deleted_count = c.rowcount
-    conn.commit()
-    conn.close()
-    return deleted_count
+
+def accept_schedule(result, start_date, end_date):
+    # 확정한 스케줄의 횟수를 누적 기록에 반영 (다음 기간 스케줄의 시작값)하고 이력에 남김
+    get_fairness_ledger().accept(TEAM_NAME, result, start_date, end_date)
+    version = get_schedule_history().record(TEAM_NAME, result, start_date, end_date)
+    st.toast(f"근무 횟수를 누적 기록에 반영했습니다 (이력 버전 {version}).")
 
 
 def main():
@@ -245,9 +191,8 @@ def main():
     current_month = today.month
     last_day_of_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-    # 휴가 데이터를 세션 상태로 관리
-    if "vacation_data" not in st.session_state:
-        st.session_state.vacation_data = load_vacation_data()
+    # 휴가 데이터는 세션별 사본 대신 공용 저장소의 읽기 전용 스냅샷 사용
+    vacation_data = load_vacation_data()
 
     st.header("휴가 관리")
     with st.expander("관리"):
@@ -262,7 +207,7 @@ def main():
                 csv_contents = uploaded_file.read()
                 vacations = parse_csv_vacations(csv_contents)
                 save_vacation_data_from_csv(vacations)
-                st.session_state.vacation_data.update(vacations)
+                vacation_data = load_vacation_data()
                 st.success("휴가 데이터가 성공적으로 업로드되었습니다.")
 
         with col2:
@@ -271,11 +216,8 @@ def main():
             vacation_member = st.selectbox("휴가자", TEAM_MEMBERS, key="individual_vacation_member")
             if st.button("휴가 추가"):
                 date_str = vacation_date.strftime("%Y-%m-%d")
-                save_vacation_data(date_str, vacation_member)
-                if date_str not in st.session_state.vacation_data:
-                    st.session_state.vacation_data[date_str] = []
-                if vacation_member not in st.session_state.vacation_data[date_str]:
-                    st.session_state.vacation_data[date_str].append(vacation_member)
+                if save_vacation_data(date_str, vacation_member):
+                    vacation_data = load_vacation_data()
                     st.success("휴가가 추가되었습니다.")
                 else:
                     st.warning("이미 해당 날짜에 같은 사람의 휴가가 등록되어 있습니다.")
@@ -288,8 +230,7 @@ def main():
                 deleted_count = delete_vacation_data_by_month(delete_year, delete_month)
                 if deleted_count > 0:
                     st.success(f"{delete_year}년 {delete_month}월의 휴가 데이터 {deleted_count}개가 삭제되었습니다.")
-                    # 세션 상태의 휴가 데이터도 업데이트
-                    st.session_state.vacation_data = load_vacation_data()
+                    vacation_data = load_vacation_data()
                 else:
                     st.info(f"{delete_year}년 {delete_month}월에 삭제할 휴가 데이터가 없습니다.")
 
@@ -309,20 +250,7 @@ def main():
     vis_end_date = (vis_start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
     # 선택된 월의 휴가 데이터 조회
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(
-        f"SELECT date, worker FROM {TABLE_NAME} WHERE date BETWEEN ? AND ?",
-        (vis_start_date.strftime("%Y-%m-%d"), vis_end_date.strftime("%Y-%m-%d")),
-    )
-    result = c.fetchall()
-    conn.close()
-
-    filtered_vacation_data = {}
-    for date, worker in result:
-        if date not in filtered_vacation_data:
-            filtered_vacation_data[date] = []
-        filtered_vacation_data[date].append(worker)
+    filtered_vacation_data = vacation_store.select(vis_start_date, vis_end_date)
 
     # 휴가 일정 테이블 생성
     vacation_table = create_vacation_table(selected_year, selected_month, filtered_vacation_data)
@@ -347,30 +275,10 @@ def main():
     st.markdown(
         f"<h2 style='text-align: center;'>{selected_year}년 {selected_month}월 휴가 일정</h2>", unsafe_allow_html=True
     )
-    vacation_table.columns = [
-        f"{datetime.strptime(date, '%Y-%m-%d').strftime('%d')}({['월','화','수','목','금','토','일'][datetime.strptime(date, '%Y-%m-%d').weekday()]})"
-        for date in vacation_table.columns
-    ]
-    # CSS 스타일 정의
-    table_style = """
-    <style>
-        .small-table {
-            font-size: 11px;  /* 글자 크기 줄이기 */
-            transform: scale(1.0);  /* 전체 테이블 크기 80%로 축소 */
-            transform-origin: top left;  /* 축소 시 왼쪽 상단 기준 */
-        }
-        .small-table th, .small-table td {
-            padding: 2px 4px;  /* 셀 내부 여백 줄이기 */
-        }
-    </style>
-    """
-
-    # HTML로 테이블 생성
-    html_table = vacation_table.style.applymap(lambda x: "color: red" if x == "●" else "").to_html()
-
-    # CSS 클래스 추가 및 Streamlit에 표시
-    st.markdown(table_style, unsafe_allow_html=True)
-    st.markdown(f'<div class="small-table">{html_table}</div>', unsafe_allow_html=True)
+    vacation_table.columns = day_labels(vacation_table.columns)
+    # 보이는 행/열만 브라우저에서 그리는 표 (상태는 한 글자 코드로 전달)
+    grid_html, grid_height = client_grid_html(grid_payload(vacation_table))
+    components.html(grid_html, height=grid_height)
     # 시작 날짜와 종료 날짜 선택 (이번 달의 현재 날짜부터 마지막 날짜까지)
     _, _, _, _, col1, col2 = st.columns(6)
 
@@ -393,23 +301,42 @@ def main():
 
     # 스케줄 최적화
     if st.button("스케줄 최적화", key="optimize_schedule"):
-        schedule, member_shifts, target_shifts = solve_environment_team_schedule(
-            start_date, end_date, TEAM_MEMBERS, st.session_state.vacation_data, selected_holidays
+        # 이전 기간까지 확정된 근무 횟수에서 시작 (기록이 없으면 0)
+        offsets = get_fairness_ledger().offsets(TEAM_NAME, "shifts", TEAM_MEMBERS, start_date)
+        # 같은 입력이면 캐시된 결과를 사용
+        schedule, member_shifts, target_shifts = cached_solve(
+            "shifts_page",
+            lambda: solve_environment_team_schedule(
+                start_date, end_date, TEAM_MEMBERS, vacation_data, selected_holidays, offsets=offsets
+            ),
+            TEAM_MEMBERS,
+            start_date,
+            end_date,
+            selected_holidays,
+            vacation_data,
+            {"offsets": offsets} if offsets else None,
         )
         if schedule:
             st.success("스케줄이 생성되었습니다!")
 
-            # 결과를 DataFrame으로 변환
-            results = []
-            for day, shifts in schedule.items():
-                results.append({"날짜": day, "아침": shifts["morning"], "오후": shifts["afternoon"]})
-            df = pd.DataFrame(results)
+            # 결과를 배열 기반 스케줄 결과로 변환
+            result = ScheduleResult.from_shifts(schedule, TEAM_MEMBERS)
+            df = result.to_frame()
 
             # 결과 표시
             col1, col2 = st.columns([7, 3])
             with col2:
                 st.subheader("생성된 스케줄")
                 st.dataframe(df, height=500)
+                st.download_button(
+                    label="📥 엑셀 파일 다운로드",
+                    data=schedule_workbook_bytes([(TEAM_NAME, {"shifts": result})]),
+                    file_name=f"환경팀근무표_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+                # 버튼을 누르면 다시 실행되면서 "스케줄 최적화" 블록을 건너뛰므로 콜백으로 게시
+                st.button("캘린더 게시", on_click=publish_schedule, args=(result,))
+                st.button("스케줄 확정 (누적 횟수 반영)", on_click=accept_schedule, args=(result, start_date, end_date))
             with col1:
                 # 달력 형식으로 표시
                 st.subheader("달력 형식의 스케줄")
@@ -420,7 +347,7 @@ def main():
                         current_month.year,
                         current_month.month,
                         schedule,
-                        st.session_state.vacation_data,
+                        vacation_data,
                         selected_holidays,
                     )
                     st.markdown(calendar_html, unsafe_allow_html=True)
@@ -1,61 +1,53 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 from datetime import datetime, timedelta
 import calendar
-import sqlite3
 import holidays
 import io
 from collections import defaultdict
+from schedule_result import ScheduleResult
+from opt_job_schedule import TASK_TYPES, ALLOCATION_RULES, is_workday, solve_environment_team_schedule
+from opt_job_schedule import ALLOCATION_RULES_FILE
+from allocation_rules import load_allocation_rules
+from solver_cache import cached_solve
+from calendar_cache import WEEKDAY_HEADER, cached_fragment, month_days, render_weeks
+from vacation_store import get_vacation_store
+from schedule_export import schedule_workbook_bytes
+from ical_feed import get_schedule_feeds
+from fairness_ledger import get_fairness_ledger
+from schedule_history import get_schedule_history
+from vacation_grid import client_grid_html, day_labels, grid_payload, vacation_status_grid
+from work_stats import member_work_stats
 
 # 한국의 공휴일 정보를 가져옵니다.
 kr_holidays = holidays.KR()
 
 TEAM_MEMBERS = ["다솔", "다혜", "민지", "한울"]
 
-DB_FILE = "allocation_data.db"
-TABLE_NAME = "allocation_days"
+# Database 설정: 앱과 같은 DB 파일에 팀 이름으로 구분해 저장
+DB_FILE = st.secrets["database"]["file_path"]
+TEAM_NAME = "팀장"
+# 예전에 이 페이지만 쓰던 파일. 처음 실행할 때 한 번 통합 DB 로 가져옴 (vacation_import)
+LEGACY_DB_FILE = "allocation_data.db"
+LEGACY_TABLE_NAME = "allocation_days"
+# 모든 세션이 함께 쓰는 휴가 데이터
+vacation_store = get_vacation_store(DB_FILE, TEAM_NAME, legacy=(LEGACY_DB_FILE, LEGACY_TABLE_NAME))
 
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(
-        f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            worker TEXT NOT NULL
-        )
-    """
-    )
-    conn.commit()
-    conn.close()
+    # 휴가 테이블 스키마 확인 / 이전 파일 가져오기. 앱의 다른 페이지와 함께 프로세스에서 한 번만
+    vacation_store.ensure_schema()
 
 
 def save_vacation_data(date, worker):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    # 먼저 해당 날짜와 작업자의 조합이 이미 존재하는지 확인
-    c.execute(f"SELECT * FROM {TABLE_NAME} WHERE date = ? AND worker = ?", (date, worker))
-    if c.fetchone() is None:
-        # 존재하지 않는 경우에만 새로운 데이터 삽입
-        c.execute(f"INSERT INTO {TABLE_NAME} (date, worker) VALUES (?, ?)", (date, worker))
-        conn.commit()
-    conn.close()
+    # 이미 있는 조합이면 저장하지 않고 False
+    return vacation_store.add(date, worker)
 
 
 def load_vacation_data():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(f"SELECT date, worker FROM {TABLE_NAME}")
-    result = c.fetchall()
-    conn.close()
-    vacation_days = {}
-    for date, worker in result:
-        if date not in vacation_days:
-            vacation_days[date] = []
-        vacation_days[date].append(worker)
-    return vacation_days
+    # {"YYYY-MM-DD": (근무자, ...)} 읽기 전용 스냅샷
+    return vacation_store.snapshot()
 
 
 def get_kr_holidays(start_date, end_date):
@@ -65,109 +57,6 @@ def get_kr_holidays(start_date, end_date):
     return holiday_list
 
 
-def is_workday(date, selected_holidays=[]):
-    # 월요일(0)부터 토요일(5)까지를 근무일로 설정
-    # 선택된 휴일만 제외하고, 다른 공휴일은 근무일로 처리
-    return date.weekday() < 6 and date not in selected_holidays
-
-
-TASK_TYPES = {"카톡": "chat", "해피콜/리뷰": "happy_call", "마감/어플": "closing"}
-
-# 인원별 업무 할당 규칙
-ALLOCATION_RULES = {
-    3: {"chat": 1, "happy_call": 1, "closing": 1},
-    4: {"chat": 2, "happy_call": 1, "closing": 1},
-    5: {"chat": 2, "happy_call": 2, "closing": 1},
-}
-
-
-def solve_environment_team_schedule(start_date, end_date, team_members, vacation_data, selected_holidays):
-    num_days = (end_date - start_date).days + 1
-    dates = [start_date + timedelta(days=i) for i in range(num_days)]
-    workdays = [date for date in dates if is_workday(date, selected_holidays)]
-
-    # 각 멤버별 근무 가능일 계산
-    available_days = {member: 0 for member in team_members}
-    for date in workdays:
-        date_str = date.strftime("%Y-%m-%d")
-        for member in team_members:
-            if member not in vacation_data.get(date_str, []):
-                available_days[member] += 1
-
-    schedule = {date: {"tasks": {}} for date in workdays}
-    member_task_counts = {member: {task: 0 for task in TASK_TYPES.values()} for member in team_members}
-
-    # 각 멤버별 목표 업무량 계산
-    total_available_days = sum(available_days.values())
-    target_ratios = {member: days / total_available_days for member, days in available_days.items()}
-
-    for date in workdays:
-        date_str = date.strftime("%Y-%m-%d")
-        available_members = [m for m in team_members if m not in vacation_data.get(date_str, [])]
-        num_available = len(available_members)
-
-        if num_available < 3:
-            continue
-
-        rule = ALLOCATION_RULES.get(min(num_available, 4))
-        daily_assignments = {task: [] for task in TASK_TYPES.values()}
-
-        # 업무 타입별 할당 우선순위 계산
-        task_priorities = {}
-        for task_type in TASK_TYPES.values():
-            for member in available_members:
-                if member not in task_priorities:
-                    task_priorities[member] = {}
-
-                # 업무 타입별 할당 비율
-                task_ratio = (
-                    member_task_counts[member][task_type] / available_days[member]
-                    if available_days[member] > 0
-                    else float("inf")
-                )
-                # 전체 업무 할당 비율
-                total_ratio = (
-                    sum(member_task_counts[member].values()) / available_days[member]
-                    if available_days[member] > 0
-                    else float("inf")
-                )
-
-                # 우선순위 점수 계산 (낮을수록 높은 우선순위)
-                task_priorities[member][task_type] = (
-                    task_ratio,  # 해당 업무 할당 비율
-                    total_ratio,  # 전체 업무 할당 비율
-                    member_task_counts[member][task_type],  # 해당 업무 수행 횟수
-                )
-
-        # 각 업무 타입별로 할당
-        remaining_members = available_members.copy()
-        for task_type, count in rule.items():
-            for _ in range(count):
-                if not remaining_members:
-                    break
-
-                # 현재 업무에 가장 적합한 멤버 선택
-                selected_member = min(
-                    remaining_members,
-                    key=lambda m: (
-                        task_priorities[m][task_type][0],  # 해당 업무 할당 비율
-                        task_priorities[m][task_type][1],  # 전체 업무 할당 비율
-                        task_priorities[m][task_type][2],  # 해당 업무 수행 횟수
-                        sum(
-                            1 for t in TASK_TYPES.values() if member_task_counts[m][t] == 0
-                        ),  # 아직 수행하지 않은 업무 수
-                    ),
-                )
-
-                remaining_members.remove(selected_member)
-                daily_assignments[task_type].append(selected_member)
-                member_task_counts[selected_member][task_type] += 1
-
-        schedule[date]["tasks"] = daily_assignments
-
-    return schedule, member_task_counts
-
-
 def parse_csv_vacations(csv_contents):
     try:
         # UTF-8로 시도
@@ -196,221 +85,172 @@ def parse_csv_vacations(csv_contents):
 
 
 def save_vacation_data_from_csv(vacations):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    for date_str, workers in vacations.items():
-        for worker in workers:
-            # 먼저 해당 날짜와 작업자의 조합이 이미 존재하는지 확인
-            c.execute(f"SELECT * FROM {TABLE_NAME} WHERE date = ? AND worker = ?", (date_str, worker))
-            if c.fetchone() is None:
-                # 존재하지 않는 경우에만 새로운 데이터 삽입
-                c.execute(f"INSERT INTO {TABLE_NAME} (date, worker) VALUES (?, ?)", (date_str, worker))
-    conn.commit()
-    conn.close()
+    return vacation_store.add_many((date, worker) for date, workers in vacations.items() for worker in workers)
 
 
 def calculate_work_stats(start_date, end_date, team_members, vacation_data, selected_holidays):
-    # 날짜 범위 내의 모든 날짜 생성
-    date_range = pd.date_range(start_date, end_date)
-
-    # 근무일 계산 (월~토, 선택된 휴일만 제외)
-    workdays = []
-    for date in date_range:
-        # 일요일이 아니고, 선택된 휴일이 아닌 날만 포함
-        if date.weekday() < 6 and date.date() not in selected_holidays:
-            workdays.append(date)
-    print(workdays)
-    # 각 멤버별 근무 가능일 계산
+    # 근무일 (월~토, 선택된 휴일만 제외) 중 휴가가 아닌 날 수와 업무별 목표 할당량 (근무일을 3으로 나누어 분배)
+    stats = member_work_stats(start_date, end_date, team_members, vacation_data, selected_holidays)
     work_stats = {}
-    for member in team_members:
-        working_days = []
-        for date in workdays:
-            date_str = date.strftime("%Y-%m-%d")
-            # 해당 날짜에 휴가가 없는 경우만 근무일로 카운트
-            if member not in vacation_data.get(date_str, []):
-                working_days.append(date)
-
-        total_days = len(working_days)
-        # 업무별 목표 할당량 (근무일을 3으로 나누어 분배)
-        target_per_task = total_days / 3
-
+    for member, total_days, target_per_task in zip(stats.index, stats["working_days"], stats["target_per_task"]):
+        target = round(float(target_per_task), 1)
         work_stats[member] = {
-            "total_working_days": total_days,
-            "target_allocations": {
-                "chat": round(target_per_task, 1),
-                "happy_call": round(target_per_task, 1),
-                "closing": round(target_per_task, 1),
-            },
+            "total_working_days": int(total_days),
+            "target_allocations": {"chat": target, "happy_call": target, "closing": target},
         }
-
     return work_stats
 
 
 def create_vacation_table(start_date, end_date, vacation_data):
-    # 날짜 범위 생성
-    date_range = pd.date_range(start_date, end_date)
-    date_strings = [date.strftime("%Y-%m-%d") for date in date_range]
-
-    # 빈 데이터프레임 생성
-    vacation_table = pd.DataFrame(index=TEAM_MEMBERS, columns=date_strings)
-    vacation_table = vacation_table.fillna("")
-
-    # 휴가 데이터 채우기
-    for date_str, members in vacation_data.items():
-        if date_str in vacation_table.columns:
-            for member in members:
-                if member in vacation_table.index:
-                    vacation_table.at[member, date_str] = "●"
-
-    # 일요일과 공휴일 표시 (휴가가 없는 경우에만)
-    for date in date_strings:
-        date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-        if date_obj.weekday() == 6:  # 일요일
-            # 해당 날짜에 휴가가 없는 셀에만 'x' 표시
-            for member in TEAM_MEMBERS:
-                if vacation_table.at[member, date] != "●":
-                    vacation_table.at[member, date] = "x"
-        elif date_obj in kr_holidays:  # 공휴일
-            # 해당 날짜에 휴가가 없는 셀에만 '⚪' 표시
-            for member in TEAM_MEMBERS:
-                if vacation_table.at[member, date] != "●":
-                    vacation_table.at[member, date] = "⚪"
-
-    # 열 이름을 '일(요일)' 형식으로 변경
-    vacation_table.columns = [
-        f"{datetime.strptime(date, '%Y-%m-%d').strftime('%d')}({['월','화','수','목','금','토','일'][datetime.strptime(date, '%Y-%m-%d').weekday()]})"
-        for date in date_strings
-    ]
-
+    # 휴가 ●, 일요일 x, 공휴일 ⚪ (휴가가 없는 칸만), 열 이름은 '일(요일)' 형식
+    vacation_table = vacation_status_grid(
+        TEAM_MEMBERS, start_date, end_date, vacation_data, holidays=kr_holidays, mark_sundays=True
+    )
+    vacation_table.columns = day_labels(vacation_table.columns)
     return vacation_table
 
 
-def create_calendar_html(start_date, end_date, schedule, vacation_data, selected_holidays):
-    year = start_date.year
-    month = start_date.month
-    cal = calendar.monthcalendar(year, month)
-
-    html = f"""
+CALENDAR_STYLE = """
     <style>
-        .calendar {{
+        .calendar {
             font-family: Arial, sans-serif;
             border-collapse: collapse;
             width: 100%;
             margin-bottom: 20px;
-        }}
-        .calendar th, .calendar td {{
+        }
+        .calendar th, .calendar td {
             border: 1px solid #ddd;
             padding: 8px;
             text-align: center;
             vertical-align: top;
-        }}
-        .calendar th {{
+        }
+        .calendar th {
             background-color: #f2f2f2;
-        }}
-        .calendar .date {{
+        }
+        .calendar .date {
             font-weight: bold;
             margin-bottom: 4px;
-        }}
-        .calendar .task {{
+        }
+        .calendar .task {
             font-size: 12px;
             margin: 2px 0;
             text-align: left;
-        }}
-        .calendar .chat {{
+        }
+        .calendar .chat {
             color: #4CAF50;
-        }}
-        .calendar .happy_call {{
+        }
+        .calendar .happy_call {
             color: #2196F3;
-        }}
-        .calendar .closing {{
+        }
+        .calendar .closing {
             color: #FF5722;
-        }}
-        .calendar .vacation {{
+        }
+        .calendar .vacation {
             background-color: #FFEBEE;
-        }}
-        .calendar .holiday {{
+        }
+        .calendar .holiday {
             background-color: #E8F5E9;
-        }}
-        .calendar .sunday {{
+        }
+        .calendar .sunday {
             background-color: #EEEEEE;
-        }}
+        }
     </style>
-    <table class="calendar">
-        <caption>{calendar.month_name[month]} {year}</caption>
-        <tr>
-            <th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th>
-        </tr>
-    """
-
-    for week in cal:
-        html += "<tr>"
-        for day_index, day in enumerate(week):
-            if day == 0:
-                html += "<td></td>"
-            else:
-                date = datetime(year, month, day).date()
-                date_str = date.strftime("%Y-%m-%d")
-
-                # 셀 클래스 결정
-                classes = []
-                if date_str in vacation_data:
-                    classes.append("vacation")
-                if date in kr_holidays:
-                    classes.append("holiday")
-                if day_index == 6:  # 일요일
-                    classes.append("sunday")
-
-                class_str = f'class="{" ".join(classes)}"' if classes else ""
-
-                html += f"<td {class_str}>"
-                html += f'<div class="date">{day}</div>'
-
-                # 업무 할당 표시
-                if date in schedule and schedule[date]["tasks"]:
-                    for task_type, members in schedule[date]["tasks"].items():
-                        task_name = next(k for k, v in TASK_TYPES.items() if v == task_type)
-                        html += f'<div class="task {task_type}">{task_name}: {", ".join(members)}</div>'
-
-                html += "</td>"
-        html += "</tr>"
-
-    html += "</table>"
-    return html
-
-
-def create_daily_assignment_table(schedule, start_date, end_date):
+"""
+
+
+def create_calendar_html(start_date, end_date, schedule, vacation_data, selected_holidays):
+    year = start_date.year
+    month = start_date.month
+    # 그 달의 업무 배정, 휴가 여부, 공휴일 여부만 키에 포함 (바뀐 달만 다시 만듦)
+    days = tuple(
+        (
+            date_str,
+            (
+                tuple((task_type, tuple(members)) for task_type, members in schedule[date]["tasks"].items())
+                if date in schedule
+                else ()
+            ),
+            date_str in vacation_data,
+            date in kr_holidays,
+        )
+        for _, date, date_str, _ in month_days(year, month)
+    )
+    return cached_fragment(("tasks", year, month, days), lambda: build_calendar_html(year, month, days))
+
+
+def build_calendar_html(year, month, days):
+    day_data = {date_str: (tasks, is_vacation, is_holiday) for date_str, tasks, is_vacation, is_holiday in days}
+    task_names = {v: k for k, v in TASK_TYPES.items()}
+
+    def render_day(day, date, date_str, day_index):
+        tasks, is_vacation, is_holiday = day_data[date_str]
+
+        # 셀 클래스 결정
+        classes = []
+        if is_vacation:
+            classes.append("vacation")
+        if is_holiday:
+            classes.append("holiday")
+        if day_index == 6:  # 일요일
+            classes.append("sunday")
+
+        class_str = f'class="{" ".join(classes)}"' if classes else ""
+        parts = [f"<td {class_str}>", f'<div class="date">{day}</div>']
+
+        # 업무 할당 표시
+        for task_type, members in tasks:
+            parts.append(f'<div class="task {task_type}">{task_names[task_type]}: {", ".join(members)}</div>')
+
+        parts.append("</td>")
+        return "".join(parts)
+
+    return "".join(
+        [
+            CALENDAR_STYLE,
+            '    <table class="calendar">\n',
+            f"        <caption>{calendar.month_name[month]} {year}</caption>\n",
+            f"        {WEEKDAY_HEADER}\n",
+            render_weeks(year, month, render_day),
+            "</table>",
+        ]
+    )
+
+
+def create_daily_assignment_table(result, start_date, end_date):
     # 날짜 범위 생성
     date_range = pd.date_range(start_date, end_date)
+    assignments = result.to_dict()
 
     # 데이터 프레임용 데이터 준비
     data = []
     for date in date_range:
         if date.weekday() < 6:  # 일요일 제외
-            row = {
-                "날짜": f"{date.strftime('%m/%d')}({['월','화','수','목','금','토','일'][date.weekday()]})",
-                "카톡": "",
-                "해피콜/리뷰": "",
-                "마감/어플": "",
-            }
-
-            if date.date() in schedule and schedule[date.date()]["tasks"]:
-                tasks = schedule[date.date()]["tasks"]
-                row["카톡"] = ", ".join(tasks.get("chat", []))
-                row["해피콜/리뷰"] = ", ".join(tasks.get("happy_call", []))
-                row["마감/어플"] = ", ".join(tasks.get("closing", []))
+            row = {"날짜": f"{date.strftime('%m/%d')}({['월','화','수','목','금','토','일'][date.weekday()]})"}
+            tasks = assignments.get(date.date(), {})
+            for task, label in zip(result.roles, result.role_labels):
+                row[label] = ", ".join(tasks.get(task, []))
 
             data.append(row)
 
     return pd.DataFrame(data)
 
 
-def get_excel_download_data(df):
-    # 엑셀 파일로 변환
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, sheet_name="업무분배표", index=False)
+def get_excel_download_data(result):
+    # 엑셀 파일로 변환 (요약 시트 + 월별 업무분배 시트, constant_memory 로 스트리밍)
+    return schedule_workbook_bytes([(TEAM_NAME, {"tasks": result})])
 
-    return output.getvalue()
+
+def publish_schedule(result):
+    # 근무자별 .ics 구독 주소로 제공 (청소 페이지 사이드바의 "캘린더 구독 주소" 참고)
+    version = get_schedule_feeds().publish(TEAM_NAME, "tasks", result)
+    st.toast(f"팀장 스케줄을 캘린더로 게시했습니다 (버전 {version}).")
+
+
+def accept_schedule(result, start_date, end_date):
+    # 확정한 스케줄의 횟수를 누적 기록에 반영 (다음 기간 스케줄의 시작값)하고 이력에 남김
+    get_fairness_ledger().accept(TEAM_NAME, result, start_date, end_date)
+    version = get_schedule_history().record(TEAM_NAME, result, start_date, end_date)
+    st.toast(f"업무 횟수를 누적 기록에 반영했습니다 (이력 버전 {version}).")
 
 
 def main():
@@ -462,33 +302,9 @@ def main():
     vacation_table = create_vacation_table(start_date, end_date, vacation_data)
 
     st.subheader("휴가 현황")
-    # CSS 스타일 수정
-    table_style = """
-    <style>
-        .small-table {
-            font-size: 11px;
-            transform: scale(1.0);
-            transform-origin: top left;
-        }
-        .small-table th, .small-table td {
-            padding: 2px 4px;
-            text-align: center;
-        }
-        .small-table td:empty::after {
-            content: "-";
-            color: #ddd;
-        }
-    </style>
-    """
-
-    # HTML로 테이블 생성 (스타일 적용)
-    html_table = vacation_table.style.applymap(
-        lambda x: "color: red" if x == "●" else "color: green" if x == "⚪" else ""
-    ).to_html()
-
-    # CSS 클래스 추가 및 Streamlit에 표시
-    st.markdown(table_style, unsafe_allow_html=True)
-    st.markdown(f'<div class="small-table">{html_table}</div>', unsafe_allow_html=True)
+    # 보이는 행/열만 브라우저에서 그리는 표 (상태는 한 글자 코드로 전달, 빈 칸은 "-")
+    grid_html, grid_height = client_grid_html(grid_payload(vacation_table), empty="-")
+    components.html(grid_html, height=grid_height)
 
     if st.button("업무 분배하기"):
         vacation_data = load_vacation_data()
@@ -513,8 +329,27 @@ def main():
         st.table(pd.DataFrame(stats_table))
 
         # 업무 분배 실행 (선택된 휴일 전달)
-        schedule, task_counts = solve_environment_team_schedule(
-            start_date, end_date, TEAM_MEMBERS, vacation_data, selected_holidays
+        # 같은 입력(휴가, 공휴일, 배분 규칙)이면 캐시된 결과를 사용
+        allocation_rules = load_allocation_rules(ALLOCATION_RULES_FILE, default=ALLOCATION_RULES)
+        # 이전 기간까지 확정된 업무 횟수에서 시작 (기록이 없으면 0)
+        offsets = get_fairness_ledger().offsets(TEAM_NAME, "tasks", TEAM_MEMBERS, start_date)
+        schedule, task_counts = cached_solve(
+            "tasks_page",
+            lambda: solve_environment_team_schedule(
+                start_date,
+                end_date,
+                TEAM_MEMBERS,
+                vacation_data,
+                selected_holidays,
+                allocation_rules=allocation_rules,
+                offsets=offsets,
+            ),
+            TEAM_MEMBERS,
+            start_date,
+            end_date,
+            selected_holidays,
+            vacation_data,
+            {"rules": allocation_rules, "offsets": offsets} if offsets else allocation_rules,
         )
 
         # 캘린더 형식으로 결과 표시 (선택 휴일 전달)
@@ -541,13 +376,14 @@ def main():
 
         # 날짜별 업무 분배 현황 표시
         st.subheader("날짜별 업무 분배 현황")
-        daily_assignment_table = create_daily_assignment_table(schedule, start_date, end_date)
+        result = ScheduleResult.from_tasks(schedule, TEAM_MEMBERS)
+        daily_assignment_table = create_daily_assignment_table(result, start_date, end_date)
 
         # 테이블 표시
         st.table(daily_assignment_table)
 
         # 엑셀 다운로드 버튼
-        excel_data = get_excel_download_data(daily_assignment_table)
+        excel_data = get_excel_download_data(result)
 
         # 현재 날짜를 파일명에 포함
         current_date = datetime.now().strftime("%Y%m%d")
@@ -559,3 +395,6 @@ def main():
             file_name=filename,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
+        # 버튼을 누르면 다시 실행되면서 "업무 분배하기" 블록을 건너뛰므로 콜백으로 게시
+        st.button("캘린더 게시", on_click=publish_schedule, args=(result,))
+        st.button("스케줄 확정 (누적 횟수 반영)", on_click=accept_schedule, args=(result, start_date, end_date))
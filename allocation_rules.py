@@ -0,0 +1,65 @@
+import json
+import os
+
+import numpy as np
+
+
+def load_allocation_rules(path=None, default=None):
+    # 설정 파일(JSON)에서 "인원수 → 업무별 인원" 테이블을 읽어옵니다.
+    # 예: {"3": {"chat": 1, "happy_call": 1, "closing": 1}, "4": {...}}
+    # 파일이 없으면 기본 테이블을 사용합니다.
+    if path is not None and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            rules = json.load(f)
+    else:
+        rules = default or {}
+
+    return {int(headcount): {task: int(count) for task, count in mix.items()} for headcount, mix in rules.items()}
+
+
+def _round_preserving_total(values, total):
+    # 소수 인원을 정수로 바꾸면서 합계를 유지 (최대 잔여 방식)
+    floors = np.floor(values).astype(np.int64)
+    short = int(round(total)) - int(floors.sum())
+    if short > 0:
+        order = np.argsort(-(values - floors), kind="stable")
+        floors[order[:short]] += 1
+    return floors
+
+
+def interpolate_allocation_rule(rules, task_types, headcount):
+    # 테이블에 없는 인원수에 대한 업무 배분을 계산합니다.
+    # - 정의된 최소 인원 미만: 배정 없음
+    # - 정의된 인원 사이: 선형 보간
+    # - 정의된 최대 인원 초과: 최대 인원의 비율대로 확장
+    task_types = list(task_types)
+    known = sorted(rules)
+    if not known or headcount < known[0]:
+        return np.zeros(len(task_types), dtype=np.int64)
+
+    def row(n):
+        return np.array([rules[n].get(task, 0) for task in task_types], dtype=np.float64)
+
+    if headcount in rules:
+        return row(headcount).astype(np.int64)
+
+    if headcount > known[-1]:
+        top = known[-1]
+        values = row(top) * headcount / top
+    else:
+        upper = next(n for n in known if n > headcount)
+        lower = max(n for n in known if n < headcount)
+        ratio = (headcount - lower) / (upper - lower)
+        values = row(lower) + (row(upper) - row(lower)) * ratio
+
+    return _round_preserving_total(values, values.sum())
+
+
+def compile_allocation_rules(rules, task_types, max_headcount):
+    # 0명 ~ max_headcount명까지의 업무 배분을 미리 계산해 배열로 만듭니다.
+    # table[인원수] -> task_types 순서의 업무별 인원
+    task_types = list(task_types)
+    table = np.zeros((max_headcount + 1, len(task_types)), dtype=np.int64)
+    for headcount in range(max_headcount + 1):
+        table[headcount] = interpolate_allocation_rule(rules, task_types, headcount)
+    return table
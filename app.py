@@ -8,13 +8,27 @@ import holidays, io
 
 # from ortools.sat.python import cp_model
 import sqlite3
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import chardet
-from threading import Thread
 from opt_clean_schedule import solve_cleaning_schedule, solve_cleaning_schedule_logic
+from zone_model import load_zone_config
+from cleaning_stats import cleaning_stats
+from schedule_result import ScheduleResult
+from job_queue import PENDING_STATUSES, get_job_runner
+from solve_api import get_solve_service, parse_solve_request
+from vacation_store import get_vacation_store
+from flask_service import FlaskService, stop_services
+from calendar_client import client_calendar_html, schedule_payload, vacation_payload
+from schedule_export import schedule_workbook_bytes
+from schedule_archive import export_schedule, export_vacations, read_vacation_file
+from ical_feed import get_schedule_feeds, iter_ics
+from fairness_ledger import get_fairness_ledger
+from schedule_history import get_schedule_history
+from calendar_cache import WEEKDAY_HEADER, cached_fragment, month_days, render_weeks
 from collections import defaultdict
 from datetime import datetime
 import atexit
+from urllib.parse import quote
 from allocation import main as allocation_main
 
 # 팀장 업무 분배 class
@@ -25,11 +39,19 @@ from allocation_job import main as allocation_job_main
 st.set_page_config(layout="wide")
 
 local_host_ip = "127.0.0.1"
+FLASK_PORT = 8000
+API_URL = f"http://{local_host_ip}:{FLASK_PORT}"
+# API 서버 작업 스레드 수 (secrets.toml 의 [flask] threads 로 변경)
+FLASK_THREADS = int(st.secrets.get("flask", {}).get("threads", 8))
 # 한국의 공휴일 정보를 가져옵니다.
 kr_holidays = holidays.KR()
 
 TEAM_MEMBERS = ["다솔", "다혜", "민지", "한울"]
 
+# 청소 구역 설정 (없으면 기본 A/B 2구역)
+ZONE_CONFIG_FILE = "zones.json"
+cleaning_zones = load_zone_config(ZONE_CONFIG_FILE)
+
 
 def is_workday(date, selected_holidays=[]):
     if len(selected_holidays) > 0:
@@ -74,132 +96,99 @@ def parse_csv_vacations(csv_contents):
 
 
 def create_interactive_calendar_html(year, month, schedule, vacations, workers):
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-
-    html = f"""
-    <div class="calendar" id="calendar-{year}-{month}">
-        <h2>{month_name} {year}</h2>
-        <table>
-            <tr><th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th></tr>
-    """
-
-    for week in cal:
-        html += "<tr>"
-        for day in week:
-            if day == 0:
-                html += "<td></td>"
-            else:
-                date = datetime(year, month, day).date()
-                date_str = date.strftime("%Y-%m-%d")
-                if date in schedule:
-                    zone_a = schedule[date]["zone_A"]
-                    zone_b = schedule[date]["zone_B"]
-                    vacation_workers = vacations.get(date, [])
-                    html += f"""
-                    <td class="day" data-date="{date_str}">
-                        <div class="date">{day}</div>
-                        <div class="zone-a">A: {zone_a}</div>
-                        <div class="zone-b">B: {zone_b}</div>
-                    </td>
-                    """
-                else:
-                    html += f"<td class='day' data-date='{date_str}'><div class='date'>{day}</div></td>"
-        html += "</tr>"
+    # 그 달의 구역 배정만 키에 포함 (다른 달의 스케줄이나 휴가가 바뀌어도 다시 만들지 않음)
+    zone_names = tuple(zone.name for zone in cleaning_zones.zones)
+    assignments = tuple(
+        (date_str, tuple(tuple(schedule[date][zone]) for zone in zone_names))
+        for _, date, date_str, _ in month_days(year, month)
+        if date in schedule
+    )
+    return cached_fragment(
+        ("interactive", year, month, zone_names, assignments),
+        lambda: build_interactive_calendar_html(year, month, zone_names, dict(assignments)),
+    )
 
-    html += """
-        </table>
-    </div>
-    """
 
-    return html
+def build_interactive_calendar_html(year, month, zone_names, assignments):
+    def render_day(day, date, date_str, day_index):
+        if date_str not in assignments:
+            return f"<td class='day' data-date='{date_str}'><div class='date'>{day}</div></td>"
+        zone_html = "".join(
+            f'<div class="zone-{zone.lower()}">{zone}: {", ".join(assigned)}</div>'
+            for zone, assigned in zip(zone_names, assignments[date_str])
+        )
+        return f'<td class="day" data-date="{date_str}"><div class="date">{day}</div>{zone_html}</td>'
+
+    return "".join(
+        [
+            f'<div class="calendar" id="calendar-{year}-{month}">',
+            f"<h2>{calendar.month_name[month]} {year}</h2>",
+            "<table>",
+            WEEKDAY_HEADER,
+            render_weeks(year, month, render_day),
+            "</table></div>",
+        ]
+    )
 
 
 def create_vacation_calendar_html(year, month, worker, vacations):
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
+    # 그 달에 이 근무자가 쉬는 날만 키에 포함
+    vacation_days = tuple(day for day, date, _, _ in month_days(year, month) if worker in vacations.get(date, []))
+    return cached_fragment(
+        ("vacation", year, month, worker, vacation_days),
+        lambda: build_vacation_calendar_html(year, month, worker, set(vacation_days)),
+    )
 
-    html = f"""
-    <div class="calendar" id="calendar-{worker}-{year}-{month}">
-        <h3>{worker} - {month_name} {year}</h3>
-        <table>
-            <tr><th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th></tr>
-    """
 
-    for week in cal:
-        html += "<tr>"
-        for day in week:
-            if day == 0:
-                html += "<td></td>"
-            else:
-                date = datetime(year, month, day).date()
-                date_str = date.strftime("%Y-%m-%d")
-                is_vacation = worker in vacations.get(date, [])
-                html += f"""
-                <td class="day {'vacation' if is_vacation else ''}" data-date="{date_str}" data-worker="{worker}">
-                    <div class="date">{day}</div>
-                </td>
-                """
-        html += "</tr>"
-
-    html += """
-        </table>
-    </div>
-    """
+def build_vacation_calendar_html(year, month, worker, vacation_days):
+    def render_day(day, date, date_str, day_index):
+        vacation_class = "vacation" if day in vacation_days else ""
+        return (
+            f'<td class="day {vacation_class}" data-date="{date_str}" data-worker="{worker}">'
+            f'<div class="date">{day}</div></td>'
+        )
 
-    return html
+    return "".join(
+        [
+            f'<div class="calendar" id="calendar-{worker}-{year}-{month}">',
+            f"<h3>{worker} - {calendar.month_name[month]} {year}</h3>",
+            "<table>",
+            WEEKDAY_HEADER,
+            render_weeks(year, month, render_day),
+            "</table></div>",
+        ]
+    )
 
 
-# Database file
+# Database file (모든 페이지의 휴가를 팀 이름으로 구분해 함께 저장)
 DB_FILE = st.secrets["database"]["file_path"]
 TABLE_NAME = st.secrets["database"]["table_name"]
+TEAM_NAME = st.secrets["database"].get("team", "청소")
+# 분석용 열 기반(Parquet) 보관 폴더와 팀 이름 (secrets 의 [archive] 가 없으면 기본값)
+# 팀 이름은 누적 기록 / 이력 / batch_schedule --archive 와 같은 파티션이 되도록 TEAM_NAME
+ARCHIVE_DIR = st.secrets.get("archive", {}).get("dir", "archive")
+ARCHIVE_TEAM = st.secrets.get("archive", {}).get("team", TEAM_NAME)
+# 모든 세션과 Flask 스레드가 함께 쓰는 휴가 데이터
+vacation_store = get_vacation_store(DB_FILE, TEAM_NAME, TABLE_NAME)
 
 
 # Initialize the SQLite database
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(
-        f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            worker TEXT NOT NULL
-        )
-    """
-    )
-    conn.commit()
-    conn.close()
+    # 휴가 테이블 스키마 확인 / 이전 (vacation_schema). {TABLE_NAME} 은 이 팀의 기존 형태 호환 뷰로 남음
+    # 다른 페이지와 같은 DB 파일이므로 프로세스에서 한 번만 확인
+    vacation_store.ensure_schema()
 
 
 def save_vacation_data(date, worker):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
     print("save...", date, worker)
-    # Check if the record already exists
-    query = f"SELECT * FROM {TABLE_NAME} WHERE date = ? AND worker = ?"
-    c.execute(query, (date, worker))
-
-    existing_record = c.fetchone()  # Fetch one matching record, if any
-
-    # Only insert if no matching record is found
-    if existing_record is None:
-        query = f"INSERT INTO {TABLE_NAME} (date, worker) VALUES (?, ?)"
-        c.execute(query, (date, worker))
-        conn.commit()
-    else:
-        print("exist...", existing_record)
-    conn.close()
+    # DB 와 공용 저장소에 함께 기록 (이미 있으면 저장하지 않음)
+    if not vacation_store.add(date, worker):
+        print("exist...", date, worker)
 
 
 # Remove vacation data from the database
 def remove_vacation_data(date, worker):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    query = f"DELETE FROM {TABLE_NAME} WHERE date = ? AND worker = ?"
-    c.execute(query, (date, worker))
-    conn.commit()
-    conn.close()
+    vacation_store.remove(date, worker)
 
 
 # Load all vacation data from the database
@@ -209,30 +198,18 @@ def load_vacation_data():
     for date, worker in result:
         if date not in vacation_days:
             vacation_days[date] = []
-        # 팀 멤버만 휴가 일정에 포함
-        if worker in TEAM_MEMBERS:
-            vacation_days[date].append(worker)
+        vacation_days[date].append(worker)
 
     return vacation_days
 
 
-def select_vacation_data():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    # c.execute(f"SELECT date, worker FROM {TABLE_NAME}")
-    start_of_month = st.session_state["start_of_month"]
-    end_of_month = st.session_state["end_of_month"]
-    # add filter for team members
-    query = f"SELECT date, worker FROM {TABLE_NAME} WHERE date BETWEEN ? AND ? AND worker IN ({','.join(['?'] * len(TEAM_MEMBERS))})"
-
-    print(start_of_month, end_of_month)
-    # join team members with comma
-    parameters = (start_of_month, end_of_month, *TEAM_MEMBERS)
-    c.execute(query, parameters)
-
-    result = c.fetchall()
-    conn.close()
-    return result
+def select_vacation_data(start_of_month=None, end_of_month=None):
+    # 기간이 주어지지 않으면 화면에서 선택한 기간 사용
+    start_of_month = start_of_month or st.session_state["start_of_month"]
+    end_of_month = end_of_month or st.session_state["end_of_month"]
+    # 팀 멤버만 휴가 일정에 포함 (DB 를 다시 읽지 않고 공용 저장소에서 조회)
+    vacation_data = vacation_store.select(start_of_month, end_of_month, TEAM_MEMBERS)
+    return [(date, worker) for date in sorted(vacation_data) for worker in vacation_data[date]]
 
 
 # Flask application
@@ -262,33 +239,104 @@ def save_vacation_route():
 
 @app.route("/get-vacation-data", methods=["GET"])
 def get_vacation_data_route():
-    vacation_data = load_vacation_data()
-    print(vacation_data)
+    # Flask 스레드에는 Streamlit 세션이 없으므로 기간은 쿼리 파라미터로 받음 (?start=YYYY-MM-DD&end=YYYY-MM-DD)
+    try:
+        vacation_data = vacation_store.select(request.args.get("start"), request.args.get("end"), TEAM_MEMBERS)
+    except ValueError:
+        return jsonify({"status": "error", "message": "날짜 형식은 YYYY-MM-DD 입니다."}), 400
     return jsonify(vacation_data), 200
 
 
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job_route(job_id):
+    job = get_job_runner().get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    if job["result"] is not None:
+        job["result"] = json.loads(job["result"])
+    return jsonify(job), 200
+
+
+@app.route("/solve/<kind>", methods=["POST"])
+def solve_route(kind):
+    # kind: cleaning / shifts / tasks
+    try:
+        inputs = parse_solve_request(kind, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        inputs_hash, response = get_solve_service().solve(kind, inputs)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    return jsonify({**response, "inputs_hash": inputs_hash}), 200
+
+
 @app.route("/reset-vacation-data", methods=["POST"])
 def reset_vacation_data_route():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(f"DELETE FROM {TABLE_NAME}")
-    conn.commit()
-    conn.close()
+    vacation_store.clear()
     return jsonify({"status": "success", "message": "Vacation data reset"}), 200
 
 
-import socket
+@app.route("/history/<team>/<day>", methods=["GET"])
+def history_day_route(team, day):
+    # 확정된 스케줄 이력에서 팀의 하루 배정 (?kind=cleaning&role=B 로 좁힘)
+    try:
+        assignments = get_schedule_history().day_assignments(
+            team, day, request.args.get("kind"), request.args.get("role")
+        )
+    except ValueError:
+        return jsonify({"status": "error", "message": "날짜 형식은 YYYY-MM-DD 입니다."}), 400
+    rows = [{"kind": kind, "role": role, "label": label, "worker": worker} for kind, role, label, worker in assignments]
+    return jsonify({"team": team, "date": day, "assignments": rows}), 200
 
 
-# Function to check if port is in use
-def is_port_in_use(port):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(("127.0.0.1", port)) == 0
+@app.route("/history/worker/<worker>", methods=["GET"])
+def history_worker_route(worker):
+    # 근무자의 기간 배정 (?start=YYYY-MM-DD&end=YYYY-MM-DD&team=)
+    try:
+        assignments = get_schedule_history().worker_assignments(
+            worker, request.args["start"], request.args["end"], request.args.get("team")
+        )
+    except (KeyError, ValueError):
+        return jsonify({"status": "error", "message": "start, end 를 YYYY-MM-DD 형식으로 주세요."}), 400
+    rows = [
+        {"date": day.strftime("%Y-%m-%d"), "team": team, "kind": kind, "role": role, "label": label}
+        for day, team, kind, role, label in assignments
+    ]
+    return jsonify({"worker": worker, "assignments": rows}), 200
+
+
+@app.route("/health", methods=["GET"])
+def health_route():
+    health = app.extensions["flask_service"].health()
+    health["vacation_version"] = vacation_store.version
+    return jsonify(health), 200
+
+
+@app.route("/ical/<worker>.ics", methods=["GET"])
+def ical_route(worker):
+    # 근무자별 캘린더 구독 주소 (?team= 으로 한 팀만). 게시된 스케줄만 제공하고 바뀌지 않았으면 304
+    feeds = get_schedule_feeds()
+    entries = feeds.entries(worker, request.args.get("team"))
+    if not entries:
+        return jsonify({"status": "error", "message": "게시된 스케줄이 없습니다."}), 404
+
+    etag = feeds.etag(worker, entries)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(iter_ics(worker, entries), mimetype="text/calendar")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
-# Function to run Flask server
-def run_flask():
-    app.run(host=local_host_ip, port=8000, debug=True, use_reloader=False)
+# Flask 서버는 프로세스당 한 번만 시작 (재실행마다 포트를 확인하거나 스레드를 만들지 않음)
+@st.cache_resource
+def get_flask_service():
+    service = FlaskService(app, host=local_host_ip, port=FLASK_PORT, threads=FLASK_THREADS)
+    service.start()
+    return service
 
 
 # Helper function to get the first and last day of the month
@@ -356,93 +404,75 @@ def check_vacation_data():
     st.sidebar.write(rows)
 
 
-if "previous_vacation_days" not in st.session_state:
-    st.session_state.previous_vacation_days = {}
-
-import time
-
-
-def check_vacation_data_updates():
-    check_container = st.empty()
-    while True:
-        current_vacation_data = load_vacation_data()
-        if "previous_vacation_days" not in st.session_state:
-            st.session_state.previous_vacation_days = {}
-
-        if current_vacation_data != st.session_state.previous_vacation_days:
-            print("Vacation data updated:", current_vacation_data)
-            st.session_state.previous_vacation_days = current_vacation_data.copy()
-            st.rerun()
-        else:
-            # print("... np update", current_vacation_data , st.session_state.previous_vacation_days)
-            pass
-        # 현재 시간 표시 (옵션)
-        check_container.text(f"Last checked: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        time.sleep(1)
+# 휴가 데이터 / 작업 상태 확인 주기 (초). 화면 전체가 아니라 각 fragment 가 자기 영역만 다시 그립니다.
+POLL_SECONDS = 1
+# 휴가 목록은 삭제 버튼이 많아 다시 그리는 비용이 크므로 느리게 확인
+# (이 세션에서 삭제하면 바로 다시 그리고, 다른 세션의 변경은 이 주기 안에 반영)
+LIST_POLL_SECONDS = 10
 
 
 def remove_all_vacation_data():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
     # This will delete all rows from the vacation_days table
-    c.execute(f"DELETE FROM {TABLE_NAME}")
-    conn.commit()
-    conn.close()
+    vacation_store.clear()
+
+
+@st.fragment(run_every=LIST_POLL_SECONDS)
+def vacation_list_fragment():
+    st.subheader("현재 휴가 일정")
+
+    # 근로자별 휴가 정보 정리 (휴가 데이터 버전이나 선택한 기간이 바뀔 때만 다시 계산)
+    # fragment 는 다시 실행될 때마다 위젯을 모두 다시 내보내야 하므로 그리는 것 자체는 건너뛸 수 없음
+    cache_key = (st.session_state["start_of_month"], st.session_state["end_of_month"], vacation_store.version)
+    cached = st.session_state.get("vacation_list")
+    if cached is None or cached[0] != cache_key:
+        worker_vacations = defaultdict(list)
+        for date, _workers in load_vacation_data().items():
+            for worker in _workers:
+                worker_vacations[worker].append(date)
+        cached = (cache_key, worker_vacations)
+        st.session_state.vacation_list = cached
+    worker_vacations = cached[1]
 
+    # 근로자 목록 (알파벳 순으로 정렬)
+    sorted_workers = sorted(worker_vacations.keys())
+    # Add vacation functionality
+    weekdays = ["월", "화", "수", "목", "금", "토", "일"]
 
-def create_vacation_calendar_html(year, month, worker, vacations):
-    cal = calendar.monthcalendar(year, month)
-    month_name = calendar.month_name[month]
-
-    html = f"""
-    <div class="calendar" id="calendar-{worker}-{year}-{month}">
-        <h3>{worker} - {month_name} {year}</h3>
-        <table>
-            <tr><th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th></tr>
-    """
-
-    for week in cal:
-        html += "<tr>"
-        for day in week:
-            if day == 0:
-                html += "<td></td>"
+    for worker in sorted_workers:
+        sorted_dates = sorted(worker_vacations[worker], key=lambda x: datetime.strptime(x, "%Y-%m-%d"))
+        with st.expander(f"{worker}의 휴가 ({len(sorted_dates)}일)", expanded=False):
+            if worker_vacations[worker]:
+                for date in sorted_dates:
+                    col1, col2 = st.columns([3, 2])
+                    with col1:
+                        day_of_week = weekdays[datetime.strptime(date, "%Y-%m-%d").weekday()]
+                        st.write(f"• {date} ({day_of_week})")
+                    with col2:
+                        if st.button("삭제", key=f"delete_{worker}_{date}"):
+                            remove_vacation_data(date, worker)
+                            st.rerun(scope="fragment")
             else:
-                date = datetime(year, month, day).date()
-                date_str = date.strftime("%Y-%m-%d")
-                is_vacation = worker in vacations.get(date, [])
-                html += f"""
-                <td class="day {'vacation' if is_vacation else ''}" data-date="{date_str}" data-worker="{worker}">
-                    <div class="date">{day}</div>
-                </td>
-                """
-        html += "</tr>"
-
-    html += """
-        </table>
-    </div>
-    """
-
-    return html
+                st.write("예정된 휴가 없음")
 
 
 def sidebar():
 
     if st.sidebar.toggle("휴가 일정 업로드"):
-        uploaded_file = st.sidebar.file_uploader("CSV 파일 업로드", type="csv")
+        uploaded_file = st.sidebar.file_uploader("CSV 파일 업로드", type=["csv", "parquet", "feather"])
         if uploaded_file is not None and not st.session_state.file_processed:
             try:
-                # Read and process the CSV file
-                df = read_csv_file(uploaded_file)
+                # Read and process the CSV file (Parquet/Feather 보관본은 인코딩 추측 없이 바로 읽음)
+                if uploaded_file.name.endswith((".parquet", ".feather")):
+                    df = read_vacation_file(uploaded_file)
+                else:
+                    df = read_csv_file(uploaded_file)
 
                 # Validate the CSV format (should have 'Date' and 'Worker' columns)
                 if set(df.columns) != {"Date", "Worker"}:
                     raise ValueError("CSV 파일은 'Date'와 'Worker' 열을 포함해야 합니다.")
 
-                # Extract vacation data from each row and save
-                for _, row in df.iterrows():
-                    date = row["Date"]
-                    worker = row["Worker"]
-                    save_vacation_data(date, worker)
+                # Extract vacation data from each row and save (한 번에 저장하고 버전은 한 번만 올림)
+                vacation_store.add_many(zip(df["Date"], df["Worker"]))
 
                 # Update session state after successful upload and processing
                 st.session_state.file_uploaded = True
@@ -461,56 +491,19 @@ def sidebar():
             st.sidebar.button("다시 업로드", on_click=reset_file_upload)
     height = st.sidebar.number_input("캘린더 높이", min_value=400, max_value=3200, value=400, step=200)
     st.session_state.calendar_height = height
+    # 근무자·기간이 많으면 "브라우저" 모드: HTML 대신 압축 JSON 을 보내고 보이는 달력만 그림
+    st.session_state.calendar_mode = st.sidebar.radio("달력 렌더링", ["서버", "브라우저"], horizontal=True)
 
-    st.sidebar.subheader("현재 휴가 일정")
-
-    # 이전 상태와 비교
-    # if 'previous_vacation_days' not in st.session_state:
-    #     st.session_state.previous_vacation_days = {}
-    # 휴가 일정 표시
-    vacation_data = load_vacation_data()
-
-    # 날짜를 기준으로 정렬
-    # sorted_dates = sorted(vacation_data.keys(), key=lambda x: datetime.strptime(x, '%Y-%m-%d'))
-
-    # for date in sorted_dates:
-    #     workers_on_vacation = vacation_data[date]
-
-    #     st.sidebar.write(f"{date}: {', '.join(workers_on_vacation)}")
-
-    # 근로자별 휴가 정보 정리
-    worker_vacations = defaultdict(list)
-    for date, _workers in vacation_data.items():
-        for worker in _workers:
-            worker_vacations[worker].append(date)
-
-    # 근로자 목록 (알파벳 순으로 정렬)
-    sorted_workers = sorted(worker_vacations.keys())
-    # Add vacation functionality
-    weekdays = ["월", "화", "수", "목", "금", "토", "일"]
-
-    for worker in sorted_workers:
-        sorted_dates = sorted(worker_vacations[worker], key=lambda x: datetime.strptime(x, "%Y-%m-%d"))
-        with st.sidebar.expander(f"{worker}의 휴가 ({len(sorted_dates)}일)", expanded=False):
-            if worker_vacations[worker]:
-                for date in sorted_dates:
-                    col1, col2 = st.columns([3, 2])
-                    with col1:
-                        day_of_week = weekdays[datetime.strptime(date, "%Y-%m-%d").weekday()]
-                        st.write(f"• {date} ({day_of_week})")
-                    with col2:
-                        if st.button("삭제", key=f"delete_{worker}_{date}"):
-                            remove_vacation_data(date, worker)
-                            st.rerun()
-            else:
-                st.write("예정된 휴가 없음")
+    # 휴가 목록은 fragment 로 분리 (fragment 안에서는 st.sidebar 를 쓸 수 없으므로 with 블록 사용)
+    with st.sidebar:
+        vacation_list_fragment()
 
     if st.sidebar.button("RERUN"):
         st.rerun()
 
     if st.sidebar.button("휴가일정 전부 삭제"):
+        # 버튼 클릭으로 이미 다시 실행되고, 각 fragment 도 버전 변경을 확인해 다시 그림
         remove_all_vacation_data()
-        st.rerun()
 
     # if st.sidebar.button("show"):
     #     check_vacation_data()
@@ -537,69 +530,68 @@ def sidebar():
             key="download_button",  # 버튼 고유 키 추가
         )
 
+    # 게시된 스케줄의 근무자별 캘린더 구독 주소 (휴대폰 캘린더 앱에서 URL 로 구독)
+    with st.sidebar.expander("캘린더 구독 주소"):
+        for feed_worker in get_schedule_feeds().workers():
+            st.code(f"{API_URL}/ical/{quote(feed_worker)}.ics", language=None)
 
-def create_app():
-
-    # Get the current date
-    today = datetime.today()
-    current_year = today.year
-    current_month = today.month
-    if is_port_in_use(8000):
-        print("Port 8000 is already in use")
-    else:
-        # Start Flask server in a new thread
-        flask_thread = Thread(target=run_flask, daemon=True)
-        flask_thread.start()
-
-    # Streamlit app starts here
-    st.title("청소 스케줄 최적화")
-
-    # User selects the year and month
-    col1, col2 = st.columns(2)
-
-    with col1:
-        selected_year = st.number_input("년도 선택", min_value=2000, max_value=2100, value=current_year)
-
-    with col2:
-        selected_month = st.selectbox("월 선택", list(range(1, 13)), index=current_month - 1)
-
-    start_of_month, end_of_month = get_month_start_end(selected_year, selected_month)
-
-    # Create two columns for the date inputs
-    col1, col2 = st.columns(2)
-
-    with col1:
-        start_date = st.date_input("시작 날짜", start_of_month)
-
-    with col2:
-        end_date = st.date_input("종료 날짜", end_of_month)
-    st.session_state["start_of_month"] = start_date.strftime("%Y-%m-%d")
-    st.session_state["end_of_month"] = end_date.strftime("%Y-%m-%d")
-    sidebar()
+    # 분석용 보관본: 팀/월 단위 Parquet 파일로 저장 (schedule_archive.load_vacations 로 읽음)
+    if st.sidebar.button("휴가 데이터 Parquet 보관"):
+        try:
+            paths = export_vacations(
+                ARCHIVE_DIR,
+                load_vacation_data(),
+                team=ARCHIVE_TEAM,
+                start_date=st.session_state["start_of_month"],
+                end_date=st.session_state["end_of_month"],
+            )
+            st.sidebar.success(f"{ARCHIVE_DIR} 에 {len(paths)}개 월 파일을 저장했습니다.")
+        except RuntimeError as e:
+            st.sidebar.error(str(e))
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def vacation_calendar_fragment(start_date, end_date):
+    # 휴가 데이터 버전과 기간이 그대로면 이전에 만든 HTML 을 다시 사용 (조회, HTML 생성 없음)
+    calendar_mode = st.session_state.get("calendar_mode", "서버")
+    cache_key = (start_date, end_date, vacation_store.version, calendar_mode, st.session_state.calendar_height)
+    cached = st.session_state.get("vacation_calendar_html")
+    if cached is not None and cached[0] == cache_key:
+        components.html(cached[1], height=st.session_state.calendar_height)
+        return
+
+    if calendar_mode == "브라우저":
+        team_workers = [worker for worker in workers if worker in TEAM_MEMBERS]
+        payload = vacation_payload(team_workers, start_date, end_date, load_vacation_data())
+        html = client_calendar_html(payload, "vacation", st.session_state.calendar_height, API_URL)
+        st.session_state.vacation_calendar_html = (cache_key, html)
+        components.html(html, height=st.session_state.calendar_height)
+        return
 
     # 휴가 캘린더 HTML 생성
     start_month = start_date
     end_month = end_date
-    vacation_calendars_html = "<div class='calendar-container'>"
+    parts = ["<div class='calendar-container'>"]
     current_month = start_month
     init_vacation_data = load_vacation_data()
     init_vacation_data_dict = {
         datetime.strptime(date, "%Y-%m-%d").date(): workers for date, workers in init_vacation_data.items()
     }
     while current_month <= end_month:
-        vacation_calendars_html += "<div class='month-row'>"
+        parts.append("<div class='month-row'>")
         for worker in workers:
             if worker in TEAM_MEMBERS:
-                vacation_calendars_html += create_vacation_calendar_html(
+                month_html = create_vacation_calendar_html(
                     current_month.year, current_month.month, worker, init_vacation_data_dict
                 )
-        vacation_calendars_html += "</div>"
+                parts.append(month_html)
+        parts.append("</div>")
         current_month += timedelta(days=32)
         current_month = current_month.replace(day=1)
-    vacation_calendars_html += "</div>"
-    # CSS와 JavaScript를 포함한 HTML 렌더링
-    components.html(
-        f"""
+    parts.append("</div>")
+    vacation_calendars_html = "".join(parts)
+    # CSS와 JavaScript를 포함한 HTML
+    html = f"""
     <style>
         .calendar-container {{
             display: flex;
@@ -786,14 +778,233 @@ def create_app():
         }}
         
     </script>
-    """,
-        height=st.session_state.calendar_height,
+    """
+    st.session_state.vacation_calendar_html = (cache_key, html)
+    components.html(html, height=st.session_state.calendar_height)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def solver_output_fragment(start_date, end_date):
+    # 백그라운드 작업 상태와 결과만 다시 그리는 영역 (작업이 끝나거나 휴가가 바뀌어도 페이지 전체를 다시 실행하지 않음)
+    # start_date, end_date: 페이지에서 선택한 기간 (결과는 작업을 제출한 기간으로 다룸)
+    job_id = st.session_state.get("cleaning_job_id")
+    if not job_id:
+        return
+
+    # 끝난 작업의 결과는 세션에 한 번만 복원해 두고 다시 조회하지 않음
+    output = st.session_state.get("cleaning_output")
+    if output is None or output["job_id"] != job_id:
+        cleaning_job = get_job_runner().get(job_id)
+        if cleaning_job is None:
+            return
+        if cleaning_job["status"] in PENDING_STATUSES:
+            st.info(f"스케줄 계산 중... ({cleaning_job['progress']:.0%})")
+            return
+        output = {"job_id": job_id, "period": st.session_state.cleaning_job_period, "error": cleaning_job["error"]}
+        if cleaning_job["status"] == "done":
+            # 작업 결과(압축 JSON)를 배열 기반 스케줄 결과로 복원
+            result = ScheduleResult.from_json(cleaning_job["result"])
+            output.update(
+                result=result, schedule=result.to_dict(), stats=cleaning_stats(result, workers, cleaning_zones)
+            )
+        st.session_state.cleaning_output = output
+
+    if "result" not in output:
+        st.error(f"스케줄 생성 실패... 휴가일 조정이 필요해보입니다... {output['error']}")
+        return
+
+    st.success("스케줄 생성 성공!")
+    # 다운로드 / 게시 / 확정 / 보관은 선택한 기간이 바뀌어도 이 결과를 계산한 기간으로 기록
+    if output["period"] != (start_date, end_date):
+        st.warning(
+            f"아래 결과는 {output['period'][0]} ~ {output['period'][1]} 기간의 스케줄입니다. "
+            "선택한 기간의 스케줄은 다시 최적화하세요."
+        )
+    start_date, end_date = output["period"]
+    result = output["result"]
+    df = result.to_frame()
+
+    # 결과 표시
+    with st.expander("최적화된 청소 스케줄"):
+        st.dataframe(df, height=400, use_container_width=True)  # DataFrame 크기 조정
+    # 청소 횟수 통계 표시
+    with st.expander("청소 횟수 통계"):
+        st.dataframe(output["stats"], height=300, use_container_width=True)  # 통계 DataFrame 크기 조정
+
+    # 엑셀 파일은 작업마다 한 번만 만들어 둠
+    if "excel" not in output:
+        output["excel"] = schedule_workbook_bytes([(TEAM_NAME, {"cleaning": result})])
+    st.download_button(
+        label="📥 엑셀 파일 다운로드",
+        data=output["excel"],
+        file_name=f"청소스케줄_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="cleaning_excel_download",
     )
+    if st.button("캘린더 게시", key="cleaning_publish"):
+        # 근무자별 .ics 구독 주소로 제공 (사이드바의 "캘린더 구독 주소" 참고)
+        version = get_schedule_feeds().publish(TEAM_NAME, "cleaning", result)
+        st.success(f"청소 스케줄을 캘린더로 게시했습니다 (버전 {version}).")
+    if st.button("스케줄 확정 (누적 횟수 반영)", key="cleaning_accept"):
+        # 다음 기간 스케줄은 이 기록에서 시작 (같은 기간을 다시 확정하면 교체)
+        get_fairness_ledger().accept(TEAM_NAME, result, start_date, end_date)
+        version = get_schedule_history().record(TEAM_NAME, result, start_date, end_date)
+        st.success(f"청소 횟수를 누적 기록에 반영했습니다 (이력 버전 {version}).")
+    if st.button("스케줄 Parquet 보관", key="cleaning_archive"):
+        try:
+            paths = export_schedule(
+                ARCHIVE_DIR, ARCHIVE_TEAM, "cleaning", result, start_date=start_date, end_date=end_date
+            )
+            st.success(f"{ARCHIVE_DIR} 에 {len(paths)}개 파일을 저장했습니다.")
+        except RuntimeError as e:
+            st.error(str(e))
+
+    # 달력 표시
+    st.header("달력 형식의 청소 스케줄")
+
+    if st.session_state.get("calendar_mode") == "브라우저":
+        payload = schedule_payload(result, start_date, end_date)
+        components.html(client_calendar_html(payload, "schedule", 600, API_URL), height=600)
+        return
+
+    # 휴가 데이터가 바뀌지 않았으면 이전에 만든 달력 HTML 을 다시 사용
+    cache_key = (job_id, start_date, end_date, vacation_store.version)
+    if output.get("calendar_key") != cache_key:
+        vacation_data = vacation_store.select(start_date, end_date, TEAM_MEMBERS)
+        output["calendars"] = []
+        current_month = start_date
+        while current_month <= end_date:
+            calendar_html = create_interactive_calendar_html(
+                current_month.year, current_month.month, output["schedule"], vacation_data, workers
+            )
+            # CSS, JavaScript, 그리고 달력 HTML
+            output["calendars"].append(
+                f"""
+            <style>
+                .calendar {{
+                    font-family: Arial, sans-serif;
+                    max-width: 800px;
+                    margin: 0 auto;
+                }}
+                .calendar table {{
+                    width: 100%;
+                    border-collapse: collapse;
+                }}
+                .calendar th, .calendar td {{
+                    border: 1px solid #ddd;
+                    padding: 5px;
+                    text-align: center;
+                }}
+                .calendar .date {{
+                    font-weight: bold;
+                }}
+                .calendar .zone-a {{
+                    color: #4CAF50;
+                }}
+                .calendar .zone-b {{
+                    color: #2196F3;
+                }}
+                .calendar .vacation-select {{
+                    font-size: 0.8em;
+                }}
+                .calendar .vacation-select label {{
+                    display: block;
+                }}
+            </style>
+            <script>
+                let vacationData = {json.dumps(vacation_data)};
+
+                function updateVacation(date, worker, isChecked) {{
+                    if (!vacationData[date]) {{
+                        vacationData[date] = [];
+                    }}
+                    if (isChecked) {{
+                        if (!vacationData[date].includes(worker)) {{
+                            vacationData[date].push(worker);
+                        }}
+                    }} else {{
+                        vacationData[date] = vacationData[date].filter(w => w !== worker);
+                    }}
+
+                    // Streamlit에 데이터 전송
+                    window.parent.postMessage({{
+                        type: "streamlit:setComponentValue",
+                        value: JSON.stringify({{
+                            vacation_days: vacationData
+                        }})
+                    }}, "*");
+                }}
+
+                function initializeCheckboxes() {{
+                    document.querySelectorAll('.vacation-select input[type="checkbox"]').forEach(checkbox => {{
+                        checkbox.addEventListener('change', (e) => {{
+                            const date = e.target.closest('.day').dataset.date;
+                            const worker = e.target.value;
+                            updateVacation(date, worker, e.target.checked);
+                        }});
+                    }});
+                }}
+
+                // DOMContentLoaded 이벤트를 사용하여 페이지 로드 완료 후 초기화
+                document.addEventListener('DOMContentLoaded', initializeCheckboxes);
+
+                // 변경사항이 있을 때마다 Streamlit에 알림
+                new MutationObserver(() => {{
+                    window.parent.postMessage({{
+                        type: "streamlit:componentReady",
+                        value: true
+                    }}, "*");
+                }}).observe(document.body, {{subtree: true, childList: true}});
+            </script>
+            {calendar_html}
+            """
+            )
+            current_month += timedelta(days=32)
+            current_month = current_month.replace(day=1)
+        output["calendar_key"] = cache_key
+
+    for calendar_html in output["calendars"]:
+        components.html(calendar_html, height=470)
+
+
+def create_app():
+
+    # Get the current date
+    today = datetime.today()
+    current_year = today.year
+    current_month = today.month
+    get_flask_service()
+
+    # Streamlit app starts here
+    st.title("청소 스케줄 최적화")
+
+    # User selects the year and month
+    col1, col2 = st.columns(2)
+
+    with col1:
+        selected_year = st.number_input("년도 선택", min_value=2000, max_value=2100, value=current_year)
+
+    with col2:
+        selected_month = st.selectbox("월 선택", list(range(1, 13)), index=current_month - 1)
+
+    start_of_month, end_of_month = get_month_start_end(selected_year, selected_month)
+
+    # Create two columns for the date inputs
+    col1, col2 = st.columns(2)
+
+    with col1:
+        start_date = st.date_input("시작 날짜", start_of_month)
+
+    with col2:
+        end_date = st.date_input("종료 날짜", end_of_month)
+    st.session_state["start_of_month"] = start_date.strftime("%Y-%m-%d")
+    st.session_state["end_of_month"] = end_date.strftime("%Y-%m-%d")
+    sidebar()
+
+    vacation_calendar_fragment(start_date, end_date)
 
     # if st.button('Vacation Data 출력'):
     #     st.rerun()
-    # st.write("Vacation Data:", vacation_data)
-    vacation_data = load_vacation_data()
 
     # 스케줄 최적화 버튼
     # 기간 내 공휴일 필터링
@@ -806,152 +1017,25 @@ def create_app():
     )
 
     if st.button("스케줄 최적화"):
-        # 스케줄 생성
-        schedule = generate_schedule(start_date, end_date, workers, selected_holidays=selected_holidays)
-        # 최적화 실행
-        try:
-            output_schedule = solve_cleaning_schedule_logic(schedule, workers, vacation_data)
-        except Exception as e:
-            st.error(f"스케줄 생성 실패... 휴가일 조정이 필요해보입니다... {e}")
-
-        if output_schedule is None:
-            st.error("스케줄 생성 실패... 휴가일 조정이 필요해보입니다...")
-        if output_schedule:
-            st.success("스케줄 생성 성공!")
-            # 결과를 DataFrame으로 변환
-            results = []
-            for day in sorted(output_schedule.keys()):
-                results.append(
-                    {
-                        "날짜": day,
-                        "근무자": output_schedule[day]["workers"],
-                        "1구역(A)": output_schedule[day]["zone_A"],
-                        "2구역(B)": output_schedule[day]["zone_B"],
-                    }
-                )
-            df = pd.DataFrame(results)
-
-            # 결과 표시
-            with st.expander("최적화된 청소 스케줄"):
-                st.dataframe(df, height=400, use_container_width=True)  # DataFrame 크기 조정
-            # 청소 횟수 통계 표시
-            with st.expander("청소 횟수 통계"):
-
-                stats = {}
-                for worker in workers:
-                    stats[worker] = {
-                        "1구역(A) 총 횟수": df["1구역(A)"].str.contains(worker).sum(),
-                        "2구역(B) 총 횟수": df["2구역(B)"].str.contains(worker).sum(),
-                        "2구역(B) 혼자": df[df["2구역(B)"].str.split(", ").str.len() == 1]["2구역(B)"]
-                        .str.contains(worker)
-                        .sum(),
-                        "2구역(B) 2명 이상": df[df["2구역(B)"].str.split(", ").str.len() > 1]["2구역(B)"]
-                        .str.contains(worker)
-                        .sum(),
-                    }
-
-                stats_df = pd.DataFrame(stats).T
-                st.dataframe(stats_df, height=300, use_container_width=True)  # 통계 DataFrame 크기 조정
-
-            # 달력 표시
-            st.header("달력 형식의 청소 스케줄")
-
-            # 시작 월과 종료 월 계산
-
-            current_month = start_month
-            while current_month <= end_month:
-                calendar_html = create_interactive_calendar_html(
-                    current_month.year, current_month.month, output_schedule, vacation_data, workers
-                )
-
-                # CSS, JavaScript, 그리고 달력 HTML을 함께 렌더링
-                components.html(
-                    f"""
-                <style>
-                    .calendar {{
-                        font-family: Arial, sans-serif;
-                        max-width: 800px;
-                        margin: 0 auto;
-                    }}
-                    .calendar table {{
-                        width: 100%;
-                        border-collapse: collapse;
-                    }}
-                    .calendar th, .calendar td {{
-                        border: 1px solid #ddd;
-                        padding: 5px;
-                        text-align: center;
-                    }}
-                    .calendar .date {{
-                        font-weight: bold;
-                    }}
-                    .calendar .zone-a {{
-                        color: #4CAF50;
-                    }}
-                    .calendar .zone-b {{
-                        color: #2196F3;
-                    }}
-                    .calendar .vacation-select {{
-                        font-size: 0.8em;
-                    }}
-                    .calendar .vacation-select label {{
-                        display: block;
-                    }}
-                </style>
-                <script>
-                    let vacationData = {json.dumps(vacation_data)};
-                    
-                    function updateVacation(date, worker, isChecked) {{
-                        if (!vacationData[date]) {{
-                            vacationData[date] = [];
-                        }}
-                        if (isChecked) {{
-                            if (!vacationData[date].includes(worker)) {{
-                                vacationData[date].push(worker);
-                            }}
-                        }} else {{
-                            vacationData[date] = vacationData[date].filter(w => w !== worker);
-                        }}
-                        
-                        // Streamlit에 데이터 전송
-                        window.parent.postMessage({{
-                            type: "streamlit:setComponentValue",
-                            value: JSON.stringify({{
-                                vacation_days: vacationData
-                            }})
-                        }}, "*");
-                    }}
-                    
-                    function initializeCheckboxes() {{
-                        document.querySelectorAll('.vacation-select input[type="checkbox"]').forEach(checkbox => {{
-                            checkbox.addEventListener('change', (e) => {{
-                                const date = e.target.closest('.day').dataset.date;
-                                const worker = e.target.value;
-                                updateVacation(date, worker, e.target.checked);
-                            }});
-                        }});
-                    }}
-                    
-                    // DOMContentLoaded 이벤트를 사용하여 페이지 로드 완료 후 초기화
-                    document.addEventListener('DOMContentLoaded', initializeCheckboxes);
-                    
-                    // 변경사항이 있을 때마다 Streamlit에 알림
-                    new MutationObserver(() => {{
-                        window.parent.postMessage({{
-                            type: "streamlit:componentReady",
-                            value: true
-                        }}, "*");
-                    }}).observe(document.body, {{subtree: true, childList: true}});
-                </script>
-                {calendar_html}
-                """,
-                    height=470,
-                )
-
-                current_month += timedelta(days=32)
-                current_month = current_month.replace(day=1)
+        # 최적화는 백그라운드 작업으로 실행 (같은 입력이면 기존 작업을 그대로 사용)
+        vacation_data = load_vacation_data()
+        st.session_state.cleaning_job_period = (start_date, end_date)
+        st.session_state.cleaning_job_id = get_job_runner().submit(
+            "cleaning",
+            {
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": end_date.strftime("%Y-%m-%d"),
+                "workers": list(workers),
+                "vacations": vacation_data,
+                "selected_holidays": [day.strftime("%Y-%m-%d") for day in selected_holidays],
+                "zones": cleaning_zones.to_dict(),
+                "solver": "logic",
+                # 이전 기간까지 확정된 구역별 청소 횟수에서 시작 (기록이 없으면 0)
+                "offsets": get_fairness_ledger().team_offsets(TEAM_NAME, workers, start_date, kinds=("cleaning",)),
+            },
+        )
 
-    check_vacation_data_updates()
+    solver_output_fragment(start_date, end_date)
 
 
 def main():
@@ -999,8 +1083,7 @@ if __name__ == "__main__":
     # Cleanup function
     def cleanup():
         print("Cleaning up...")
-
-        # Add any cleanup code here (e.g., closing database connections)
+        stop_services()
 
     # Register the cleanup function
     atexit.register(cleanup)
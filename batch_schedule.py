@@ -0,0 +1,246 @@
+import argparse
+import io
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from fairness_ledger import LEDGER_DB_FILE, FairnessLedger
+from joint_schedule import merge_vacations
+from ical_feed import PUBLISH_DB_FILE, ScheduleFeeds
+from multi_team import SCHEDULERS, TeamJob, load_team_jobs, run_team_job, schedule_teams
+from schedule_archive import export_team_results, export_vacations
+from schedule_export import schedule_results, write_schedule_workbook
+from schedule_history import HISTORY_DB_FILE, ScheduleHistory
+from vacation_import import read_legacy_table
+from vacation_schema import is_vacation_database
+from vacation_store import get_vacation_database
+from work_calendar import WorkCalendar, kr_holidays
+from zone_model import load_zone_config
+
+# Streamlit 없이 스케줄을 생성하는 배치용 진입점 (cron 등에서 실행)
+# 예) python batch_schedule.py --start 2024-09-01 --end 2024-09-30 --workers 다솔,다혜,민지,한울 \
+#         --db vacation.db --team-name 팀장 --output-dir out --format xlsx
+
+
+def parse_date(value):
+    # "2024-09-01" 과 "20240901" 두 형식 모두 허용 (allocation.py 의 CSV 는 후자)
+    value = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"날짜 형식을 알 수 없습니다: {value}")
+
+
+def load_vacations_from_db(db_file, start_date, end_date):
+    # 앱의 통합 휴가 DB 에서 모든 팀을 한 번에 읽음: {팀: {날짜: [근무자, ...]}}
+    return get_vacation_database(db_file).select(start_date, end_date)
+
+
+def vacation_db_teams(db_file):
+    # 통합 휴가 DB 에 명단이 있는 팀 목록. 통합 DB 가 아니면 None (페이지별 파일에 새 테이블을 만들지 않음)
+    if not is_vacation_database(db_file):
+        return None
+    return get_vacation_database(db_file).teams()
+
+
+def load_vacations_from_legacy_db(db_file, table_name, start_date, end_date):
+    # 통합 전 페이지별 DB 파일 (읽기만 하고 파일은 바꾸지 않음)
+    vacations = {}
+    for date, worker in read_legacy_table(db_file, table_name) or []:
+        try:
+            date = parse_date(date)
+        except ValueError:
+            continue
+        if not start_date <= date <= end_date:
+            continue
+        workers = vacations.setdefault(date.strftime("%Y-%m-%d"), [])
+        if worker not in workers:
+            workers.append(worker)
+    return vacations
+
+
+def load_vacations_from_csv(path, start_date, end_date):
+    # Date, Worker 열을 가진 CSV (utf-8 이 아니면 cp949 로 읽기)
+    with open(path, "rb") as f:
+        contents = f.read()
+    try:
+        df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
+    except UnicodeDecodeError:
+        df = pd.read_csv(io.StringIO(contents.decode("cp949")))
+
+    vacations = {}
+    for date, worker in zip(df["Date"], df["Worker"]):
+        date = parse_date(date)
+        if start_date <= date <= end_date:
+            vacations.setdefault(date.strftime("%Y-%m-%d"), []).append(worker)
+    return vacations
+
+
+def write_results(team, results, output_dir, fmt):
+    # 팀별로 스케줄러 결과를 파일로 저장 (xlsx: 스케줄러별 시트, csv/json: 스케줄러별 파일)
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    if fmt == "xlsx":
+        path = os.path.join(output_dir, f"{team}.xlsx")
+        write_schedule_workbook(path, [(team, results)], by_month=False)
+        written.append(path)
+        return written
+
+    for kind, result in results.items():
+        if result is None:
+            continue
+        path = os.path.join(output_dir, f"{team}_{kind}.{fmt}")
+        if fmt == "csv":
+            result.to_frame().to_csv(path, index=False, encoding="utf-8-sig")
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(result.to_json())
+        written.append(path)
+    return written
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="청소 / 환경팀 / 업무 배치 스케줄 일괄 생성")
+    parser.add_argument("--start", required=True, type=parse_date, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, type=parse_date, help="종료 날짜 (YYYY-MM-DD)")
+
+    roster = parser.add_mutually_exclusive_group(required=True)
+    roster.add_argument("--workers", help="쉼표로 구분한 팀원 목록")
+    roster.add_argument("--teams", help="여러 팀 설정 JSON 파일 (multi_team.load_team_jobs 형식)")
+    parser.add_argument("--team-name", default="team", help="--workers 사용 시 팀 이름 (결과 파일 이름, --db 의 팀)")
+
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="휴가 데이터 SQLite 파일 (앱의 통합 DB, 팀 이름으로 구분)")
+    source.add_argument("--vacations", help="휴가 데이터 CSV 파일 (Date, Worker 열)")
+    parser.add_argument("--table", help="--db 가 통합 전 페이지별 파일이면 그 휴가 테이블 이름 (모든 팀에 적용)")
+
+    parser.add_argument("--holidays", default="", help="쉬는 날로 처리할 날짜 (쉼표 구분)")
+    parser.add_argument("--kr-holidays", action="store_true", help="기간 내 모든 공휴일을 쉬는 날로 처리")
+    # --teams 와 함께 주면 팀 설정 파일에 해당 항목이 없는 팀의 기본값
+    parser.add_argument("--schedulers", default=",".join(SCHEDULERS), help="실행할 스케줄러 (cleaning,shifts,tasks)")
+    parser.add_argument("--zones", help="청소 구역 설정 JSON 파일")
+    parser.add_argument("--cleaning-solver", choices=["logic", "cp_sat"], default="logic")
+    parser.add_argument("--joint", action="store_true", help="청소와 업무를 합친 부담이 고르게 함께 배정 (그리디 청소)")
+    parser.add_argument("--processes", type=int, default=None, help="여러 팀을 병렬로 처리할 프로세스 수")
+    parser.add_argument("--output-dir", default="schedules")
+    parser.add_argument("--format", choices=["xlsx", "csv", "json"], default="xlsx")
+    parser.add_argument("--workbook", help="모든 팀 결과를 팀 × 스케줄 × 월 시트로 모은 엑셀 파일 경로")
+    parser.add_argument("--archive", help="휴가/스케줄/통계를 팀·월 단위 열 기반 파일로 보관할 폴더")
+    parser.add_argument("--archive-format", choices=["parquet", "feather"], default="parquet")
+    parser.add_argument("--publish", action="store_true", help="결과를 근무자별 캘린더(.ics) 구독용으로 게시")
+    parser.add_argument("--publish-db", default=PUBLISH_DB_FILE, help="게시본을 저장할 SQLite 파일 (앱과 같은 파일)")
+    parser.add_argument("--fairness", action="store_true", help="이전 기간까지 확정된 누적 횟수에서 시작")
+    parser.add_argument("--accept", action="store_true", help="결과를 확정해 누적 횟수에 반영")
+    parser.add_argument("--ledger-db", default=LEDGER_DB_FILE, help="누적 횟수 SQLite 파일 (앱과 같은 파일)")
+    parser.add_argument("--history-db", default=HISTORY_DB_FILE, help="--accept 한 스케줄 이력 SQLite 파일")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # vacations: 모든 팀에 적용, team_vacations: 팀별 (통합 DB)
+    vacations, team_vacations = {}, {}
+    if args.db and args.table:
+        vacations = load_vacations_from_legacy_db(args.db, args.table, args.start, args.end)
+    elif args.db:
+        teams = vacation_db_teams(args.db)
+        if teams is None:
+            parser.error(f"{args.db} 는 통합 휴가 DB 가 아닙니다 (통합 전 파일이면 --table 로 테이블 이름을 지정)")
+        if args.workers and args.team_name not in teams:
+            parser.error(f"--team-name {args.team_name} 의 휴가가 {args.db} 에 없습니다 (DB 의 팀: {', '.join(teams) or '없음'})")
+        team_vacations = load_vacations_from_db(args.db, args.start, args.end)
+    elif args.vacations:
+        vacations = load_vacations_from_csv(args.vacations, args.start, args.end)
+
+    selected_holidays = [parse_date(day) for day in args.holidays.split(",") if day.strip()]
+    if args.kr_holidays:
+        selected_holidays += [day for day in WorkCalendar(args.start, args.end).dates if day in kr_holidays]
+
+    schedulers = [name.strip() for name in args.schedulers.split(",") if name.strip()]
+    if args.teams:
+        jobs = load_team_jobs(
+            args.teams,
+            team_vacations,
+            vacations,
+            schedulers=schedulers,
+            zone_config=load_zone_config(args.zones),
+            cleaning_solver=args.cleaning_solver,
+        )
+    else:
+        jobs = [
+            TeamJob(
+                args.team_name,
+                [worker.strip() for worker in args.workers.split(",") if worker.strip()],
+                vacations=merge_vacations(vacations, team_vacations.get(args.team_name, {})),
+                schedulers=schedulers,
+                zone_config=load_zone_config(args.zones),
+                cleaning_solver=args.cleaning_solver,
+            )
+        ]
+
+    if args.joint:
+        # 함께 배정은 그리디 청소만 지원 (cp_sat 을 조용히 그리디로 바꾸지 않음)
+        cp_sat_teams = [job.name for job in jobs if job.cleaning_solver == "cp_sat"]
+        if cp_sat_teams:
+            parser.error(f"--joint 는 cp_sat 청소 솔버와 함께 쓸 수 없습니다: {', '.join(cp_sat_teams)}")
+        for job in jobs:
+            job.joint = True
+
+    ledger = FairnessLedger(args.ledger_db) if args.fairness or args.accept else None
+    if args.fairness:
+        for job in jobs:
+            job.offsets = ledger.team_offsets(job.name, job.members, args.start, kinds=job.schedulers)
+
+    # 한 팀이면 프로세스 풀 없이 바로 실행
+    if len(jobs) == 1:
+        calendar = WorkCalendar(args.start, args.end, selected_holidays)
+        team_results = [(jobs[0].name, run_team_job(jobs[0], calendar))]
+    else:
+        team_results = schedule_teams(jobs, args.start, args.end, selected_holidays, max_workers=args.processes)
+
+    # schedule_teams 는 끝나는 팀부터 돌려주는 제너레이터이므로 성공한 결과를 따로 모아 둠
+    exit_code = 0
+    succeeded = []
+    for team, results in team_results:
+        if "error" in results:
+            print(f"[{team}] 스케줄 생성 실패: {results['error']}")
+            exit_code = 1
+            continue
+        for path in write_results(team, results, args.output_dir, args.format):
+            print(f"[{team}] {path}")
+        succeeded.append((team, results))
+
+    if args.workbook:
+        write_schedule_workbook(args.workbook, succeeded)
+        print(f"[전체] {args.workbook}")
+
+    if args.archive:
+        # 이번 기간의 월만 덮어씀 (기간 안에서 비게 된 월의 기존 파일은 지움)
+        export_team_results(args.archive, succeeded, args.archive_format, args.start, args.end)
+        for job in jobs:
+            export_vacations(args.archive, job.vacations, job.name, args.archive_format, args.start, args.end)
+        print(f"[보관] {args.archive}")
+
+    if args.accept:
+        history = ScheduleHistory(args.history_db)
+        for team, kind, result in schedule_results(succeeded):
+            ledger.accept(team, result, args.start, args.end)
+            version = history.record(team, result, args.start, args.end)
+            print(f"[확정] {team} {kind} (이력 버전 {version})")
+
+    if args.publish:
+        # 팀 / 스케줄 종류별로 게시 (앱의 /ical/<근무자>.ics 구독 주소에 반영)
+        feeds = ScheduleFeeds(args.publish_db)
+        for team, kind, result in schedule_results(succeeded):
+            version = feeds.publish(team, kind, result)
+            print(f"[게시] {team} {kind} (버전 {version})")
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
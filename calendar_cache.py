@@ -0,0 +1,78 @@
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+
+# 서버에서 만드는 달력 HTML 캐시
+# - 달의 뼈대(주 단위 날짜 배치, 날짜 문자열)는 (연, 월) 마다 한 번만 계산
+# - 달력 조각은 (종류, 연, 월, 근무자, 그 달의 데이터) 를 키로 저장
+#   → 그 달에 해당 근무자의 휴가나 스케줄이 바뀌었을 때만 다시 만듭니다.
+
+WEEKDAY_HEADER = "<tr><th>Mon</th><th>Tue</th><th>Wed</th><th>Thu</th><th>Fri</th><th>Sat</th><th>Sun</th></tr>"
+
+
+@lru_cache(maxsize=None)
+def month_skeleton(year, month):
+    # ((일, date, "YYYY-MM-DD", 요일 인덱스) 또는 None, ...) 의 주 단위 튜플
+    weeks = []
+    for week in calendar.monthcalendar(year, month):
+        cells = []
+        for day_index, day in enumerate(week):
+            if day == 0:
+                cells.append(None)
+            else:
+                day_date = date(year, month, day)
+                cells.append((day, day_date, day_date.strftime("%Y-%m-%d"), day_index))
+        weeks.append(tuple(cells))
+    return tuple(weeks)
+
+
+def month_days(year, month):
+    # 그 달의 날짜 칸만 순서대로
+    return [cell for week in month_skeleton(year, month) for cell in week if cell is not None]
+
+
+def render_weeks(year, month, render_day, empty_cell="<td></td>"):
+    # render_day(day, date, date_str, day_index) -> "<td>...</td>"
+    parts = []
+    for week in month_skeleton(year, month):
+        parts.append("<tr>")
+        for cell in week:
+            parts.append(empty_cell if cell is None else render_day(*cell))
+        parts.append("</tr>")
+    return "".join(parts)
+
+
+class FragmentCache:
+    # 오래 안 쓴 조각부터 지우는 LRU (Streamlit 세션들이 함께 사용하므로 lock 사용)
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.fragments = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self.lock:
+            if key in self.fragments:
+                self.fragments.move_to_end(key)
+                return self.fragments[key]
+
+        html = build()
+        with self.lock:
+            self.fragments[key] = html
+            if len(self.fragments) > self.max_entries:
+                self.fragments.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self.lock:
+            self.fragments.clear()
+
+
+_fragment_cache = FragmentCache()
+
+
+def cached_fragment(key, build):
+    # key 에는 조각을 만드는 데 쓰인 데이터가 모두 들어가야 합니다. 예:
+    # cached_fragment(("vacation", 2024, 9, "다솔", (3, 4)), lambda: build(...))
+    return _fragment_cache.get_or_build(key, build)
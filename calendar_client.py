@@ -0,0 +1,218 @@
+import base64
+import json
+from datetime import datetime
+
+import numpy as np
+
+# 달력을 서버에서 HTML 로 만들지 않고, 압축 JSON 만 보내 브라우저에서 그리는 모드
+# - 휴가 달력: 근무자별 휴가 여부를 날짜 비트로 압축 (np.packbits → base64)
+# - 청소 스케줄 달력: ScheduleResult 의 (날짜, 근무자, 구역) 정수 배열을 그대로 전달
+# 화면에 보이는 달력만 DOM 으로 만들고 스크롤로 벗어나면 지웁니다 (IntersectionObserver).
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        return day.date()
+    return day
+
+
+def vacation_payload(workers, start_date, end_date, vacations):
+    workers = list(workers)
+    start = start_date.toordinal()
+    n_days = end_date.toordinal() - start + 1
+    worker_index = {worker: i for i, worker in enumerate(workers)}
+
+    bits = np.zeros((len(workers), n_days), dtype=bool)
+    for day, day_workers in vacations.items():
+        d = _to_date(day).toordinal() - start
+        if not 0 <= d < n_days:
+            continue
+        for worker in day_workers:
+            if worker in worker_index:
+                bits[worker_index[worker], d] = True
+
+    packed = np.packbits(bits, axis=1)
+    return {
+        "start": start_date.strftime("%Y-%m-%d"),
+        "days": n_days,
+        "workers": workers,
+        "vacation": [base64.b64encode(row.tobytes()).decode("ascii") for row in packed],
+    }
+
+
+def schedule_payload(result, start_date, end_date):
+    # result: ScheduleResult (청소). 기간 밖의 배정은 보내지 않음
+    start, end = start_date.toordinal(), end_date.toordinal()
+    mask = (result.days >= start) & (result.days <= end)
+    return {
+        "start": start_date.strftime("%Y-%m-%d"),
+        "days": end - start + 1,
+        "workers": result.workers,
+        "roles": result.roles,
+        "d": (result.days[mask] - start).tolist(),
+        "w": result.worker_ids[mask].tolist(),
+        "r": result.role_ids[mask].tolist(),
+    }
+
+
+_CALENDAR_TEMPLATE = """
+<style>
+    #calendar-root { overflow: auto; max-height: __HEIGHT__px; font-family: Arial, sans-serif; }
+    .month-row { display: flex; flex-wrap: nowrap; }
+    .cell { flex: 0 0 auto; width: __CELL_WIDTH__px; height: __CELL_HEIGHT__px; margin: 0 10px 20px 0; }
+    .calendar table { border-collapse: collapse; width: 100%; }
+    .calendar th, .calendar td { border: 1px solid #ddd; padding: 5px; text-align: center; vertical-align: top; }
+    .calendar .date { font-weight: bold; }
+    .calendar .vacation { background-color: #ffcccb; }
+    .calendar .day { cursor: pointer; }
+    .calendar .zone-0 { color: #4CAF50; }
+    .calendar .zone-1 { color: #2196F3; }
+    .calendar .zone-2 { color: #FF9800; }
+</style>
+<div id="calendar-root"></div>
+<script>
+    const data = __PAYLOAD__;
+    const mode = "__MODE__";
+    const DAY = 86400000;
+    const start = Date.parse(data.start + "T00:00:00Z");
+    const weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"];
+    const monthNames = ["January", "February", "March", "April", "May", "June", "July",
+                        "August", "September", "October", "November", "December"];
+
+    function dayOffset(y, m, d) { return (Date.UTC(y, m, d) - start) / DAY; }
+    function dateString(offset) { return new Date(start + offset * DAY).toISOString().slice(0, 10); }
+
+    // 휴가 비트 (근무자별 Uint8Array, 큰 비트부터)
+    const bits = (data.vacation || []).map(b => Uint8Array.from(atob(b), c => c.charCodeAt(0)));
+    function isVacation(w, d) {
+        return d >= 0 && d < data.days && (bits[w][d >> 3] & (0x80 >> (d & 7))) !== 0;
+    }
+    function setVacation(w, d, on) {
+        if (on) { bits[w][d >> 3] |= (0x80 >> (d & 7)); } else { bits[w][d >> 3] &= ~(0x80 >> (d & 7)); }
+    }
+
+    // 날짜별 구역 배정 {offset: {role: [이름, ...]}}
+    const byDay = {};
+    (data.d || []).forEach((d, i) => {
+        const roles = byDay[d] || (byDay[d] = {});
+        (roles[data.r[i]] || (roles[data.r[i]] = [])).push(data.workers[data.w[i]]);
+    });
+
+    function monthTable(y, m, title, fillDay) {
+        const box = document.createElement("div");
+        box.className = "calendar";
+        const heading = document.createElement(mode === "vacation" ? "h3" : "h2");
+        heading.textContent = title;
+        box.appendChild(heading);
+        const table = document.createElement("table");
+        table.insertRow().innerHTML = weekdays.map(w => "<th>" + w + "</th>").join("");
+        const lead = (new Date(Date.UTC(y, m, 1)).getUTCDay() + 6) % 7;
+        const last = new Date(Date.UTC(y, m + 1, 0)).getUTCDate();
+        let row = table.insertRow();
+        for (let i = 0; i < lead; i++) { row.insertCell(); }
+        for (let d = 1; d <= last; d++) {
+            if (row.cells.length === 7) { row = table.insertRow(); }
+            const td = row.insertCell();
+            td.innerHTML = "<div class='date'>" + d + "</div>";
+            fillDay(td, dayOffset(y, m, d));
+        }
+        while (row.cells.length < 7) { row.insertCell(); }
+        box.appendChild(table);
+        return box;
+    }
+
+    function fill(cell) {
+        const y = +cell.dataset.year, m = +cell.dataset.month;
+        if (mode === "vacation") {
+            const w = +cell.dataset.worker;
+            cell.appendChild(monthTable(y, m, data.workers[w] + " - " + monthNames[m] + " " + y, (td, d) => {
+                td.className = "day" + (isVacation(w, d) ? " vacation" : "");
+                td.dataset.offset = d;
+                td.dataset.worker = w;
+            }));
+        } else {
+            cell.appendChild(monthTable(y, m, monthNames[m] + " " + y, (td, d) => {
+                td.className = "day";
+                const roles = byDay[d];
+                if (!roles) { return; }
+                data.roles.forEach((role, r) => {
+                    const line = document.createElement("div");
+                    line.className = "zone-" + r;
+                    line.textContent = role + ": " + (roles[r] || []).join(", ");
+                    td.appendChild(line);
+                });
+            }));
+        }
+    }
+
+    // 보이는 달력만 DOM 으로 유지
+    const root = document.getElementById("calendar-root");
+    const observer = new IntersectionObserver(entries => entries.forEach(entry => {
+        const cell = entry.target;
+        if (entry.isIntersecting && !cell.firstChild) { fill(cell); }
+        if (!entry.isIntersecting && cell.firstChild) { cell.textContent = ""; }
+    }), { root: root, rootMargin: "400px" });
+
+    const months = [];
+    const cursor = new Date(start);
+    cursor.setUTCDate(1);
+    while (cursor.getTime() <= start + (data.days - 1) * DAY) {
+        months.push([cursor.getUTCFullYear(), cursor.getUTCMonth()]);
+        cursor.setUTCMonth(cursor.getUTCMonth() + 1);
+    }
+    const columns = mode === "vacation" ? data.workers.map((_, w) => w) : [null];
+    months.forEach(([y, m]) => {
+        const row = document.createElement("div");
+        row.className = "month-row";
+        columns.forEach(w => {
+            const cell = document.createElement("div");
+            cell.className = "cell";
+            cell.dataset.year = y;
+            cell.dataset.month = m;
+            if (w !== null) { cell.dataset.worker = w; }
+            row.appendChild(cell);
+            observer.observe(cell);
+        });
+        root.appendChild(row);
+    });
+
+    // 휴가 토글: 달력마다 리스너를 달지 않고 한 곳에서 처리
+    if (mode === "vacation") {
+        root.addEventListener("click", event => {
+            const td = event.target.closest("td.day");
+            if (!td) { return; }
+            const w = +td.dataset.worker, d = +td.dataset.offset;
+            const on = !td.classList.contains("vacation");
+            fetch("__API_URL__/save-vacation", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ date: dateString(d), worker: data.workers[w], action: on ? "add" : "remove" }),
+                credentials: "omit"
+            })
+            .then(response => response.json())
+            .then(() => {
+                if (d >= 0 && d < data.days) { setVacation(w, d, on); }
+                td.classList.toggle("vacation", on);
+            })
+            .catch(error => console.error("Error:", error));
+        });
+    }
+</script>
+"""
+
+
+def client_calendar_html(payload, mode="vacation", height=600, api_url="http://127.0.0.1:8000"):
+    # mode: "vacation" (근무자별 휴가 달력) 또는 "schedule" (청소 구역 달력)
+    cell_width, cell_height = (240, 260) if mode == "vacation" else (800, 460)
+    payload_json = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    # 근무자 이름에 자리표시자 문자열이 들어 있어도 바뀌지 않도록 payload 는 마지막에 넣음
+    return (
+        _CALENDAR_TEMPLATE.replace("__MODE__", mode)
+        .replace("__HEIGHT__", str(height))
+        .replace("__CELL_WIDTH__", str(cell_width))
+        .replace("__CELL_HEIGHT__", str(cell_height))
+        .replace("__API_URL__", api_url)
+        .replace("__PAYLOAD__", payload_json)
+    )
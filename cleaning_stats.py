@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from zone_model import DEFAULT_ZONE_CONFIG
+
+
+def compute_cleaning_stats(day_idx, worker_idx, zone_idx, workers, zone_config=DEFAULT_ZONE_CONFIG):
+    # 근무자별·구역별 총 횟수, 혼자 청소한 횟수, 2명 이상 청소한 횟수를 bincount 한 번씩으로 계산
+    n_workers = len(workers)
+    n_zones = len(zone_config)
+    n_days = int(day_idx.max()) + 1 if len(day_idx) else 0
+
+    worker_zone = worker_idx.astype(np.int64) * n_zones + zone_idx
+    day_zone = day_idx.astype(np.int64) * n_zones + zone_idx
+
+    # 같은 날 같은 구역에 배정된 인원 수
+    group_size = np.bincount(day_zone, minlength=n_days * n_zones)[day_zone]
+
+    size = n_workers * n_zones
+    total = np.bincount(worker_zone, minlength=size).reshape(n_workers, n_zones)
+    solo = np.bincount(worker_zone[group_size == 1], minlength=size).reshape(n_workers, n_zones)
+    multi = np.bincount(worker_zone[group_size > 1], minlength=size).reshape(n_workers, n_zones)
+
+    columns = {}
+    for z, zone in enumerate(zone_config.zones):
+        columns[f"{zone.label} 총 횟수"] = total[:, z]
+        if zone.is_remainder:
+            continue
+        columns[f"{zone.label} 혼자"] = solo[:, z]
+        columns[f"{zone.label} 2명 이상"] = multi[:, z]
+
+    return pd.DataFrame(columns, index=list(workers))
+
+
+def cleaning_stats(result, workers=None, zone_config=DEFAULT_ZONE_CONFIG):
+    # ScheduleResult(청소) -> 근무자별 청소 통계 DataFrame (Flask API, 엑셀 내보내기 등에서 재사용)
+    zone_of_role = np.array([zone_config.names.index(role) for role in result.roles], dtype=np.int8)
+    stats = compute_cleaning_stats(
+        result.day_index(), result.worker_ids, zone_of_role[result.role_ids], result.workers, zone_config
+    )
+    return stats if workers is None else stats.loc[list(workers)]
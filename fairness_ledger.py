@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# 확정된 스케줄의 근무자별 누적 횟수 (여러 달에 걸친 공평성)
+# - accept(): 확정한 스케줄의 (근무자, 역할) 별 횟수를 기간 단위로 기록. 같은 기간을 다시 확정하면 교체
+# - offsets(): 새 기간 시작 전까지의 누적 횟수를 스케줄러의 시작값으로 사용
+#   → 한 달씩 짧게 풀어도 몇 달에 걸쳐 횟수가 고르게 맞춰짐
+LEDGER_DB_FILE = "fairness_ledger.db"
+LEDGER_TABLE_NAME = "fairness_ledger"
+LEDGER_KINDS = ("cleaning", "shifts", "tasks")
+
+
+def _ordinal(day):
+    if isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.toordinal()
+
+
+def duty_counts(result):
+    # ScheduleResult -> [(근무자, 역할, 횟수, 혼자 한 횟수)] (횟수가 있는 것만)
+    # 혼자 한 횟수: 그날 그 역할에 배정된 사람이 한 명뿐인 경우 (청소 구역의 solo_cleaning_count 와 같은 기준)
+    n_workers, n_roles = len(result.workers), len(result.roles)
+    if len(result) == 0:
+        return []
+    slots = result.days.astype(np.int64) * n_roles + result.role_ids
+    _, inverse, slot_sizes = np.unique(slots, return_inverse=True, return_counts=True)
+    cells = result.worker_ids.astype(np.int64) * n_roles + result.role_ids
+    counts = np.bincount(cells, minlength=n_workers * n_roles)
+    solo = np.bincount(cells, weights=slot_sizes[inverse] == 1, minlength=n_workers * n_roles).astype(np.int64)
+    return [
+        (result.workers[cell // n_roles], result.roles[cell % n_roles], int(counts[cell]), int(solo[cell]))
+        for cell in np.flatnonzero(counts)
+    ]
+
+
+class FairnessLedger:
+    def __init__(self, db_file=LEDGER_DB_FILE):
+        self.db_file = db_file
+        self.init_db()
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {LEDGER_TABLE_NAME} (
+                team TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                period_start INTEGER NOT NULL,
+                period_end INTEGER NOT NULL,
+                worker TEXT NOT NULL,
+                role TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                solo INTEGER NOT NULL,
+                accepted_at REAL NOT NULL,
+                PRIMARY KEY (team, kind, period_start, worker, role)
+            )
+        """
+        )
+        c.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{LEDGER_TABLE_NAME}_period "
+            f"ON {LEDGER_TABLE_NAME} (team, kind, period_end)"
+        )
+        conn.commit()
+        conn.close()
+
+    def accept(self, team, result, start_date=None, end_date=None):
+        # 기간을 주지 않으면 배정이 있는 첫날 ~ 마지막 날. 겹치는 기간의 기존 기록은 지우고 새로 기록
+        if len(result) == 0 and (start_date is None or end_date is None):
+            return 0
+        period_start = _ordinal(start_date) if start_date is not None else int(result.days.min())
+        period_end = _ordinal(end_date) if end_date is not None else int(result.days.max())
+        if len(result) and (int(result.days.min()) < period_start or int(result.days.max()) > period_end):
+            raise ValueError("스케줄에 확정할 기간 밖의 날짜가 있습니다")
+        accepted_at = time.time()
+        rows = [
+            (team, result.kind, period_start, period_end, worker, role, count, solo, accepted_at)
+            for worker, role, count, solo in duty_counts(result)
+        ]
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"DELETE FROM {LEDGER_TABLE_NAME} WHERE team = ? AND kind = ? AND period_start <= ? AND period_end >= ?",
+            (team, result.kind, period_end, period_start),
+        )
+        c.executemany(f"INSERT INTO {LEDGER_TABLE_NAME} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def totals(self, team, kind, before=None):
+        # 누적 횟수 {근무자: {역할: (횟수, 혼자 한 횟수)}}. before 가 있으면 그 전에 끝난 기간만
+        query = f"SELECT worker, role, SUM(count), SUM(solo) FROM {LEDGER_TABLE_NAME} WHERE team = ? AND kind = ?"
+        params = [team, kind]
+        if before is not None:
+            query += " AND period_end < ?"
+            params.append(_ordinal(before))
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(query + " GROUP BY worker, role", params)
+        totals = {}
+        for worker, role, count, solo in c.fetchall():
+            totals.setdefault(worker, {})[role] = (count, solo)
+        conn.close()
+        return totals
+
+    def offsets(self, team, kind, workers, before=None, solo=False):
+        # 스케줄러 시작값 {근무자: {역할: 횟수}} (solo=True 이면 혼자 한 횟수)
+        # 기록이 없는 근무자(새로 온 사람)는 기록이 있는 사람들의 평균에서 시작하고,
+        # 역할마다 가장 적은 사람을 0 으로 맞춰 차이만 남김 (이번 기간의 횟수 계산이 커지지 않도록)
+        column = 1 if solo else 0
+        totals = self.totals(team, kind, before)
+        roles = sorted({role for counts in totals.values() for role in counts})
+        offsets = {worker: {} for worker in workers}
+        for role in roles:
+            known = {w: totals[w].get(role, (0, 0))[column] for w in workers if w in totals}
+            start = sum(known.values()) // len(known) if known else 0
+            values = {w: known.get(w, start) for w in workers}
+            low = min(values.values(), default=0)
+            for worker, value in values.items():
+                if value - low:
+                    offsets[worker][role] = value - low
+        return {worker: counts for worker, counts in offsets.items() if counts}
+
+    def team_offsets(self, team, workers, before=None, kinds=LEDGER_KINDS):
+        # multi_team.TeamJob(offsets=...) 형식: {"cleaning": ..., "cleaning_solo": ..., "shifts": ..., "tasks": ...}
+        offsets = {}  # 시작값이 모두 0 인 종류는 비어 있음
+        for kind in kinds:
+            offsets[kind] = self.offsets(team, kind, workers, before)
+            if kind == "cleaning":
+                offsets["cleaning_solo"] = self.offsets(team, kind, workers, before, solo=True)
+        return offsets
+
+
+_fairness_ledger = None
+_fairness_ledger_lock = threading.Lock()
+
+
+def get_fairness_ledger(db_file=LEDGER_DB_FILE):
+    # 프로세스 전체에서 하나만 사용
+    global _fairness_ledger
+    with _fairness_ledger_lock:
+        if _fairness_ledger is None:
+            _fairness_ledger = FairnessLedger(db_file)
+        return _fairness_ledger
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+try:
+    from waitress.server import create_server as create_waitress_server
+except ImportError:  # waitress 가 없으면 werkzeug 서버 + 스레드 풀 사용
+    create_waitress_server = None
+
+
+class _PooledWSGIServer(BaseWSGIServer):
+    # 요청마다 스레드를 새로 만들지 않고 정해진 개수의 스레드 풀에서 처리
+    def __init__(self, host, port, app, threads):
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="flask")
+        super().__init__(host, port, app)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class FlaskService:
+    # 내장 Flask API 서버 하나의 시작/종료를 관리 (Streamlit 에서는 st.cache_resource 로 한 번만 생성)
+    def __init__(self, app, host="127.0.0.1", port=8000, threads=8):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.threads = threads
+        self.server = None
+        self.server_name = None
+        self.thread = None
+        self.error = None
+        self.lock = threading.Lock()
+        # /health 등 라우트에서 서버 상태를 조회할 수 있도록 등록
+        app.extensions["flask_service"] = self
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return True
+            try:
+                if create_waitress_server is not None:
+                    self.server = create_waitress_server(self.app, host=self.host, port=self.port, threads=self.threads)
+                    self.server_name = "waitress"
+                    serve = self.server.run
+                else:
+                    self.server = _PooledWSGIServer(self.host, self.port, self.app, self.threads)
+                    self.server_name = "werkzeug"
+                    serve = self.server.serve_forever
+            except (OSError, SystemExit) as e:
+                # 다른 프로세스가 이미 포트를 사용 중 (werkzeug 는 이때 sys.exit 를 호출)
+                self.error = str(e)
+                print(f"Flask 서버를 시작하지 못했습니다 ({self.host}:{self.port}): {e}")
+                return False
+
+            self.thread = threading.Thread(target=serve, name="flask-service", daemon=True)
+            self.thread.start()
+            _services.append(self)
+            return True
+
+    def stop(self):
+        with self.lock:
+            if self.server is None:
+                return
+            if self.server_name == "waitress":
+                self.server.close()
+            else:
+                self.server.shutdown()
+                self.server.server_close()
+            if self.thread is not None:
+                self.thread.join(timeout=5)
+            self.server = None
+            self.thread = None
+
+    def health(self):
+        return {
+            "status": "ok" if self.running else "stopped",
+            "server": self.server_name,
+            "host": self.host,
+            "port": self.port,
+            "threads": self.threads,
+        }
+
+
+_services = []
+
+
+def stop_services():
+    # atexit 에서 호출: 시작된 서버를 모두 종료
+    for service in list(_services):
+        service.stop()
+    _services.clear()
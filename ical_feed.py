@@ -0,0 +1,175 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from schedule_export import KIND_LABELS
+from schedule_result import ScheduleResult
+
+# 게시된 스케줄을 근무자별 iCalendar(.ics) 구독 주소로 제공
+# - publish() 한 결과만 제공하고, 피드 요청 때 스케줄러를 다시 실행하지 않음
+# - 게시할 때마다 버전이 올라가고 ETag 는 (근무자, 해당 근무자가 포함된 게시본 버전들) 로 정해짐
+#   → 휴대폰 캘린더 앱이 주기적으로 확인해도 바뀌지 않았으면 304 로 끝남
+# - 피드 본문은 일정 하나씩 생성해 흘려보냄 (전체 문서를 메모리에 만들지 않음)
+PUBLISH_DB_FILE = "published_schedules.db"
+PUBLISH_TABLE_NAME = "published_schedules"
+PRODID = "-//ZoneCleaner//Schedule Feed//KO"
+
+
+def _escape(text):
+    # RFC 5545 TEXT 값 이스케이프
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line):
+    # 한 줄은 75 바이트 이하, 넘으면 줄바꿈 + 공백으로 이어씀 (UTF-8 글자 중간에서 자르지 않음)
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(worker, entries, calendar_name=None):
+    # entries: ScheduleFeeds.entries() 결과. 일정(VEVENT) 하나씩 문자열로 생성
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + _fold(f"PRODID:{PRODID}") + "CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n"
+    yield _fold(f"X-WR-CALNAME:{_escape(calendar_name or f'{worker} 스케줄')}")
+    worker_key = hashlib.sha1(worker.encode("utf-8")).hexdigest()[:12]
+    for team, kind, version, published_at, result in entries:
+        stamp = datetime.fromtimestamp(published_at, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        team_key = hashlib.sha1(f"{team}\0{kind}".encode("utf-8")).hexdigest()[:12]
+        mask = result.worker_mask(worker)
+        for day, role_id in zip(result.days[mask].tolist(), result.role_ids[mask].tolist()):
+            summary = f"{KIND_LABELS.get(kind, kind)} - {result.role_labels[role_id]}"
+            yield (
+                "BEGIN:VEVENT\r\n"
+                + _fold(f"UID:{team_key}-{day}-{result.roles[role_id]}-{worker_key}@zonecleaner")
+                + f"DTSTAMP:{stamp}\r\n"
+                + f"DTSTART;VALUE=DATE:{date.fromordinal(day).strftime('%Y%m%d')}\r\n"
+                + f"DTEND;VALUE=DATE:{date.fromordinal(day + 1).strftime('%Y%m%d')}\r\n"
+                + _fold(f"SUMMARY:{_escape(summary)}")
+                + _fold(f"DESCRIPTION:{_escape(team)}")
+                + "TRANSP:TRANSPARENT\r\nEND:VEVENT\r\n"
+            )
+    yield "END:VCALENDAR\r\n"
+
+
+class ScheduleFeeds:
+    # (팀, 스케줄 종류) 마다 마지막으로 게시된 ScheduleResult 하나
+    # SQLite 에 저장하므로 다른 프로세스(batch_schedule --publish 등)가 게시한 것도 제공됩니다.
+    def __init__(self, db_file=PUBLISH_DB_FILE):
+        self.db_file = db_file
+        self.results = {}  # (팀, 종류) -> (버전, 게시 시각, ScheduleResult)
+        self.lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {PUBLISH_TABLE_NAME} (
+                team TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                published_at REAL NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (team, kind)
+            )
+        """
+        )
+        conn.commit()
+        conn.close()
+
+    def publish(self, team, kind, result):
+        # 새 버전 번호를 돌려줌 (모든 게시본에서 하나씩 증가)
+        published_at = time.time()
+        data = result.to_json()
+        conn = sqlite3.connect(self.db_file, isolation_level=None)
+        c = conn.cursor()
+        try:
+            # 버전 읽기와 기록을 한 쓰기 트랜잭션으로 (앱과 batch_schedule --publish 가 동시에 게시해도 버전이 겹치지 않음)
+            c.execute("BEGIN IMMEDIATE")
+            c.execute(f"SELECT COALESCE(MAX(version), 0) + 1 FROM {PUBLISH_TABLE_NAME}")
+            version = c.fetchone()[0]
+            c.execute(
+                f"INSERT OR REPLACE INTO {PUBLISH_TABLE_NAME} (team, kind, version, published_at, result) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (team, kind, version, published_at, data),
+            )
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        with self.lock:
+            self.results[(team, kind)] = (version, published_at, result)
+        return version
+
+    def unpublish(self, team, kind):
+        conn = sqlite3.connect(self.db_file)
+        conn.execute(f"DELETE FROM {PUBLISH_TABLE_NAME} WHERE team = ? AND kind = ?", (team, kind))
+        conn.commit()
+        conn.close()
+        with self.lock:
+            self.results.pop((team, kind), None)
+
+    def _refresh(self):
+        # 버전 목록만 읽고, 바뀐 게시본만 다시 불러옴
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(f"SELECT team, kind, version, published_at FROM {PUBLISH_TABLE_NAME} ORDER BY team, kind")
+        rows = c.fetchall()
+        with self.lock:
+            known = {key: entry[0] for key, entry in self.results.items()}
+        stale = [(team, kind) for team, kind, version, _ in rows if known.get((team, kind)) != version]
+        loaded = {}
+        for team, kind in stale:
+            c.execute(
+                f"SELECT version, published_at, result FROM {PUBLISH_TABLE_NAME} WHERE team = ? AND kind = ?",
+                (team, kind),
+            )
+            row = c.fetchone()
+            if row is not None:
+                loaded[(team, kind)] = (row[0], row[1], ScheduleResult.from_json(row[2]))
+        conn.close()
+
+        with self.lock:
+            self.results.update(loaded)
+            current = {(team, kind) for team, kind, _, _ in rows}
+            for key in [key for key in self.results if key not in current]:
+                del self.results[key]
+            return [(team, kind) + self.results[(team, kind)] for team, kind in sorted(self.results)]
+
+    def entries(self, worker, team=None):
+        # 근무자가 포함된 게시본: [(팀, 종류, 버전, 게시 시각, ScheduleResult)]
+        return [entry for entry in self._refresh() if (team is None or entry[0] == team) and worker in entry[4].workers]
+
+    def workers(self):
+        # 게시본에 한 번이라도 나오는 근무자 (구독 주소 목록용)
+        return list(dict.fromkeys(worker for entry in self._refresh() for worker in entry[4].workers))
+
+    def etag(self, worker, entries):
+        versions = ",".join(f"{team}/{kind}/{version}" for team, kind, version, _, _ in entries)
+        return hashlib.sha1(f"{worker}\0{versions}".encode("utf-8")).hexdigest()[:20]
+
+
+_schedule_feeds = None
+_schedule_feeds_lock = threading.Lock()
+
+
+def get_schedule_feeds(db_file=PUBLISH_DB_FILE):
+    # 프로세스 전체에서 하나만 사용 (Streamlit 페이지와 Flask 스레드가 공유)
+    global _schedule_feeds
+    with _schedule_feeds_lock:
+        if _schedule_feeds is None:
+            _schedule_feeds = ScheduleFeeds(db_file)
+        return _schedule_feeds
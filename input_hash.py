@@ -0,0 +1,33 @@
+import hashlib
+import json
+from datetime import date, datetime
+
+
+def _canonical(value):
+    # 같은 입력이면 순서·타입 표현과 관계없이 같은 JSON 이 되도록 정규화
+    if isinstance(value, dict):
+        return {str(_canonical_key(k)): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=json.dumps)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    if hasattr(value, "tolist"):  # numpy 배열/스칼라
+        return value.tolist()
+    return value
+
+
+def _canonical_key(key):
+    if isinstance(key, (date, datetime)):
+        return key.strftime("%Y-%m-%d")
+    return key
+
+
+def canonical_json(value):
+    return json.dumps(_canonical(value), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def canonical_hash(value):
+    # 스케줄러 입력(근무자, 기간, 공휴일, 휴가, 규칙 등)의 정규화된 SHA-256 해시
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
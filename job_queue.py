@@ -0,0 +1,182 @@
+import json
+import multiprocessing
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from allocation_rules import load_allocation_rules
+from input_hash import canonical_hash
+from multi_team import TeamJob, run_team_job
+from work_calendar import WorkCalendar
+from zone_model import DEFAULT_ZONE_CONFIG, zone_config_from_dict
+
+# 스케줄 계산 작업 테이블
+JOB_DB_FILE = "solver_jobs.db"
+JOB_TABLE_NAME = "solver_jobs"
+
+PENDING_STATUSES = ("queued", "running")
+# 대기/실행 상태로 이 시간 넘게 갱신되지 않은 작업은 중단된 것으로 봄
+# (같은 DB 를 쓰는 다른 프로세스가 실행 중인 작업은 건드리지 않음)
+JOB_TIMEOUT_SECONDS = 30 * 60
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _stale_before():
+    return (datetime.now() - timedelta(seconds=JOB_TIMEOUT_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def init_job_db(db_file=JOB_DB_FILE):
+    conn = sqlite3.connect(db_file)
+    c = conn.cursor()
+    c.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {JOB_TABLE_NAME} (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            inputs_hash TEXT NOT NULL,
+            inputs TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """
+    )
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_{JOB_TABLE_NAME}_hash ON {JOB_TABLE_NAME} (inputs_hash)")
+    conn.commit()
+    conn.close()
+
+
+def update_job(db_file, job_id, **fields):
+    fields["updated_at"] = _now()
+    conn = sqlite3.connect(db_file)
+    c = conn.cursor()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    c.execute(f"UPDATE {JOB_TABLE_NAME} SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def run_schedule_job(kind, inputs):
+    # 작업 입력(JSON 으로 저장 가능한 값) -> ScheduleResult
+    start_date = datetime.strptime(inputs["start_date"], "%Y-%m-%d").date()
+    end_date = datetime.strptime(inputs["end_date"], "%Y-%m-%d").date()
+    selected_holidays = [datetime.strptime(day, "%Y-%m-%d").date() for day in inputs.get("selected_holidays", [])]
+    zones = inputs.get("zones")
+    # JSON 을 거치면 인원수 키가 문자열이 되므로 다시 정수로 변환
+    allocation_rules = inputs.get("allocation_rules")
+    job = TeamJob(
+        inputs.get("team", kind),
+        inputs["workers"],
+        vacations=inputs.get("vacations"),
+        schedulers=(kind,),
+        zone_config=zone_config_from_dict(zones) if zones else DEFAULT_ZONE_CONFIG,
+        allocation_rules=load_allocation_rules(default=allocation_rules) if allocation_rules else None,
+        cleaning_solver=inputs.get("solver", "logic"),
+        offsets=inputs.get("offsets"),
+    )
+    return run_team_job(job, WorkCalendar(start_date, end_date, selected_holidays))[kind]
+
+
+def _run_job(db_file, job_id, kind, inputs):
+    # 작업 프로세스에서 실행: 진행 상태와 결과를 작업 테이블에 직접 기록
+    # 끝난 작업(done / failed)은 결과와 관계없이 progress 1.0
+    update_job(db_file, job_id, status="running", progress=0.1)
+    try:
+        result = run_schedule_job(kind, inputs)
+    except Exception as e:
+        update_job(db_file, job_id, status="failed", progress=1.0, error=str(e))
+        return
+    if result is None:
+        update_job(db_file, job_id, status="failed", progress=1.0, error="스케줄을 생성할 수 없습니다.")
+        return
+    update_job(db_file, job_id, status="done", progress=1.0, result=result.to_json())
+
+
+class JobRunner:
+    # 프로세스 풀 기반 스케줄 계산 작업 실행기
+    # 같은 입력의 작업이 이미 대기/실행/완료 상태면 새로 계산하지 않고 기존 작업 id 를 돌려줍니다.
+    def __init__(self, db_file=JOB_DB_FILE, max_workers=2):
+        self.db_file = db_file
+        init_job_db(db_file)
+        # 이전 프로세스가 끝나면서 남은 미완료 작업(오래 갱신되지 않은 것만)은 실패로 정리
+        conn = sqlite3.connect(db_file)
+        c = conn.cursor()
+        c.execute(
+            f"UPDATE {JOB_TABLE_NAME} SET status = 'failed', progress = 1.0, error = ? "
+            "WHERE status IN (?, ?) AND updated_at < ?",
+            ("interrupted", *PENDING_STATUSES, _stale_before()),
+        )
+        conn.commit()
+        conn.close()
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self.lock = threading.Lock()
+
+    def submit(self, kind, inputs):
+        inputs_hash = canonical_hash({"kind": kind, "inputs": inputs})
+        with self.lock:
+            conn = sqlite3.connect(self.db_file)
+            c = conn.cursor()
+            # 오래 갱신되지 않은 대기/실행 작업은 중단된 것이므로 새로 계산
+            c.execute(
+                f"SELECT id FROM {JOB_TABLE_NAME} WHERE inputs_hash = ? "
+                "AND (status = 'done' OR (status IN (?, ?) AND updated_at >= ?)) ORDER BY created_at DESC LIMIT 1",
+                (inputs_hash, *PENDING_STATUSES, _stale_before()),
+            )
+            existing = c.fetchone()
+            if existing is not None:
+                conn.close()
+                return existing[0]
+
+            job_id = uuid.uuid4().hex
+            now = _now()
+            c.execute(
+                f"INSERT INTO {JOB_TABLE_NAME} (id, kind, inputs_hash, inputs, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, inputs_hash, json.dumps(inputs, ensure_ascii=False), now, now),
+            )
+            conn.commit()
+            conn.close()
+
+        future = self.executor.submit(_run_job, self.db_file, job_id, kind, inputs)
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id, future):
+        # 작업 프로세스 자체가 비정상 종료된 경우에도 상태를 남김
+        if not future.cancelled() and future.exception() is not None:
+            update_job(self.db_file, job_id, status="failed", progress=1.0, error=str(future.exception()))
+
+    def get(self, job_id):
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        keys = ("id", "kind", "status", "progress", "result", "error", "created_at", "updated_at")
+        c.execute(f"SELECT {', '.join(keys)} FROM {JOB_TABLE_NAME} WHERE id = ?", (job_id,))
+        row = c.fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return dict(zip(keys, row))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner(db_file=JOB_DB_FILE, max_workers=2):
+    # 프로세스 전체에서 하나만 사용 (Streamlit 세션들과 Flask 스레드가 공유)
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner(db_file, max_workers)
+        return _job_runner
@@ -0,0 +1,159 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from allocation_rules import compile_allocation_rules, load_allocation_rules
+from opt_clean_schedule import assign_zones
+from opt_job_schedule import ALLOCATION_RULES, ALLOCATION_RULES_FILE, TASK_TYPES, assign_tasks
+from schedule_result import TASK_LABELS, ScheduleResult
+from work_calendar import WorkCalendar
+from zone_model import DEFAULT_ZONE_CONFIG
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    return day
+
+
+def merge_vacations(*sources):
+    # 여러 곳(청소 DB, 업무 배치 DB 등)에서 읽은 휴가 데이터를 하나로 합칩니다. 키는 date 로 통일
+    merged = {}
+    for vacations in sources:
+        for day, workers in vacations.items():
+            day_workers = merged.setdefault(_to_date(day), [])
+            day_workers.extend(worker for worker in workers if worker not in day_workers)
+    return merged
+
+
+class Availability:
+    # 근무자 × 근무일 근무 가능 여부 행렬 (청소 구역과 업무 배치가 함께 사용)
+    def __init__(self, workers, workdays, vacations):
+        self.workers = list(workers)
+        self.workdays = list(workdays)
+        self.matrix = np.ones((len(self.workers), len(self.workdays)), dtype=bool)
+
+        worker_index = {worker: i for i, worker in enumerate(self.workers)}
+        day_index = {day: d for d, day in enumerate(self.workdays)}
+        for day, day_workers in vacations.items():
+            d = day_index.get(_to_date(day))
+            if d is None:
+                continue
+            for worker in day_workers:
+                if worker in worker_index:
+                    self.matrix[worker_index[worker], d] = False
+
+    def available_days(self):
+        return dict(zip(self.workers, self.matrix.sum(axis=1).tolist()))
+
+    def headcounts(self):
+        return self.matrix.sum(axis=0)
+
+    def workers_on(self, d):
+        return [self.workers[i] for i in np.flatnonzero(self.matrix[:, d])]
+
+
+def solve_joint_schedule(
+    start_date,
+    end_date,
+    workers,
+    vacations,
+    selected_holidays=(),
+    zone_config=DEFAULT_ZONE_CONFIG,
+    allocation_rules=None,
+    balance_load=False,
+    task_weights=None,
+    calendar=None,
+    offsets=None,
+    solo_offsets=None,
+    task_offsets=None,
+):
+    # 같은 사람들의 청소 구역과 팀장 업무(카톡/해피콜/마감)를 한 번의 달력 순회로 함께 배정합니다.
+    # balance_load=True 이면 청소(고정 인원 구역의 가중치)와 업무(task_weights)를 합친 부담이
+    # 근무 가능일 대비 고르게 되도록, 구역/업무별 횟수(비율)가 같은 사람들 사이의 순서에 반영합니다.
+    # offsets / solo_offsets / task_offsets: 이전 기간까지의 누적 횟수 {근무자: {구역 또는 업무: n}} (fairness_ledger)
+    calendar = calendar or WorkCalendar(start_date, end_date, selected_holidays)
+    availability = Availability(workers, calendar.workdays, vacations)
+    available_days = availability.available_days()
+
+    # 날짜별 구역 인원과 인원수별 업무 배분은 루프 전에 배열로 계산
+    capacity = zone_config.daily_capacity(availability.headcounts())
+    if allocation_rules is None:
+        allocation_rules = load_allocation_rules(ALLOCATION_RULES_FILE, default=ALLOCATION_RULES)
+    task_types = list(TASK_TYPES.values())
+    rule_table = compile_allocation_rules(allocation_rules, task_types, len(availability.workers))
+    task_weights = task_weights or {task: 1 for task in task_types}
+
+    # 구역별 청소 횟수(가중치 적용)와 업무 횟수는 누적 횟수에서 시작
+    zones = zone_config.zones
+    offsets, solo_offsets, task_offsets = offsets or {}, solo_offsets or {}, task_offsets or {}
+    cleaning_count = {
+        zone.name: {worker: offsets.get(worker, {}).get(zone.name, 0) * zone.weight for worker in workers}
+        for zone in zones
+    }
+    solo_cleaning_count = {
+        zone.name: {worker: solo_offsets.get(worker, {}).get(zone.name, 0) * zone.weight for worker in workers}
+        for zone in zones
+    }
+    previous_day_allocations = {zone.name: [] for zone in zones}
+    member_task_counts = {
+        worker: {task: task_offsets.get(worker, {}).get(task, 0) for task in task_types} for worker in workers
+    }
+    cleaning_load = {worker: 0 for worker in workers}
+    task_load = {worker: 0 for worker in workers}
+
+    def load(worker):
+        if available_days[worker] == 0:
+            return float("inf")
+        return (cleaning_load[worker] + task_load[worker]) / available_days[worker]
+
+    cleaning_rows = []
+    task_rows = []
+    for d, day in enumerate(availability.workdays):
+        people = availability.workers_on(d)
+        if not people:
+            continue
+
+        allocations = assign_zones(
+            people,
+            capacity[d],
+            zone_config,
+            cleaning_count,
+            solo_cleaning_count,
+            previous_day_allocations,
+            load if balance_load else None,
+        )
+        for zone in zones:
+            for worker in allocations[zone.name]:
+                cleaning_rows.append((day, zone.name, worker))
+                if not zone.is_remainder:
+                    cleaning_load[worker] += zone.weight
+
+        task_mix = rule_table[len(people)]
+        if not task_mix.any():
+            continue
+        daily_tasks = assign_tasks(
+            people, task_mix, task_types, member_task_counts, available_days, load if balance_load else None
+        )
+        for task, members in daily_tasks.items():
+            for worker in members:
+                task_rows.append((day, task, worker))
+                task_load[worker] += task_weights.get(task, 1)
+
+    zone_labels = [zone.label for zone in zones]
+    load_table = pd.DataFrame(
+        {
+            "근무 가능일": [available_days[worker] for worker in workers],
+            "청소 부담": [cleaning_load[worker] for worker in workers],
+            "업무 부담": [task_load[worker] for worker in workers],
+        },
+        index=list(workers),
+    )
+    load_table["합계"] = load_table["청소 부담"] + load_table["업무 부담"]
+
+    return {
+        "cleaning": ScheduleResult.from_assignments("cleaning", cleaning_rows, zone_config.names, zone_labels, workers),
+        "tasks": ScheduleResult.from_assignments("tasks", task_rows, task_types, list(TASK_LABELS.values()), workers),
+        "load": load_table,
+    }
@@ -0,0 +1,222 @@
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+
+from allocation_rules import load_allocation_rules
+from joint_schedule import merge_vacations, solve_joint_schedule
+from opt_clean_schedule import solve_cleaning_schedule, solve_cleaning_schedule_logic
+from opt_job_schedule import ALLOCATION_RULES, ALLOCATION_RULES_FILE
+from opt_job_schedule import solve_environment_team_schedule as solve_task_schedule
+from opt_shift_schedule import solve_environment_team_schedule as solve_shift_schedule
+from schedule_result import ScheduleResult
+from solver_cache import cached_solve
+from work_calendar import WorkCalendar
+from zone_model import DEFAULT_ZONE_CONFIG, zone_config_from_dict
+
+SCHEDULERS = ("cleaning", "shifts", "tasks")
+
+
+def _date_key(day):
+    # 스케줄러들이 휴가 데이터를 "YYYY-MM-DD" 문자열 키로 조회하므로 통일
+    if isinstance(day, (date, datetime)):
+        return day.strftime("%Y-%m-%d")
+    return day
+
+
+class TeamJob:
+    # 팀 하나의 스케줄링 입력 (팀원 목록, 휴가, 규칙). 프로세스 간에 전달되므로 pickle 가능한 값만 보관합니다.
+    def __init__(
+        self,
+        name,
+        members,
+        vacations=None,
+        schedulers=SCHEDULERS,
+        zone_config=DEFAULT_ZONE_CONFIG,
+        allocation_rules=None,
+        cleaning_solver="logic",
+        offsets=None,
+        joint=False,
+    ):
+        self.name = name
+        self.members = list(members)
+        self.vacations = {_date_key(day): list(workers) for day, workers in (vacations or {}).items()}
+        self.schedulers = tuple(schedulers)
+        self.zone_config = zone_config
+        self.allocation_rules = allocation_rules
+        self.cleaning_solver = cleaning_solver  # "logic"(그리디) 또는 "cp_sat"
+        # 이전 기간까지의 누적 횟수 (fairness_ledger.FairnessLedger.team_offsets 형식, 없으면 0 에서 시작)
+        self.offsets = offsets or {}
+        # 청소와 팀장 업무를 모두 돌릴 때 한 번의 달력 순회로 함께 배정 (joint_schedule, 그리디 청소만)
+        self.joint = joint
+
+
+# 작업 프로세스마다 한 번만 전달받는 읽기 전용 달력
+_calendar = None
+
+
+def _init_worker(calendar):
+    global _calendar
+    _calendar = calendar
+
+
+def run_team_job(job, calendar=None):
+    # 팀 하나에 대해 청소 / 환경팀 근무 / 팀장 업무 스케줄러를 실행하고 ScheduleResult 로 돌려줍니다.
+    # 같은 입력(팀원, 기간, 공휴일, 휴가, 규칙)의 결과는 solver_cache 에서 바로 가져옵니다.
+    calendar = calendar or _calendar
+    results = {}
+
+    def cached(kind, compute, rules=None, offset_kinds=None):
+        # 누적 횟수에서 시작한 결과는 시작값도 캐시 키에 포함 (offset_kinds: 사용하는 누적 횟수 종류, 기본은 kind)
+        offset_kinds = tuple(offset_kinds or (kind,))
+        offsets = {key: value for key, value in job.offsets.items() if key.startswith(offset_kinds) and value}
+        if offsets:
+            rules = {"rules": rules, "offsets": offsets}
+        return cached_solve(
+            kind,
+            compute,
+            job.members,
+            calendar.start_date,
+            calendar.end_date,
+            calendar.selected_holidays,
+            job.vacations,
+            rules,
+        )
+
+    # 규칙 파일 내용이 캐시 키에 들어가도록 실제 사용할 업무 규칙을 먼저 읽음
+    allocation_rules = job.allocation_rules
+    if allocation_rules is None and "tasks" in job.schedulers:
+        allocation_rules = load_allocation_rules(ALLOCATION_RULES_FILE, default=ALLOCATION_RULES)
+
+    joint_results = None
+    if job.joint and "cleaning" in job.schedulers and "tasks" in job.schedulers:
+
+        def solve_joint():
+            # 휴가를 근무 가능 행렬로 한 번만 만들어 청소 구역과 업무 배정이 함께 사용
+            output = solve_joint_schedule(
+                calendar.start_date,
+                calendar.end_date,
+                job.members,
+                job.vacations,
+                zone_config=job.zone_config,
+                allocation_rules=allocation_rules,
+                balance_load=True,
+                calendar=calendar,
+                offsets=job.offsets.get("cleaning"),
+                solo_offsets=job.offsets.get("cleaning_solo"),
+                task_offsets=job.offsets.get("tasks"),
+            )
+            return {"cleaning": output["cleaning"], "tasks": output["tasks"]}
+
+        rules = {"zones": job.zone_config.to_dict(), "rules": allocation_rules}
+        joint_results = cached("joint", solve_joint, rules, ("cleaning", "tasks"))
+
+    if joint_results is not None:
+        results["cleaning"] = joint_results["cleaning"]
+    elif "cleaning" in job.schedulers:
+
+        def solve_cleaning():
+            solve = solve_cleaning_schedule if job.cleaning_solver == "cp_sat" else solve_cleaning_schedule_logic
+            output_schedule = solve(
+                calendar.cleaning_schedule(job.members),
+                job.members,
+                job.vacations,
+                job.zone_config,
+                offsets=job.offsets.get("cleaning"),
+                solo_offsets=job.offsets.get("cleaning_solo"),
+            )
+            if output_schedule is None:
+                return None
+            return ScheduleResult.from_cleaning(output_schedule, job.zone_config, job.members)
+
+        rules = {"zones": job.zone_config.to_dict(), "solver": job.cleaning_solver}
+        results["cleaning"] = cached("cleaning", solve_cleaning, rules)
+
+    if "shifts" in job.schedulers:
+
+        def solve_shifts():
+            schedule, _, _ = solve_shift_schedule(
+                calendar.start_date,
+                calendar.end_date,
+                job.members,
+                job.vacations,
+                calendar.selected_holidays,
+                workdays=calendar.shift_workdays,
+                offsets=job.offsets.get("shifts"),
+            )
+            return ScheduleResult.from_shifts(schedule, job.members)
+
+        results["shifts"] = cached("shifts", solve_shifts)
+
+    if joint_results is not None:
+        results["tasks"] = joint_results["tasks"]
+    elif "tasks" in job.schedulers:
+
+        def solve_tasks():
+            schedule, _ = solve_task_schedule(
+                calendar.start_date,
+                calendar.end_date,
+                job.members,
+                job.vacations,
+                calendar.selected_holidays,
+                allocation_rules=allocation_rules,
+                workdays=calendar.workdays,
+                offsets=job.offsets.get("tasks"),
+            )
+            return ScheduleResult.from_tasks(schedule, job.members)
+
+        results["tasks"] = cached("tasks", solve_tasks, allocation_rules)
+
+    return results
+
+
+def schedule_teams(jobs, start_date, end_date, selected_holidays=(), max_workers=None):
+    # 여러 팀을 프로세스 풀에서 병렬로 스케줄링하고, 끝나는 팀부터 (팀 이름, 결과) 를 차례로 돌려줍니다.
+    # 달력은 부모 프로세스에서 한 번 계산해 각 작업 프로세스에 한 번씩만 전달합니다.
+    calendar = WorkCalendar(start_date, end_date, selected_holidays)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(calendar,)) as executor:
+        futures = {executor.submit(run_team_job, job): job.name for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                # 한 팀의 실패가 다른 팀 결과를 막지 않도록 오류를 결과로 전달
+                yield futures[future], {"error": str(e)}
+
+
+def load_team_jobs(
+    path,
+    vacations_by_team=None,
+    shared_vacations=None,
+    schedulers=SCHEDULERS,
+    zone_config=DEFAULT_ZONE_CONFIG,
+    cleaning_solver="logic",
+):
+    # 팀 설정 파일(JSON)에서 TeamJob 목록을 만듭니다.
+    # 예: [{"name": "본점", "members": ["다솔", "민지"], "schedulers": ["cleaning", "tasks"],
+    #       "zones": {"zones": [...]}, "allocation_rules": {"3": {...}}, "cleaning_solver": "logic"}]
+    # 휴가는 설정 파일의 vacations, vacations_by_team[팀], shared_vacations(모든 팀) 를 날짜별로 합침
+    # schedulers / zone_config / cleaning_solver 는 설정 파일에 없는 팀에 쓰는 기본값
+    vacations_by_team = vacations_by_team or {}
+    with open(path, encoding="utf-8") as f:
+        teams = json.load(f)
+
+    jobs = []
+    for team in teams:
+        team_zone_config = zone_config_from_dict(team["zones"]) if "zones" in team else zone_config
+        allocation_rules = None
+        if "allocation_rules" in team:
+            allocation_rules = load_allocation_rules(default=team["allocation_rules"])
+        jobs.append(
+            TeamJob(
+                team["name"],
+                team["members"],
+                vacations=merge_vacations(
+                    team.get("vacations", {}), vacations_by_team.get(team["name"], {}), shared_vacations or {}
+                ),
+                schedulers=team.get("schedulers", schedulers),
+                zone_config=team_zone_config,
+                allocation_rules=allocation_rules,
+                cleaning_solver=team.get("cleaning_solver", cleaning_solver),
+            )
+        )
+    return jobs
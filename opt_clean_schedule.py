@@ -1,30 +1,30 @@
 # from ortools.sat.python import cp_model
 import math
 
+from zone_model import DEFAULT_ZONE_CONFIG
 
-def get_b_zone_min_max(schedule):
-    three_days = 0
-    four_days = 0
-    five_days = 0
-    for day, members in schedule.items():
-        if len(members) == 3:
-            three_days += 1
-        elif len(members) == 4:
-            four_days += 1
-        elif len(members) == 5:
-            five_days += 1
-
-    total_b_count = three_days + 2 * (four_days + five_days)
-    expected_b_cout = total_b_count / len(members)
-    expected_b_cout_max = math.ceil(expected_b_cout)
-    expected_b_cout_min = math.floor(expected_b_cout)
-    return expected_b_cout_min, expected_b_cout_max
+
+def get_zone_min_max(zone_capacity, num_workers):
+    # 구역별 전체 청소 인원을 근무자 수로 나눈 기대 청소 횟수 범위
+    expected_count = zone_capacity.sum() / num_workers
+    return math.floor(expected_count), math.ceil(expected_count)
 
 
 from datetime import datetime
 
 
-def solve_cleaning_schedule(schedule, workers, vacation_days):
+def _offset_targets(workers, zone_name, average, offsets):
+    # 근무자별 이번 기간 목표 = 평균 - (누적 횟수 - 누적 평균)
+    counts = {worker: (offsets or {}).get(worker, {}).get(zone_name, 0) for worker in workers}
+    mean = sum(counts.values()) // len(workers)
+    return {worker: average - (count - mean) for worker, count in counts.items()}
+
+
+def solve_cleaning_schedule(
+    schedule, workers, vacation_days, zone_config=DEFAULT_ZONE_CONFIG, offsets=None, solo_offsets=None
+):
+    # offsets / solo_offsets: 이전 기간까지의 구역별 누적 횟수 {근무자: {구역: n}} (fairness_ledger)
+    # 누적 횟수가 평균보다 많은 사람은 이번 기간 목표를 그만큼 낮춤
     from ortools.sat.python import cp_model
 
     # 휴가를 고려하여 스케줄 필터링
@@ -47,75 +47,55 @@ def solve_cleaning_schedule(schedule, workers, vacation_days):
     print("Filtered schedule:", filtered_schedule)
     model = cp_model.CpModel()
     days = sorted(filtered_schedule.keys())
-    expected_b_count_min, expected_b_count_max = get_b_zone_min_max(filtered_schedule)
-    print("B Range", expected_b_count_min, " ~ ", expected_b_count_max)
+    zones = zone_config.zones
+    # 날짜별 구역 배정 인원을 미리 배열로 계산 (capacity[날짜, 구역])
+    capacity = zone_config.daily_capacity([len(filtered_schedule[day]) for day in days])
+
     cleaning_assignments = {}
     for day in days:
         for worker in filtered_schedule[day]:
-            cleaning_assignments[(day, worker, 1)] = model.NewBoolVar(f"clean_{worker}_day{day}_zone1")
-            cleaning_assignments[(day, worker, 2)] = model.NewBoolVar(f"clean_{worker}_day{day}_zone2")
+            for z, zone in enumerate(zones):
+                cleaning_assignments[(day, worker, z)] = model.NewBoolVar(f"clean_{worker}_day{day}_zone{zone.name}")
 
-    zone2_cleaners_count = {}
-    for day in days:
-        zone2_cleaners_count[day] = model.NewIntVar(1, 2, f"zone2_cleaners_day{day}")
-        model.Add(
-            zone2_cleaners_count[day]
-            == sum(cleaning_assignments.get((day, worker, 2), 0) for worker in filtered_schedule[day])
-        )
-
-    for day in days:
+    for d, day in enumerate(days):
         workers_on_duty = filtered_schedule[day]
-        model.Add(
-            sum(cleaning_assignments[(day, worker, 1)] for worker in workers_on_duty)
-            + sum(cleaning_assignments[(day, worker, 2)] for worker in workers_on_duty)
-            == len(workers_on_duty)
-        )
 
+        # 각 근무자는 하루에 한 구역만 청소
         for worker in workers_on_duty:
-            model.Add(cleaning_assignments[(day, worker, 1)] + cleaning_assignments[(day, worker, 2)] == 1)
-
-        if len(workers_on_duty) == 3:
-            model.Add(zone2_cleaners_count[day] == 1)
-        elif len(workers_on_duty) >= 4:
-            model.Add(zone2_cleaners_count[day] == 2)
-
-    total_zone2_cleanings = {}
-    solo_zone2_cleanings = {}
-
-    for worker in workers:
-        solo_zone_max_cleanings = int(expected_b_count_max / 2) + 1
-        total_zone2_cleanings[worker] = model.NewIntVar(0, expected_b_count_max, f"total_zone2_{worker}")
-        solo_zone2_cleanings[worker] = model.NewIntVar(0, solo_zone_max_cleanings, f"solo_zone2_{worker}")
-        # model.Add(
-        #     solo_zone2_cleanings[worker]
-        #     == sum(cleaning_assignments.get((day, worker, 2), 0) for day in days if len(filtered_schedule[day]) == 3)
-        # )
-        # model.Add(total_zone2_cleanings[worker] == sum(cleaning_assignments.get((day, worker, 2), 0) for day in days))
-
-    for worker in workers:
-        model.Add(total_zone2_cleanings[worker] >= expected_b_count_min)
-        model.Add(total_zone2_cleanings[worker] <= expected_b_count_max)
-
-    deviations = []
-    for worker in workers:
-        deviation = model.NewIntVar(0, len(days), f"deviation_{worker}")
-        avg_cleanings = (expected_b_count_min + expected_b_count_max) // 2
-        model.AddAbsEquality(deviation, total_zone2_cleanings[worker] - avg_cleanings)
-        deviations.append(deviation)
-
-    deviations_2 = []
-    for worker in workers:
-        deviation2 = model.NewIntVar(0, len(days), f"deviation_{worker}_2")
-        model.AddAbsEquality(deviation2, solo_zone2_cleanings[worker] - 3)
-        deviations_2.append(deviation2)
-
-    solo_cleaning_penalties = []
-    for worker in workers:
-        penalty = model.NewIntVar(0, len(days), f"penalty_{worker}")
-        model.AddMaxEquality(penalty, [0, 2 - solo_zone2_cleanings[worker]])
-        solo_cleaning_penalties.append(penalty)
-
-    model.Minimize(sum(deviations) + sum(solo_cleaning_penalties) + sum(deviations_2))
+            model.Add(sum(cleaning_assignments[(day, worker, z)] for z in range(len(zones))) == 1)
+
+        # 구역별 배정 인원은 설정된 규칙을 따름
+        for z in range(len(zones)):
+            model.Add(sum(cleaning_assignments[(day, worker, z)] for worker in workers_on_duty) == int(capacity[d, z]))
+
+    # 구역별 공평성: 전체 청소 횟수와 혼자 청소한 횟수가 평균에서 벗어난 만큼 가중치를 곱해 최소화
+    objective_terms = []
+    for z, zone in enumerate(zones):
+        if zone.is_remainder:
+            continue
+        expected_count_min, expected_count_max = get_zone_min_max(capacity[:, z], len(workers))
+        print(f"{zone.name} Range", expected_count_min, " ~ ", expected_count_max)
+        avg_cleanings = (expected_count_min + expected_count_max) // 2
+        solo_days = [day for d, day in enumerate(days) if capacity[d, z] == 1]
+        avg_solo_cleanings = len(solo_days) // len(workers)
+        weight = max(1, round(zone.weight * 100))
+        targets = _offset_targets(workers, zone.name, avg_cleanings, offsets)
+        solo_targets = _offset_targets(workers, zone.name, avg_solo_cleanings, solo_offsets)
+        bound = len(days) + max(abs(target) for target in list(targets.values()) + list(solo_targets.values()))
+
+        for worker in workers:
+            total_cleanings = model.NewIntVar(0, len(days), f"total_zone{zone.name}_{worker}")
+            solo_cleanings = model.NewIntVar(0, len(days), f"solo_zone{zone.name}_{worker}")
+            model.Add(total_cleanings == sum(cleaning_assignments.get((day, worker, z), 0) for day in days))
+            model.Add(solo_cleanings == sum(cleaning_assignments.get((day, worker, z), 0) for day in solo_days))
+
+            deviation = model.NewIntVar(0, bound, f"deviation_{zone.name}_{worker}")
+            model.AddAbsEquality(deviation, total_cleanings - targets[worker])
+            solo_deviation = model.NewIntVar(0, bound, f"solo_deviation_{zone.name}_{worker}")
+            model.AddAbsEquality(solo_deviation, solo_cleanings - solo_targets[worker])
+            objective_terms.append(weight * (deviation + solo_deviation))
+
+    model.Minimize(sum(objective_terms))
     print("start")
 
     solver = cp_model.CpSolver()
@@ -136,14 +116,12 @@ def solve_cleaning_schedule(schedule, workers, vacation_days):
                 (
                     day,
                     [
-                        worker
-                        for worker in filtered_schedule[day]
-                        if solver.Value(cleaning_assignments[(day, worker, 1)])
-                    ],
-                    [
-                        worker
-                        for worker in filtered_schedule[day]
-                        if solver.Value(cleaning_assignments[(day, worker, 2)])
+                        [
+                            worker
+                            for worker in filtered_schedule[day]
+                            if solver.Value(cleaning_assignments[(day, worker, z)])
+                        ]
+                        for z in range(len(zones))
                     ],
                 )
                 for day in days
@@ -151,21 +129,74 @@ def solve_cleaning_schedule(schedule, workers, vacation_days):
 
     if best_solution:
         output_schedule = {}
-        for day, a_zone_workers, b_zone_workers in best_solution:
-            output_schedule[day] = {
-                "workers": ", ".join(filtered_schedule[day]),
-                "zone_A": ", ".join(a_zone_workers),
-                "zone_B": ", ".join(b_zone_workers),
-            }
+        for day, zone_workers in best_solution:
+            output_schedule[day] = {"workers": ", ".join(filtered_schedule[day])}
+            for zone, assigned in zip(zones, zone_workers):
+                output_schedule[day][f"zone_{zone.name}"] = ", ".join(assigned)
         return output_schedule
     else:
         return None
 
 
+def assign_zones(
+    people, capacity_row, zone_config, cleaning_count, solo_cleaning_count, previous_day_allocations, load=None
+):
+    # 하루치 구역 배정 (cleaning_count, solo_cleaning_count, previous_day_allocations 는 갱신됨)
+    # load: 근무자별 다른 업무까지 포함한 부담 (있으면 같은 청소 횟수끼리 부담이 적은 사람 우선)
+    load = load or (lambda worker: 0)
+    zones = zone_config.zones
+    allocations = {}
+    unassigned = list(people)  # 아직 구역이 정해지지 않은 인원
+
+    # 인원이 정해진 구역부터 설정 순서대로 배정
+    for z, zone in enumerate(zones):
+        if zone.is_remainder:
+            continue
+        zone_workers = int(capacity_row[z])
+        count = cleaning_count[zone.name]
+        solo_count = solo_cleaning_count[zone.name]
+
+        # 이전 날 같은 구역에 있던 사람을 배제하고, 인원이 부족하면 전체 인원에서 선택
+        available_people = set(unassigned)
+        eligible_people = available_people - set(previous_day_allocations[zone.name])
+        if len(eligible_people) < zone_workers:
+            eligible_people = available_people
+
+        allocations[zone.name] = []
+        if zone_workers == 1:
+            # 혼자 청소할 경우, 혼자 청소한 횟수가 적은 사람 우선
+            least_cleaned = min((solo_count[p], count[p], load(p), p) for p in eligible_people)[3]
+            solo_count[least_cleaned] += zone.weight  # 혼자 일한 횟수에 가중치 적용
+            count[least_cleaned] += zone.weight  # 전체 청소 횟수에 가중치 적용
+            allocations[zone.name].append(least_cleaned)
+        else:
+            # 둘 이상일 경우, 전체 청소 횟수가 적은 사람부터 선택
+            for _ in range(zone_workers):
+                least_cleaned = min((count[p], load(p), p) for p in eligible_people)[2]
+                count[least_cleaned] += zone.weight  # 전체 청소 횟수에 가중치 적용
+                allocations[zone.name].append(least_cleaned)
+                eligible_people.remove(least_cleaned)
+
+        unassigned = [p for p in unassigned if p not in allocations[zone.name]]
+        # 이전 날 배정된 사람 업데이트
+        previous_day_allocations[zone.name] = allocations[zone.name]
+
+    # 남은 인원 모두 나머지 구역에 배정
+    remainder = zones[zone_config.remainder_index]
+    allocations[remainder.name] = unassigned
+    for worker in unassigned:
+        cleaning_count[remainder.name][worker] += remainder.weight
+
+    return allocations
+
+
 from datetime import datetime
 
 
-def solve_cleaning_schedule_logic(schedule, workers, vacation_days):
+def solve_cleaning_schedule_logic(
+    schedule, workers, vacation_days, zone_config=DEFAULT_ZONE_CONFIG, offsets=None, solo_offsets=None
+):
+    # offsets / solo_offsets: 이전 기간까지의 구역별 누적 횟수 {근무자: {구역: n}} (fairness_ledger)
     # 휴가를 고려하여 스케줄 필터링
     filtered_schedule = {}
 
@@ -183,91 +214,37 @@ def solve_cleaning_schedule_logic(schedule, workers, vacation_days):
         if available_workers:  # 근무 가능한 직원이 있는 경우에만 스케줄에 포함
             filtered_schedule[day] = available_workers
 
-    # 청소 횟수 및 혼자 청소한 횟수 추적
-    b_cleaning_count = {worker: 0 for worker in workers}  # B 구역에서 청소한 횟수
-    solo_b_cleaning_count = {worker: 0 for worker in workers}  # 혼자 B 구역에서 청소한 횟수
-    a_cleaning_count = {worker: 0 for worker in workers}  # A 구역에서 청소한 횟수
-    previous_day_b_allocations = []  # 이전 날 B 구역에 배정된 사람들
-
-    # B 구역 할당 결과
-    b_allocations = {}
-    b_weight = {}
+    # 날짜별 구역 배정 인원을 미리 배열로 계산 (capacity[날짜, 구역])
+    zones = zone_config.zones
+    capacity = zone_config.daily_capacity([len(people) for people in filtered_schedule.values()])
+
+    # 구역별 청소 횟수 및 혼자 청소한 횟수 추적 (구역 가중치 적용, 누적 횟수에서 시작)
+    offsets, solo_offsets = offsets or {}, solo_offsets or {}
+    cleaning_count = {
+        zone.name: {worker: offsets.get(worker, {}).get(zone.name, 0) * zone.weight for worker in workers}
+        for zone in zones
+    }
+    solo_cleaning_count = {
+        zone.name: {worker: solo_offsets.get(worker, {}).get(zone.name, 0) * zone.weight for worker in workers}
+        for zone in zones
+    }
+    previous_day_allocations = {zone.name: [] for zone in zones}  # 이전 날 구역별로 배정된 사람들
 
     # 최종 출력 결과를 저장할 딕셔너리
     output_schedule = {}
 
     # 날짜별로 루프 실행
-    for work_date, people in filtered_schedule.items():
-        # A 구역에 배치할 사람 수 결정
-        if len(people) <= 3:
-            b_workers = 1  # A 구역에 1명 배정
-            weight = 1  # 혼자서 B 구역을 맡으면 가중치 1
-        else:
-            b_workers = 2  # A 구역에 2명 배정
-            weight = 1  # 둘 이상이 맡으면 가중치 0.5
-
-        b_weight[work_date] = weight  # 가중치를 저장
-
-        # B 구역에 배치할 사람 결정 (이전 날 B 구역에 배정되지 않은 사람을 우선 배정)
-        available_people = set(people)  # 현재 날짜의 근무 가능한 인원들
-
-        # 이전 날 B 구역에 있던 사람을 배제한 사람들 중 최소 청소 횟수인 사람 선택
-        eligible_people = available_people - set(previous_day_b_allocations)
-
-        # 체크를 해서 이전 날 배정된 사람을 피하고, 안되면 기존 로직대로 최소 청소 횟수인 사람 배정
-        if len(eligible_people) >= b_workers:
-            # 충분한 인원이 있을 경우
-            b_allocations[work_date] = []
-            if b_workers == 1:
-                # 혼자 B 구역에서 일할 경우, eligible_people에서 선택
-                least_cleaned = min((solo_b_cleaning_count[p], b_cleaning_count[p], p) for p in eligible_people)[2]
-                solo_b_cleaning_count[least_cleaned] += weight  # 혼자 일한 횟수에 가중치 적용
-                b_cleaning_count[least_cleaned] += weight  # 전체 청소 횟수에 가중치 적용
-                b_allocations[work_date].append(least_cleaned)
-            else:
-                # 둘 이상일 경우, eligible_people에서 선택
-                for _ in range(b_workers):
-                    least_cleaned = min((b_cleaning_count[p], p) for p in eligible_people)[1]
-                    b_cleaning_count[least_cleaned] += weight  # 전체 청소 횟수에 가중치 적용
-                    b_allocations[work_date].append(least_cleaned)
-                    eligible_people.remove(least_cleaned)
-        else:
-            # 충분한 인원이 없으면 기존 로직으로 돌아가기
-            b_allocations[work_date] = []
-            if b_workers == 1:
-                # 혼자 B 구역에서 일할 경우
-                least_cleaned = min((solo_b_cleaning_count[p], b_cleaning_count[p], p) for p in available_people)[2]
-                solo_b_cleaning_count[least_cleaned] += weight  # 혼자 일한 횟수에 가중치 적용
-                b_cleaning_count[least_cleaned] += weight  # 전체 청소 횟수에 가중치 적용
-                b_allocations[work_date].append(least_cleaned)
-            else:
-                # 둘 이상일 경우
-                for _ in range(b_workers):
-                    least_cleaned = min((b_cleaning_count[p], p) for p in available_people)[1]
-                    b_cleaning_count[least_cleaned] += weight  # 전체 청소 횟수에 가중치 적용
-                    b_allocations[work_date].append(least_cleaned)
-                    available_people.remove(least_cleaned)
-
-        # 이전 날 B 구역에 배정된 사람 업데이트
-        previous_day_b_allocations = b_allocations[work_date]
-
-        # A 구역에 배치할 사람 결정 (B 구역에 배정되지 않은 인원들)
-        available_for_a_zone = set(people) - set(b_allocations[work_date])
-
-        # 남은 인원 모두 A 구역에 배정
-        a_zone_workers = list(available_for_a_zone)
-
-        # A 구역 배정 횟수 업데이트
-        for worker in a_zone_workers:
-            a_cleaning_count[worker] += 1
+    for d, (work_date, people) in enumerate(filtered_schedule.items()):
+        allocations = assign_zones(
+            people, capacity[d], zone_config, cleaning_count, solo_cleaning_count, previous_day_allocations
+        )
 
         # 결과를 딕셔너리로 저장
-        output_schedule[work_date] = {
-            "workers": ", ".join(people),
-            "zone_A": ", ".join(a_zone_workers),
-            "zone_B": ", ".join(b_allocations[work_date]),
-            "weight_B": b_weight[work_date],
-        }
+        output_schedule[work_date] = {"workers": ", ".join(people)}
+        for zone in zones:
+            output_schedule[work_date][f"zone_{zone.name}"] = ", ".join(allocations[zone.name])
+            if not zone.is_remainder:
+                output_schedule[work_date][f"weight_{zone.name}"] = zone.weight
 
     # 최종 스케줄 결과 반환
     return output_schedule
@@ -0,0 +1,126 @@
+from allocation_rules import load_allocation_rules, compile_allocation_rules
+from work_stats import availability_matrix, workday_array
+
+
+def is_workday(date, selected_holidays=[]):
+    # 월요일(0)부터 토요일(5)까지를 근무일로 설정
+    # 선택된 휴일만 제외하고, 다른 공휴일은 근무일로 처리
+    return date.weekday() < 6 and date not in selected_holidays
+
+
+TASK_TYPES = {"카톡": "chat", "해피콜/리뷰": "happy_call", "마감/어플": "closing"}
+
+# 인원별 업무 할당 규칙
+ALLOCATION_RULES = {
+    3: {"chat": 1, "happy_call": 1, "closing": 1},
+    4: {"chat": 2, "happy_call": 1, "closing": 1},
+    5: {"chat": 2, "happy_call": 2, "closing": 1},
+}
+# 인원별 업무 할당 규칙 설정 파일 (없으면 ALLOCATION_RULES 사용, 큰 인원수는 보간)
+ALLOCATION_RULES_FILE = "allocation_rules.json"
+
+
+def assign_tasks(available_members, task_mix, task_types, member_task_counts, available_days, load=None):
+    # 하루치 업무 배정 (member_task_counts 는 갱신됨)
+    # task_mix: task_types 순서의 업무별 인원, load: 근무자별 다른 업무까지 포함한 부담 (업무 할당 비율이 같을 때 고려)
+    load = load or (lambda member: 0)
+    daily_assignments = {task: [] for task in TASK_TYPES.values()}
+
+    # 업무 타입별 할당 우선순위 계산
+    task_priorities = {}
+    for task_type in TASK_TYPES.values():
+        for member in available_members:
+            if member not in task_priorities:
+                task_priorities[member] = {}
+
+            # 업무 타입별 할당 비율
+            task_ratio = (
+                member_task_counts[member][task_type] / available_days[member]
+                if available_days[member] > 0
+                else float("inf")
+            )
+            # 전체 업무 할당 비율
+            total_ratio = (
+                sum(member_task_counts[member].values()) / available_days[member]
+                if available_days[member] > 0
+                else float("inf")
+            )
+
+            # 우선순위 점수 계산 (낮을수록 높은 우선순위)
+            task_priorities[member][task_type] = (
+                task_ratio,  # 해당 업무 할당 비율
+                total_ratio,  # 전체 업무 할당 비율
+                member_task_counts[member][task_type],  # 해당 업무 수행 횟수
+            )
+
+    # 각 업무 타입별로 할당
+    remaining_members = available_members.copy()
+    for task_type, count in zip(task_types, task_mix):
+        for _ in range(count):
+            if not remaining_members:
+                break
+
+            # 현재 업무에 가장 적합한 멤버 선택
+            selected_member = min(
+                remaining_members,
+                key=lambda m: (
+                    task_priorities[m][task_type][0],  # 해당 업무 할당 비율
+                    load(m),  # 다른 업무까지 포함한 부담 (load 가 없으면 0)
+                    task_priorities[m][task_type][1],  # 전체 업무 할당 비율
+                    task_priorities[m][task_type][2],  # 해당 업무 수행 횟수
+                    sum(1 for t in TASK_TYPES.values() if member_task_counts[m][t] == 0),  # 아직 수행하지 않은 업무 수
+                ),
+            )
+
+            remaining_members.remove(selected_member)
+            daily_assignments[task_type].append(selected_member)
+            member_task_counts[selected_member][task_type] += 1
+
+    return daily_assignments
+
+
+def solve_environment_team_schedule(
+    start_date,
+    end_date,
+    team_members,
+    vacation_data,
+    selected_holidays,
+    allocation_rules=None,
+    workdays=None,
+    offsets=None,
+):
+    # workdays: 공유 달력(WorkCalendar)에서 미리 계산한 근무일 (없으면 직접 계산)
+    # offsets: 이전 기간까지의 누적 횟수 {근무자: {업무: n}} (fairness_ledger). 돌려주는 횟수는 이번 기간만
+    if workdays is None:
+        workdays = list(workday_array(start_date, end_date, selected_holidays).astype(object))
+
+    # 각 멤버별 근무 가능일 계산 (근무자 × 근무일 가능 여부 행렬)
+    available = availability_matrix(team_members, workdays, vacation_data)
+    available_days = dict(zip(team_members, available.sum(axis=1).tolist()))
+
+    schedule = {date: {"tasks": {}} for date in workdays}
+    offsets = offsets or {}
+    start_counts = {m: {t: offsets.get(m, {}).get(t, 0) for t in TASK_TYPES.values()} for m in team_members}
+    member_task_counts = {member: dict(start_counts[member]) for member in team_members}
+
+    # 인원수별 업무 배분을 날짜 루프 전에 배열로 컴파일 (rule_table[인원수])
+    if allocation_rules is None:
+        allocation_rules = load_allocation_rules(ALLOCATION_RULES_FILE, default=ALLOCATION_RULES)
+    task_types = list(TASK_TYPES.values())
+    rule_table = compile_allocation_rules(allocation_rules, task_types, len(team_members))
+
+    for day_index, date in enumerate(workdays):
+        available_members = [m for m, ok in zip(team_members, available[:, day_index]) if ok]
+        task_mix = rule_table[len(available_members)]
+
+        if not task_mix.any():
+            continue
+
+        daily_assignments = assign_tasks(available_members, task_mix, task_types, member_task_counts, available_days)
+        schedule[date]["tasks"] = daily_assignments
+
+    member_task_counts = {
+        member: {task: count - start_counts[member][task] for task, count in counts.items()}
+        for member, counts in member_task_counts.items()
+    }
+    return schedule, member_task_counts
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import holidays
+
+# 한국의 공휴일 정보를 가져옵니다.
+kr_holidays = holidays.KR()
+
+
+def is_workday(date, selected_holidays=[]):
+    return date.weekday() < 6 and date not in selected_holidays and date not in kr_holidays
+
+
+def solve_environment_team_schedule(
+    start_date, end_date, team_members, vacation_data, selected_holidays, workdays=None, offsets=None
+):
+    # workdays: 공유 달력(WorkCalendar)에서 미리 계산한 근무일 (없으면 직접 계산)
+    # offsets: 이전 기간까지의 누적 횟수 {근무자: {"morning": n, ...}} (fairness_ledger). 돌려주는 횟수는 이번 기간만
+    if workdays is None:
+        num_days = (end_date - start_date).days + 1
+        dates = [start_date + timedelta(days=i) for i in range(num_days)]
+        workdays = [date for date in dates if is_workday(date, selected_holidays)]
+
+    schedule = {date: {"morning": "", "afternoon": ""} for date in workdays}
+    offsets = offsets or {}
+    start_shifts = {m: {s: offsets.get(m, {}).get(s, 0) for s in ("morning", "afternoon")} for m in team_members}
+    member_shifts = {member: dict(start_shifts[member]) for member in team_members}
+
+    for date in workdays:
+        date_str = date.strftime("%Y-%m-%d")
+        available_members = [m for m in team_members if m not in vacation_data.get(date_str, [])]
+
+        for shift in ["morning", "afternoon"]:
+            if not available_members:
+                continue
+
+            # 할당이 덜 된 순서대로 정렬
+            sorted_members = sorted(
+                available_members,
+                key=lambda m: (member_shifts[m][shift], member_shifts[m]["morning"] + member_shifts[m]["afternoon"]),
+            )
+
+            # 가장 적게 할당된 멤버 선택
+            selected_member = sorted_members[0]
+            schedule[date][shift] = selected_member
+            member_shifts[selected_member][shift] += 1
+
+    member_shifts = {
+        member: {shift: count - start_shifts[member][shift] for shift, count in shifts.items()}
+        for member, shifts in member_shifts.items()
+    }
+    total_shifts = sum(sum(shifts.values()) for shifts in member_shifts.values())
+    target_shifts = total_shifts // len(team_members)
+
+    return schedule, member_shifts, {member: target_shifts for member in team_members}
@@ -0,0 +1,317 @@
+import calendar
+import io
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from schedule_export import worker_summary
+from schedule_result import ScheduleResult
+
+try:
+    import pyarrow  # noqa: F401  pandas 의 parquet / feather 엔진
+except ImportError:  # 없으면 보관/불러오기만 사용할 수 없음
+    pyarrow = None
+
+# 휴가·스케줄·근무자별 통계를 분석용 열 기반 파일(Parquet 또는 Feather)로 보관
+# 폴더 구조 (팀, 월 단위로 나눠 필요한 부분만 읽음):
+#   {root}/vacations/team={팀}/month={YYYY-MM}/part.parquet        day, worker
+#   {root}/schedules/team={팀}/kind={종류}/month={YYYY-MM}/part.parquet  day, worker, role, role_label
+#   {root}/stats/team={팀}/kind={종류}/month={YYYY-MM}/part.parquet      worker, role, role_label, count, days_worked
+# 같은 팀·월을 다시 보관하면 해당 파일만 바꿉니다. 기간을 주면 그 기간의 날만 바꾸고 (월의 나머지 날은 그대로),
+# 기간이 월 전체를 덮는데 데이터가 없으면 그 월의 파일을 지웁니다.
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+UNIX_EPOCH = date(1970, 1, 1).toordinal()  # ScheduleResult.days (서수) <-> datetime64 변환
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise RuntimeError("Parquet/Feather 보관에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+
+
+def _partition_value(value):
+    # 폴더 이름에 쓸 수 없는 문자만 바꿈
+    return str(value).replace(os.sep, "_").replace("/", "_").replace("=", "_")
+
+
+def _remove_parts(directory, keep=None):
+    # directory 의 part.* 파일을 지움 (keep 은 남김). 비게 된 폴더도 지움
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith("part.") and path != keep:
+            os.remove(path)
+    if not os.listdir(directory):
+        os.rmdir(directory)
+
+
+def _write(frame, directory, fmt):
+    _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "part" + FORMATS[fmt])
+    # 쓰는 도중에 읽는 쪽이 깨진 파일을 보지 않도록 임시 파일에 쓰고 바꿔치기
+    tmp_path = path + ".tmp"
+    frame = frame.reset_index(drop=True)
+    if fmt == "parquet":
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_feather(tmp_path)
+    os.replace(tmp_path, path)
+    _remove_parts(directory, keep=path)  # 다른 형식으로 보관했던 파일
+    return path
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        return day.date()
+    return day
+
+
+def _months(start_date, end_date):
+    # 기간(포함)에 걸친 "YYYY-MM" 목록
+    months, year, month = [], start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _read_part(directory):
+    # 월 폴더에 보관된 파일 (없으면 None)
+    if not os.path.isdir(directory):
+        return None
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("part.") and not name.endswith(".tmp"):
+            path = os.path.join(directory, name)
+            return pd.read_feather(path) if name.endswith(".feather") else pd.read_parquet(path)
+    return None
+
+
+def _month_parts(frame, directory, start_date=None, end_date=None):
+    # 이번에 보관할 월별 행 [(월, 행)] (행이 비어 있으면 그 월의 파일을 지움)
+    # - 기간이 없으면 frame 에 있는 월만 통째로 덮어씀
+    # - 기간이 월 전체를 덮으면 그 월은 frame 의 행으로 바꿈
+    # - 기간이 월의 일부만 덮으면 기존 파일에서 기간 밖의 날은 남기고 기간 안의 날만 바꿈
+    frame_months = frame["day"].dt.strftime("%Y-%m")
+    if start_date is None or end_date is None:
+        return list(frame.groupby(frame_months, sort=True))
+    start_date, end_date = _to_date(start_date), _to_date(end_date)
+    parts = []
+    for month in _months(start_date, end_date):
+        part = frame[frame_months == month]
+        year, month_number = int(month[:4]), int(month[5:])
+        first_day = date(year, month_number, 1)
+        last_day = date(year, month_number, calendar.monthrange(year, month_number)[1])
+        if start_date > first_day or end_date < last_day:
+            existing = _read_part(os.path.join(directory, f"month={month}"))
+            if existing is not None:
+                outside = (existing["day"] < pd.Timestamp(start_date)) | (existing["day"] > pd.Timestamp(end_date))
+                names = [column for column in frame.columns if column != "day"]
+                part = pd.concat(
+                    [
+                        existing[outside][frame.columns].astype({n: object for n in names}),
+                        part.astype({n: object for n in names}),
+                    ],
+                    ignore_index=True,
+                ).sort_values("day", kind="stable")
+        parts.append((month, part))
+    return parts
+
+
+def vacation_frame(vacation_data):
+    # {"YYYY-MM-DD": [근무자, ...]} -> day(datetime64), worker
+    rows = [(day, worker) for day, workers in vacation_data.items() for worker in workers]
+    frame = pd.DataFrame(rows, columns=["day", "worker"])
+    frame["day"] = pd.to_datetime(frame["day"])
+    return frame.sort_values(["day", "worker"], kind="stable")
+
+
+def schedule_frame(result):
+    # ScheduleResult 배열 -> day, worker, role, role_label (이름 열은 category)
+    return pd.DataFrame(
+        {
+            "day": pd.to_datetime(result.days - UNIX_EPOCH, unit="D"),
+            "worker": pd.Categorical.from_codes(result.worker_ids, result.workers),
+            "role": pd.Categorical.from_codes(result.role_ids, result.roles),
+            "role_label": pd.Categorical.from_codes(result.role_ids, result.role_labels),
+        }
+    )
+
+
+def stats_frame(result):
+    # 근무자 × 역할 횟수 (긴 형식) 와 근무자별 배정된 날 수
+    counts, days_worked = worker_summary(result)
+    n_workers, n_roles = counts.shape
+    return pd.DataFrame(
+        {
+            "worker": np.repeat(result.workers, n_roles),
+            "role": np.tile(result.roles, n_workers),
+            "role_label": np.tile(result.role_labels, n_workers),
+            "count": counts.ravel(),
+            "days_worked": np.repeat(days_worked, n_roles),
+        }
+    )
+
+
+def _month_result(part, result):
+    # 보관할 한 달치 행 -> ScheduleResult (명단/역할 순서는 result 를 따르고, 기존 파일에만 있는 이름은 뒤에 추가)
+    worker_names = part["worker"].astype(str).tolist()
+    role_names = part["role"].astype(str).tolist()
+    workers = list(dict.fromkeys(result.workers + worker_names))
+    roles = list(dict.fromkeys(result.roles + role_names))
+    labels = dict(zip(role_names, part["role_label"].astype(str)))
+    labels.update(zip(result.roles, result.role_labels))
+    worker_index = {worker: i for i, worker in enumerate(workers)}
+    role_index = {role: i for i, role in enumerate(roles)}
+    return ScheduleResult(
+        result.kind,
+        part["day"].to_numpy().astype("datetime64[D]").astype(np.int64) + UNIX_EPOCH,
+        [worker_index[worker] for worker in worker_names],
+        [role_index[role] for role in role_names],
+        workers,
+        roles,
+        [labels[role] for role in roles],
+    )
+
+
+def export_vacations(root, vacation_data, team="default", fmt="parquet", start_date=None, end_date=None):
+    # start_date ~ end_date: vacation_data 가 담고 있는 기간 (그 기간의 보관본만 바꿈)
+    directory = os.path.join(root, "vacations", f"team={_partition_value(team)}")
+    paths = []
+    for month, part in _month_parts(vacation_frame(vacation_data), directory, start_date, end_date):
+        month_directory = os.path.join(directory, f"month={month}")
+        if part.empty:
+            _remove_parts(month_directory)
+        else:
+            paths.append(_write(part.sort_values(["day", "worker"], kind="stable"), month_directory, fmt))
+    return paths
+
+
+def export_schedule(root, team, kind, result, fmt="parquet", start_date=None, end_date=None):
+    # 스케줄은 월별로, 통계는 해당 월의 배정만으로 계산해 같은 월 폴더에 저장
+    # 기간을 주지 않으면 배정이 있는 첫날 ~ 마지막 날을 보관한 기간으로 봄
+    if start_date is None or end_date is None:
+        if len(result) == 0:
+            return []
+        start_date, end_date = date.fromordinal(int(result.days.min())), date.fromordinal(int(result.days.max()))
+    team_kind = os.path.join(f"team={_partition_value(team)}", f"kind={_partition_value(kind)}")
+    directory = os.path.join(root, "schedules", team_kind)
+    paths = []
+    for month, part in _month_parts(schedule_frame(result), directory, start_date, end_date):
+        schedule_directory = os.path.join(directory, f"month={month}")
+        stats_directory = os.path.join(root, "stats", team_kind, f"month={month}")
+        if part.empty:
+            _remove_parts(schedule_directory)
+            _remove_parts(stats_directory)
+            continue
+        month_result = _month_result(part, result)
+        paths.append(_write(schedule_frame(month_result), schedule_directory, fmt))
+        paths.append(_write(stats_frame(month_result), stats_directory, fmt))
+    return paths
+
+
+def export_team_results(root, team_results, fmt="parquet", start_date=None, end_date=None):
+    # batch_schedule / multi_team 결과 [(팀, {종류: ScheduleResult 또는 None})] 전체 보관
+    paths = []
+    for team, results in team_results:
+        for kind, result in results.items():
+            if kind != "error" and result is not None:
+                paths += export_schedule(root, team, kind, result, fmt, start_date, end_date)
+    return paths
+
+
+def _read_partitions(directory, keys, filters):
+    # directory 아래 key=value 폴더를 따라 내려가며 filters({key: [값, ...]}) 에 맞는 파일만 읽음
+    _require_pyarrow()
+    frames = []
+
+    def walk(path, key_index, values):
+        if key_index == len(keys):
+            for name in sorted(os.listdir(path)):
+                if name.startswith("part.") and not name.endswith(".tmp"):
+                    file_path = os.path.join(path, name)
+                    frame = pd.read_feather(file_path) if name.endswith(".feather") else pd.read_parquet(file_path)
+                    for key, value in values.items():
+                        frame[key] = value
+                    frames.append(frame)
+            return
+        key = keys[key_index]
+        wanted = filters.get(key)
+        for name in sorted(os.listdir(path)):
+            if not name.startswith(key + "="):
+                continue
+            value = name[len(key) + 1 :]
+            if wanted is None or value in wanted:
+                walk(os.path.join(path, name), key_index + 1, {**values, key: value})
+
+    if os.path.isdir(directory):
+        walk(directory, 0, {})
+    if not frames:
+        return None
+    frame = pd.concat(frames, ignore_index=True)
+    for key in keys:
+        frame[key] = frame[key].astype("category")
+    return frame[keys + [column for column in frame.columns if column not in keys]]
+
+
+def _filters(**kwargs):
+    return {key: {str(v) for v in values} for key, values in kwargs.items() if values is not None}
+
+
+def load_vacations(root, teams=None, months=None):
+    # months: ["2024-09", ...]
+    frame = _read_partitions(os.path.join(root, "vacations"), ["team", "month"], _filters(team=teams, month=months))
+    return frame if frame is not None else pd.DataFrame(columns=["team", "month", "day", "worker"])
+
+
+def load_schedules(root, teams=None, kinds=None, months=None):
+    frame = _read_partitions(
+        os.path.join(root, "schedules"), ["team", "kind", "month"], _filters(team=teams, kind=kinds, month=months)
+    )
+    if frame is None:
+        return pd.DataFrame(columns=["team", "kind", "month", "day", "worker", "role", "role_label"])
+    return frame
+
+
+def load_stats(root, teams=None, kinds=None, months=None):
+    frame = _read_partitions(
+        os.path.join(root, "stats"), ["team", "kind", "month"], _filters(team=teams, kind=kinds, month=months)
+    )
+    if frame is None:
+        return pd.DataFrame(columns=["team", "kind", "month", "worker", "role", "role_label", "count", "days_worked"])
+    return frame
+
+
+def vacations_from_frame(frame):
+    # load_vacations 결과 -> VacationStore.add_many 에 넘길 (날짜, 근무자) 목록
+    return list(zip(pd.to_datetime(frame["day"]).dt.strftime("%Y-%m-%d"), frame["worker"].astype(str)))
+
+
+def schedule_result_from_frame(frame, kind):
+    # load_schedules 결과 (한 팀·한 종류) -> ScheduleResult
+    # 보관할 때의 category 순서(근무자 명단, 역할 순서)가 남아 있으면 그대로 사용
+    workers = frame["worker"].astype("category").cat.remove_unused_categories()
+    roles = frame["role"].astype("category").cat.remove_unused_categories()
+    labels = dict(zip(frame["role"].astype(str), frame["role_label"].astype(str)))
+    days = pd.to_datetime(frame["day"]).to_numpy().astype("datetime64[D]").astype(np.int64) + UNIX_EPOCH
+    return ScheduleResult(
+        kind,
+        days,
+        workers.cat.codes.to_numpy(),
+        roles.cat.codes.to_numpy(),
+        list(workers.cat.categories),
+        list(roles.cat.categories),
+        [labels[role] for role in roles.cat.categories],
+    )
+
+
+def read_vacation_file(uploaded_file):
+    # 업로드된 parquet / feather 파일 -> Date, Worker 열의 DataFrame (CSV 업로드와 같은 형태)
+    _require_pyarrow()
+    data = io.BytesIO(uploaded_file.read())
+    frame = pd.read_feather(data) if uploaded_file.name.endswith(".feather") else pd.read_parquet(data)
+    return pd.DataFrame({"Date": pd.to_datetime(frame["day"]).dt.strftime("%Y-%m-%d"), "Worker": frame["worker"]})
@@ -0,0 +1,128 @@
+import io
+import re
+from datetime import date
+
+import numpy as np
+import xlsxwriter
+
+# ScheduleResult 를 엑셀로 내보내기 (xlsxwriter constant_memory 모드)
+# 행을 쓰는 즉시 임시 파일로 내보내므로, 1년치 여러 팀 통합 문서도 메모리를 거의 쓰지 않습니다.
+# - "요약" 시트: 팀 / 스케줄 / 근무자별 역할 횟수와 근무일 수
+# - 데이터 시트: 팀 × 스케줄 × 월 (by_month=False 이면 팀 × 스케줄) 마다 하나, 날짜별 한 줄
+KIND_LABELS = {"cleaning": "청소", "shifts": "근무", "tasks": "업무"}
+WEEKDAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+# 엑셀 날짜 일련번호 기준 (write_datetime 대신 숫자 + 날짜 서식으로 쓰면 훨씬 빠름)
+EXCEL_EPOCH = date(1899, 12, 30).toordinal()
+
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+class _SheetNames:
+    # 엑셀 시트 이름 규칙: 31자 이하, []:*?/\ 불가, 대소문자 구분 없이 중복 불가
+    def __init__(self):
+        self.used = set()
+
+    def make(self, name):
+        name = _INVALID_SHEET_CHARS.sub("_", name)[:31]
+        candidate, n = name, 2
+        while candidate.lower() in self.used:
+            suffix = f" ({n})"
+            candidate = name[: 31 - len(suffix)] + suffix
+            n += 1
+        self.used.add(candidate.lower())
+        return candidate
+
+
+def iter_day_rows(result):
+    # ScheduleResult 배열에서 날짜별 (date, [역할별 근무자 목록]) 을 날짜 순서로 하나씩 생성
+    if len(result) == 0:
+        return
+    order = np.lexsort((np.arange(len(result)), result.role_ids, result.days))
+    days = result.days[order]
+    worker_ids = result.worker_ids[order].tolist()
+    role_ids = result.role_ids[order].tolist()
+    bounds = np.flatnonzero(np.diff(days)) + 1
+    starts = [0] + bounds.tolist()
+    ends = bounds.tolist() + [len(days)]
+    for start, end in zip(starts, ends):
+        roles = [[] for _ in result.roles]
+        for i in range(start, end):
+            roles[role_ids[i]].append(result.workers[worker_ids[i]])
+        yield date.fromordinal(int(days[start])), roles
+
+
+def worker_summary(result):
+    # 근무자별 (역할별 횟수 배열, 배정된 날 수)
+    n_workers, n_roles = len(result.workers), len(result.roles)
+    counts = np.bincount(
+        result.worker_ids.astype(np.int64) * n_roles + result.role_ids, minlength=n_workers * n_roles
+    ).reshape(n_workers, n_roles)
+    worked = np.unique(result.days.astype(np.int64) * n_workers + result.worker_ids)
+    days_worked = np.bincount(worked % n_workers, minlength=n_workers) if n_workers else np.zeros(0, dtype=int)
+    return counts, days_worked
+
+
+def schedule_results(team_results):
+    # [(팀, {스케줄 종류: ScheduleResult 또는 None, "error": ...})] 에서 결과가 있는 것만
+    for team, results in team_results:
+        for kind, result in results.items():
+            if kind != "error" and result is not None:
+                yield team, kind, result
+
+
+def write_schedule_workbook(output, team_results, by_month=True):
+    # output: 파일 경로 또는 BytesIO
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    header = workbook.add_format({"bold": True, "bg_color": "#F2F2F2", "border": 1})
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+    names = _SheetNames()
+
+    summary = workbook.add_worksheet(names.make("요약"))
+    summary.set_column(0, 2, 12)
+    row = 0
+    for team, kind, result in schedule_results(team_results):
+        columns = ["팀", "스케줄", "근무자"] + result.role_labels + ["합계", "근무일 수"]
+        summary.write_row(row, 0, columns, header)
+        row += 1
+        counts, days_worked = worker_summary(result)
+        for worker, worker_counts, worker_days in zip(result.workers, counts.tolist(), days_worked.tolist()):
+            summary.write_row(
+                row, 0, [team, KIND_LABELS.get(kind, kind), worker] + worker_counts + [sum(worker_counts), worker_days]
+            )
+            row += 1
+        row += 1
+
+    for team, kind, result in schedule_results(team_results):
+        columns = ["날짜", "요일"] + (["근무자"] if kind == "cleaning" else []) + result.role_labels
+        sheet, sheet_month, sheet_row = None, None, 0
+        order = {worker: i for i, worker in enumerate(result.workers)}
+        for day, roles in iter_day_rows(result):
+            month = (day.year, day.month) if by_month else None
+            if sheet is None or month != sheet_month:
+                title = f"{team} {KIND_LABELS.get(kind, kind)}"
+                if by_month:
+                    title += f" {day.year}-{day.month:02d}"
+                sheet = workbook.add_worksheet(names.make(title))
+                sheet.set_column(0, 0, 12)
+                sheet.set_column(2, len(columns) - 1, 20)
+                sheet.write_row(0, 0, columns, header)
+                sheet.freeze_panes(1, 0)
+                sheet_month, sheet_row = month, 1
+
+            sheet.write_number(sheet_row, 0, day.toordinal() - EXCEL_EPOCH, date_format)
+            sheet.write_string(sheet_row, 1, WEEKDAY_NAMES[day.weekday()])
+            cells = [", ".join(members) for members in roles]
+            if kind == "cleaning":
+                # 근무자 열은 명단 순서 (ScheduleResult.to_frame 과 같음)
+                cells = [", ".join(sorted((worker for members in roles for worker in members), key=order.get))] + cells
+            sheet.write_row(sheet_row, 2, cells)
+            sheet_row += 1
+
+    workbook.close()
+
+
+def schedule_workbook_bytes(team_results, by_month=True):
+    # Streamlit 다운로드 버튼용
+    output = io.BytesIO()
+    write_schedule_workbook(output, team_results, by_month)
+    return output.getvalue()
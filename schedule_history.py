@@ -0,0 +1,267 @@
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from schedule_result import ScheduleResult
+
+# 확정된 스케줄 이력 (추가만 하고 수정/삭제하지 않음)
+# - 기록할 때마다 버전이 하나씩 늘고, 배정 한 건은 (버전, 팀, 날짜 서수, 근무자, 역할) 정수 한 줄
+# - 팀/근무자 이름과 역할은 번호 표로 따로 관리
+# - 같은 날짜를 여러 번 기록하면 그날을 포함하는 가장 최근 버전이 유효
+# - (팀, 날짜) / (근무자, 날짜) 인덱스로 "9월 12일 B구역 청소 담당" / "민지의 이번 분기 업무" 를 바로 조회
+HISTORY_DB_FILE = "schedule_history.db"
+HISTORY_TABLE_NAME = "schedule_history"
+
+
+def _ordinal(day):
+    if isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.toordinal()
+
+
+class ScheduleHistory:
+    def __init__(self, db_file=HISTORY_DB_FILE):
+        self.db_file = db_file
+        self.name_ids = {}  # 이름 -> 번호 (한 번 정해지면 바뀌지 않으므로 메모리에 보관)
+        self.role_ids = {}  # (종류, 역할) -> 번호
+        self.lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE_NAME}_names (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """
+        )
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE_NAME}_roles (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                role TEXT NOT NULL,
+                label TEXT NOT NULL,
+                UNIQUE (kind, role)
+            )
+        """
+        )
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE_NAME}_versions (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                team INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                start_day INTEGER NOT NULL,
+                end_day INTEGER NOT NULL,
+                recorded_at REAL NOT NULL,
+                note TEXT NOT NULL DEFAULT ''
+            )
+        """
+        )
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE_NAME} (
+                version INTEGER NOT NULL,
+                team INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                worker INTEGER NOT NULL,
+                role INTEGER NOT NULL,
+                PRIMARY KEY (version, day, role, worker)
+            ) WITHOUT ROWID
+        """
+        )
+        # 인덱스에 나머지 열도 넣어 표를 다시 읽지 않고 인덱스만으로 조회
+        c.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE_NAME}_team_day "
+            f"ON {HISTORY_TABLE_NAME} (team, day, role, worker, version)"
+        )
+        c.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE_NAME}_worker_day "
+            f"ON {HISTORY_TABLE_NAME} (worker, day, team, role, version)"
+        )
+        c.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE_NAME}_versions_period "
+            f"ON {HISTORY_TABLE_NAME}_versions (team, kind, start_day, end_day)"
+        )
+        conn.commit()
+        conn.close()
+
+    def _name_id(self, c, name, create=True):
+        if name in self.name_ids:
+            return self.name_ids[name]
+        if create:
+            c.execute(f"INSERT OR IGNORE INTO {HISTORY_TABLE_NAME}_names (name) VALUES (?)", (name,))
+        c.execute(f"SELECT id FROM {HISTORY_TABLE_NAME}_names WHERE name = ?", (name,))
+        row = c.fetchone()
+        if row is None:
+            return None
+        self.name_ids[name] = row[0]
+        return row[0]
+
+    def _existing_name_id(self, name):
+        # 조회용: 기록된 적 없는 이름이면 None
+        with self.lock:
+            conn = sqlite3.connect(self.db_file)
+            name_id = self._name_id(conn.cursor(), name, create=False)
+            conn.close()
+        return name_id
+
+    def _role_id(self, c, kind, role, label):
+        key = (kind, role)
+        if key not in self.role_ids:
+            c.execute(
+                f"INSERT OR IGNORE INTO {HISTORY_TABLE_NAME}_roles (kind, role, label) VALUES (?, ?, ?)",
+                (kind, role, label),
+            )
+            c.execute(f"SELECT id FROM {HISTORY_TABLE_NAME}_roles WHERE kind = ? AND role = ?", key)
+            self.role_ids[key] = c.fetchone()[0]
+        return self.role_ids[key]
+
+    def record(self, team, result, start_date=None, end_date=None, note=""):
+        # 새 버전 번호를 돌려줌. 기간을 주지 않으면 배정이 있는 첫날 ~ 마지막 날
+        if len(result) == 0 and (start_date is None or end_date is None):
+            return None
+        start_day = _ordinal(start_date) if start_date is not None else int(result.days.min())
+        end_day = _ordinal(end_date) if end_date is not None else int(result.days.max())
+        # 기간 밖의 배정이 있으면 다른 기간의 스케줄이므로 기록하지 않음 (빈 버전이 실제 스케줄을 가리지 않게)
+        if len(result) and (int(result.days.min()) < start_day or int(result.days.max()) > end_day):
+            raise ValueError("스케줄에 기록할 기간 밖의 날짜가 있습니다")
+
+        with self.lock:
+            conn = sqlite3.connect(self.db_file)
+            c = conn.cursor()
+            team_id = self._name_id(c, team)
+            worker_ids = np.array([self._name_id(c, worker) for worker in result.workers], dtype=np.int64)
+            role_ids = np.array(
+                [self._role_id(c, result.kind, role, label) for role, label in zip(result.roles, result.role_labels)],
+                dtype=np.int64,
+            )
+            c.execute(
+                f"INSERT INTO {HISTORY_TABLE_NAME}_versions (team, kind, start_day, end_day, recorded_at, note) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (team_id, result.kind, start_day, end_day, time.time(), note),
+            )
+            version = c.lastrowid
+            rows = zip(result.days.tolist(), worker_ids[result.worker_ids].tolist(), role_ids[result.role_ids].tolist())
+            c.executemany(
+                f"INSERT OR IGNORE INTO {HISTORY_TABLE_NAME} (version, team, day, worker, role) VALUES (?, ?, ?, ?, ?)",
+                ((version, team_id, day, worker, role) for day, worker, role in rows),
+            )
+            conn.commit()
+            conn.close()
+        return version
+
+    def versions(self, team=None, kind=None):
+        # [(버전, 팀, 종류, 시작일, 종료일, 기록 시각, 메모)] 최근 것부터
+        query = (
+            f"SELECT v.version, n.name, v.kind, v.start_day, v.end_day, v.recorded_at, v.note "
+            f"FROM {HISTORY_TABLE_NAME}_versions v JOIN {HISTORY_TABLE_NAME}_names n ON n.id = v.team WHERE 1 = 1"
+        )
+        params = []
+        if team is not None:
+            query += " AND n.name = ?"
+            params.append(team)
+        if kind is not None:
+            query += " AND v.kind = ?"
+            params.append(kind)
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(query + " ORDER BY v.version DESC", params)
+        rows = [
+            (version, name, kind, date.fromordinal(start), date.fromordinal(end), recorded_at, note)
+            for version, name, kind, start, end, recorded_at, note in c.fetchall()
+        ]
+        conn.close()
+        return rows
+
+    def _query(self, where, params, order):
+        # 유효한(그날을 포함하는 가장 최근 버전) 배정만: (날짜, 팀, 종류, 역할, 역할 이름, 근무자)
+        query = f"""
+            SELECT h.day, t.name, r.kind, r.role, r.label, w.name
+            FROM {HISTORY_TABLE_NAME} h
+            JOIN {HISTORY_TABLE_NAME}_roles r ON r.id = h.role
+            JOIN {HISTORY_TABLE_NAME}_names t ON t.id = h.team
+            JOIN {HISTORY_TABLE_NAME}_names w ON w.id = h.worker
+            WHERE {where}
+            AND h.version = (
+                SELECT MAX(v.version) FROM {HISTORY_TABLE_NAME}_versions v
+                WHERE v.team = h.team AND v.kind = r.kind AND v.start_day <= h.day AND v.end_day >= h.day
+            )
+            ORDER BY {order}
+        """
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(query, params)
+        rows = [(date.fromordinal(day), *rest) for day, *rest in c.fetchall()]
+        conn.close()
+        return rows
+
+    def day_assignments(self, team, day, kind=None, role=None):
+        # 팀의 하루 배정 [(종류, 역할, 역할 이름, 근무자)]. 예: day_assignments("청소", "2024-09-12", "cleaning", "B")
+        day = _ordinal(day)
+        team_id = self._existing_name_id(team)
+        if team_id is None:
+            return []
+        where, params = "h.team = ? AND h.day = ?", [team_id, day]
+        if kind is not None:
+            where += " AND r.kind = ?"
+            params.append(kind)
+        if role is not None:
+            where += " AND r.role = ?"
+            params.append(role)
+        return [row[2:] for row in self._query(where, params, "r.kind, h.role, w.name")]
+
+    def worker_assignments(self, worker, start_date, end_date, team=None):
+        # 근무자의 기간(포함) 배정 [(날짜, 팀, 종류, 역할, 역할 이름)]
+        start_day, end_day = _ordinal(start_date), _ordinal(end_date)
+        worker_id = self._existing_name_id(worker)
+        team_id = self._existing_name_id(team) if team is not None else None
+        if worker_id is None or (team is not None and team_id is None):
+            return []
+        where, params = "h.worker = ? AND h.day BETWEEN ? AND ?", [worker_id, start_day, end_day]
+        if team_id is not None:
+            where += " AND h.team = ?"
+            params.append(team_id)
+        return [row[:5] for row in self._query(where, params, "h.day, t.name, r.kind, h.role")]
+
+    def schedule(self, team, kind, start_date, end_date):
+        # 기간의 유효한 배정을 ScheduleResult 로 (역할 순서는 처음 기록된 순서)
+        team_id = self._existing_name_id(team)
+        rows = self._query(
+            "h.team = ? AND r.kind = ? AND h.day BETWEEN ? AND ?",
+            [team_id, kind, _ordinal(start_date), _ordinal(end_date)],
+            "h.day, h.role, w.name",
+        )
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(f"SELECT role, label FROM {HISTORY_TABLE_NAME}_roles WHERE kind = ? ORDER BY id", (kind,))
+        roles = c.fetchall()
+        conn.close()
+        return ScheduleResult.from_assignments(
+            kind,
+            ((day, role, worker) for day, _, _, role, _, worker in rows),
+            [role for role, _ in roles],
+            [label for _, label in roles],
+        )
+
+
+_schedule_history = None
+_schedule_history_lock = threading.Lock()
+
+
+def get_schedule_history(db_file=HISTORY_DB_FILE):
+    # 프로세스 전체에서 하나만 사용
+    global _schedule_history
+    with _schedule_history_lock:
+        if _schedule_history is None:
+            _schedule_history = ScheduleHistory(db_file)
+        return _schedule_history
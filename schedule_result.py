@@ -0,0 +1,162 @@
+import json
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from zone_model import DEFAULT_ZONE_CONFIG
+
+# 환경팀 근무 시간대 / 팀장 업무 종류 (코드 -> 화면 표시 이름)
+SHIFT_LABELS = {"morning": "아침", "afternoon": "오후"}
+TASK_LABELS = {"chat": "카톡", "happy_call": "해피콜/리뷰", "closing": "마감/어플"}
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").date()
+    if isinstance(day, datetime):
+        return day.date()
+    return day
+
+
+class ScheduleResult:
+    # 세 가지 스케줄러(청소 구역 / 환경팀 근무 / 팀장 업무)가 공유하는 결과 타입
+    # 배정 한 건 = (날짜 서수, 근무자 번호, 역할 번호) 로 배열에 저장하고,
+    # DataFrame / HTML / JSON 은 처음 요청될 때 한 번만 만듭니다.
+    __slots__ = ("kind", "days", "worker_ids", "role_ids", "workers", "roles", "role_labels", "_dates", "_frame")
+
+    def __init__(self, kind, days, worker_ids, role_ids, workers, roles, role_labels=None):
+        self.kind = kind
+        self.days = np.asarray(days, dtype=np.int32)  # date.toordinal()
+        self.worker_ids = np.asarray(worker_ids, dtype=np.int32)
+        self.role_ids = np.asarray(role_ids, dtype=np.int8)
+        self.workers = list(workers)
+        self.roles = list(roles)
+        self.role_labels = list(role_labels or roles)
+        self._dates = None
+        self._frame = None
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def from_assignments(cls, kind, assignments, roles, role_labels=None, workers=()):
+        # assignments: (날짜, 역할, 근무자) 튜플의 iterable
+        worker_index = {worker: i for i, worker in enumerate(workers)}
+        role_index = {role: i for i, role in enumerate(roles)}
+        days, worker_ids, role_ids = [], [], []
+        for day, role, worker in assignments:
+            if worker not in worker_index:
+                worker_index[worker] = len(worker_index)
+            days.append(_to_date(day).toordinal())
+            worker_ids.append(worker_index[worker])
+            role_ids.append(role_index[role])
+        return cls(kind, days, worker_ids, role_ids, list(worker_index), roles, role_labels)
+
+    @classmethod
+    def from_cleaning(cls, output_schedule, zone_config=DEFAULT_ZONE_CONFIG, workers=()):
+        # solve_cleaning_schedule(_logic) 결과: {날짜: {"zone_A": "다솔, 민지", ...}}
+        def assignments():
+            for day in sorted(output_schedule):
+                for zone in zone_config.zones:
+                    assigned = output_schedule[day].get(f"zone_{zone.name}", "")
+                    for worker in assigned.split(", ") if assigned else []:
+                        yield day, zone.name, worker
+
+        labels = [zone.label for zone in zone_config.zones]
+        return cls.from_assignments("cleaning", assignments(), zone_config.names, labels, workers)
+
+    @classmethod
+    def from_shifts(cls, schedule, workers=()):
+        # allocation.solve_environment_team_schedule 결과: {날짜: {"morning": "희진", "afternoon": "예지"}}
+        def assignments():
+            for day in sorted(schedule):
+                for shift in SHIFT_LABELS:
+                    if schedule[day].get(shift):
+                        yield day, shift, schedule[day][shift]
+
+        return cls.from_assignments("shifts", assignments(), list(SHIFT_LABELS), list(SHIFT_LABELS.values()), workers)
+
+    @classmethod
+    def from_tasks(cls, schedule, workers=()):
+        # allocation_job.solve_environment_team_schedule 결과: {날짜: {"tasks": {"chat": ["다솔"], ...}}}
+        def assignments():
+            for day in sorted(schedule):
+                for task, members in schedule[day].get("tasks", {}).items():
+                    for member in members:
+                        yield day, task, member
+
+        return cls.from_assignments("tasks", assignments(), list(TASK_LABELS), list(TASK_LABELS.values()), workers)
+
+    @property
+    def dates(self):
+        # 배정이 있는 날짜 목록 (정렬됨)
+        if self._dates is None:
+            self._dates = [date.fromordinal(int(day)) for day in np.unique(self.days)]
+        return self._dates
+
+    def day_index(self):
+        # 각 배정의 날짜를 dates 기준 0부터의 번호로 변환
+        return np.searchsorted(np.unique(self.days), self.days)
+
+    def worker_mask(self, worker):
+        if worker not in self.workers:
+            return np.zeros(len(self), dtype=bool)
+        return self.worker_ids == self.workers.index(worker)
+
+    def to_dict(self):
+        # {날짜: {역할: [근무자, ...]}} 형태 (달력 렌더링 등)
+        result = {day: {role: [] for role in self.roles} for day in self.dates}
+        for day, worker_id, role_id in zip(self.days.tolist(), self.worker_ids.tolist(), self.role_ids.tolist()):
+            result[date.fromordinal(day)][self.roles[role_id]].append(self.workers[worker_id])
+        return result
+
+    def to_frame(self):
+        # 날짜별 한 줄, 역할별 한 열 (쉼표로 이어진 이름) 인 화면 표시용 DataFrame
+        if self._frame is None:
+            by_day = self.to_dict()
+            order = {worker: i for i, worker in enumerate(self.workers)}
+            rows = []
+            for day, roles in by_day.items():
+                row = {"날짜": day}
+                if self.kind == "cleaning":
+                    # 그날 근무자는 구역 순서가 아니라 명단 순서 (스케줄러의 "workers" 와 같은 순서)
+                    day_workers = sorted((worker for members in roles.values() for worker in members), key=order.get)
+                    row["근무자"] = ", ".join(day_workers)
+                for role, label in zip(self.roles, self.role_labels):
+                    row[label] = ", ".join(roles[role])
+                rows.append(row)
+            columns = ["날짜"] + (["근무자"] if self.kind == "cleaning" else []) + self.role_labels
+            self._frame = pd.DataFrame(rows, columns=columns)
+        return self._frame
+
+    def to_html(self, **kwargs):
+        return self.to_frame().to_html(index=False, **kwargs)
+
+    def to_json(self):
+        # 정수 배열 그대로 직렬화하는 압축 JSON
+        return json.dumps(
+            {
+                "kind": self.kind,
+                "workers": self.workers,
+                "roles": self.roles,
+                "role_labels": self.role_labels,
+                "days": self.days.tolist(),
+                "worker_ids": self.worker_ids.tolist(),
+                "role_ids": self.role_ids.tolist(),
+            },
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, payload):
+        data = json.loads(payload)
+        return cls(
+            data["kind"],
+            data["days"],
+            data["worker_ids"],
+            data["role_ids"],
+            data["workers"],
+            data["roles"],
+            data["role_labels"],
+        )
@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from cleaning_stats import cleaning_stats
+from input_hash import canonical_hash
+from job_queue import run_schedule_job
+from multi_team import SCHEDULERS
+from zone_model import DEFAULT_ZONE_CONFIG, zone_config_from_dict
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # 같은 키로 동시에 들어온 요청은 먼저 온 요청 하나만 계산하고, 나머지는 그 결과를 함께 받습니다.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.result
+
+
+def _parse_day(value, field):
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"{field}: 날짜 형식은 YYYY-MM-DD 입니다 ({value})")
+
+
+def parse_solve_request(kind, payload):
+    # HTTP 요청 본문 -> job_queue.run_schedule_job 입력
+    # 예: {"workers": ["다솔", "민지"], "start_date": "2024-09-01", "end_date": "2024-09-30",
+    #      "holidays": ["2024-09-16"], "vacations": {"2024-09-03": ["다솔"]}, "solver": "logic",
+    #      "offsets": {"cleaning": {"다솔": {"B": 2}}}}  (선택, 이전 기간까지의 누적 횟수)
+    if kind not in SCHEDULERS:
+        raise ValueError(f"알 수 없는 스케줄러입니다: {kind}")
+    if not isinstance(payload, dict):
+        raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+
+    workers = payload.get("workers")
+    if not workers or not isinstance(workers, list):
+        raise ValueError("workers: 근무자 목록이 필요합니다.")
+    for field in ("start_date", "end_date"):
+        if field not in payload:
+            raise ValueError(f"{field} 가 필요합니다.")
+
+    start_date = _parse_day(payload["start_date"], "start_date")
+    end_date = _parse_day(payload["end_date"], "end_date")
+    if start_date > end_date:
+        raise ValueError("start_date 는 end_date 보다 늦을 수 없습니다.")
+
+    vacations = {}
+    for day, day_workers in (payload.get("vacations") or {}).items():
+        vacations[_parse_day(day, "vacations")] = list(day_workers)
+
+    solver = payload.get("solver", "logic")
+    if solver not in ("logic", "cp_sat"):
+        raise ValueError("solver 는 logic 또는 cp_sat 입니다.")
+
+    offsets = payload.get("offsets") or {}
+    if not isinstance(offsets, dict) or not all(isinstance(value, dict) for value in offsets.values()):
+        raise ValueError("offsets: {스케줄 종류: {근무자: {역할: 횟수}}} 형식이어야 합니다.")
+
+    return {
+        "team": payload.get("team", kind),
+        "start_date": start_date,
+        "end_date": end_date,
+        "workers": [str(worker) for worker in workers],
+        "vacations": vacations,
+        "selected_holidays": sorted(_parse_day(day, "holidays") for day in payload.get("holidays", [])),
+        "zones": payload.get("zones"),
+        "allocation_rules": payload.get("allocation_rules"),
+        "solver": solver,
+        "offsets": offsets,
+    }
+
+
+def build_response(kind, inputs, result):
+    response = {"kind": kind, "status": "done"}
+    if result is None:
+        response.update(status="failed", error="스케줄을 생성할 수 없습니다.")
+        return response
+
+    response["schedule"] = {day.strftime("%Y-%m-%d"): roles for day, roles in result.to_dict().items()}
+    if kind == "cleaning":
+        zones = inputs.get("zones")
+        zone_config = zone_config_from_dict(zones) if zones else DEFAULT_ZONE_CONFIG
+        stats = cleaning_stats(result, zone_config=zone_config)
+        response["stats"] = {worker: {k: int(v) for k, v in row.items()} for worker, row in stats.iterrows()}
+    return response
+
+
+class SolveService:
+    # Flask /solve/<kind> 엔드포인트용: 입력 해시로 결과를 캐시하고, 같은 입력의 동시 요청은 한 번만 계산
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def solve(self, kind, inputs):
+        key = canonical_hash({"kind": kind, "inputs": inputs})
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return key, self.results[key]
+
+        def compute():
+            response = build_response(kind, inputs, run_schedule_job(kind, inputs))
+            with self.lock:
+                self.results[key] = response
+                if len(self.results) > self.max_entries:
+                    self.results.popitem(last=False)
+            return response
+
+        return key, self.flight.do(key, compute)
+
+
+_solve_service = SolveService()
+
+
+def get_solve_service():
+    return _solve_service
@@ -0,0 +1,171 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+from input_hash import canonical_hash
+
+# 스케줄러 결과 캐시 (메모리 LRU + SQLite)
+# SQLite 계층은 같은 서버의 Streamlit 세션, Flask API, 작업 프로세스가 함께 사용합니다.
+CACHE_DB_FILE = "solver_cache.db"
+CACHE_TABLE_NAME = "solver_cache"
+
+_MISSING = object()
+
+
+def _day_key(day):
+    if isinstance(day, (date, datetime)):
+        return day.strftime("%Y-%m-%d")
+    return str(day)
+
+
+def vacation_version(vacations, workers, start_date, end_date):
+    # 기간 안의 해당 근무자 휴가만으로 만든 버전 값. 다른 달이나 다른 팀의 휴가가 바뀌어도 캐시가 유지됩니다.
+    start, end = _day_key(start_date), _day_key(end_date)
+    workers = set(workers)
+    relevant = {}
+    for day, day_workers in vacations.items():
+        day = _day_key(day)
+        if start <= day <= end:
+            members = sorted(worker for worker in day_workers if worker in workers)
+            if members:
+                relevant[day] = members
+    return canonical_hash(relevant)
+
+
+def schedule_cache_key(kind, workers, start_date, end_date, selected_holidays, vacations, rules=None):
+    return canonical_hash(
+        {
+            "kind": kind,
+            "workers": list(workers),
+            "start_date": start_date,
+            "end_date": end_date,
+            "selected_holidays": sorted(_day_key(day) for day in selected_holidays),
+            "vacations": vacation_version(vacations, workers, start_date, end_date),
+            "rules": rules,
+        }
+    )
+
+
+class SolverCache:
+    # get_or_compute(key, compute): 메모리 → SQLite 순서로 찾고, 없으면 계산해서 두 계층에 저장
+    # SQLite 계층은 저장된 값의 총 크기가 max_db_bytes 를 넘으면 오래 안 쓴 것부터 지웁니다.
+    def __init__(self, db_file=CACHE_DB_FILE, max_memory_entries=256, max_db_bytes=64 * 1024 * 1024):
+        self.db_file = db_file
+        self.max_memory_entries = max_memory_entries
+        self.max_db_bytes = max_db_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CACHE_TABLE_NAME} (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """
+        )
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{CACHE_TABLE_NAME}_last_used ON {CACHE_TABLE_NAME} (last_used)")
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key, value):
+        with self.lock:
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+            if len(self.memory) > self.max_memory_entries:
+                self.memory.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(f"SELECT value FROM {CACHE_TABLE_NAME} WHERE key = ?", (key,))
+        row = c.fetchone()
+        if row is not None:
+            c.execute(f"UPDATE {CACHE_TABLE_NAME} SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        conn.close()
+        if row is None:
+            return default
+
+        # 이 서버가 직접 쓴 캐시 파일만 읽으므로 pickle 사용
+        value = pickle.loads(row[0])
+        self._remember(key, value)
+        return value
+
+    def put(self, key, kind, value):
+        self._remember(key, value)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(
+            f"INSERT OR REPLACE INTO {CACHE_TABLE_NAME} (key, kind, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, kind, blob, len(blob), time.time()),
+        )
+        self._evict(c)
+        conn.commit()
+        conn.close()
+
+    def _evict(self, c):
+        c.execute(f"SELECT COALESCE(SUM(size), 0) FROM {CACHE_TABLE_NAME}")
+        excess = c.fetchone()[0] - self.max_db_bytes
+        if excess <= 0:
+            return
+        c.execute(f"SELECT key, size FROM {CACHE_TABLE_NAME} ORDER BY last_used")
+        stale = []
+        for key, size in c.fetchall():
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        c.executemany(f"DELETE FROM {CACHE_TABLE_NAME} WHERE key = ?", stale)
+
+    def get_or_compute(self, key, kind, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, kind, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        conn = sqlite3.connect(self.db_file)
+        c = conn.cursor()
+        c.execute(f"DELETE FROM {CACHE_TABLE_NAME}")
+        conn.commit()
+        conn.close()
+
+
+_solver_cache = None
+_solver_cache_lock = threading.Lock()
+
+
+def get_solver_cache(db_file=CACHE_DB_FILE):
+    # 프로세스 전체에서 하나만 사용
+    global _solver_cache
+    with _solver_cache_lock:
+        if _solver_cache is None:
+            _solver_cache = SolverCache(db_file)
+        return _solver_cache
+
+
+def cached_solve(kind, compute, workers, start_date, end_date, selected_holidays, vacations, rules=None):
+    # 스케줄러 호출을 캐시로 감쌉니다. 예:
+    # cached_solve("shifts", lambda: solve(...), members, start, end, holidays, vacation_data)
+    key = schedule_cache_key(kind, workers, start_date, end_date, selected_holidays, vacations, rules)
+    return get_solver_cache().get_or_compute(key, kind, compute)
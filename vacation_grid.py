@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# 휴가 현황표 (근무자 × 날짜) 를 한 번의 crosstab 과 날짜 축 마스크로 만듭니다.
+VACATION = "●"
+HOLIDAY = "⚪"
+DAY_OFF = "x"
+WEEKDAY_NAMES = np.array(["월", "화", "수", "목", "금", "토", "일"])
+
+
+def vacation_rows(vacation_data):
+    # {"YYYY-MM-DD": [근무자, ...]} -> (날짜 배열, 근무자 배열)
+    dates = [day for day, workers in vacation_data.items() for _ in workers]
+    workers = [worker for workers in vacation_data.values() for worker in workers]
+    return np.array(dates, dtype=object), np.array(workers, dtype=object)
+
+
+def status_grid(members, start_date, end_date, dates, workers, holidays=(), mark_sundays=False):
+    # dates, workers: 휴가 한 건당 한 행인 배열
+    # 휴가 ●, (mark_sundays 이면) 일요일 x, holidays 에 있는 날 ⚪ 순으로 표시
+    axis = pd.date_range(start_date, end_date)
+    columns = axis.strftime("%Y-%m-%d")
+
+    rows = pd.DataFrame({"date": dates, "worker": workers})
+    rows = rows[rows["date"].isin(columns) & rows["worker"].isin(members)]
+    counts = pd.crosstab(rows["worker"], rows["date"]).reindex(index=list(members), columns=columns, fill_value=0)
+    on_vacation = counts.to_numpy() > 0
+
+    sunday = (axis.weekday == 6) if mark_sundays else np.zeros(len(axis), dtype=bool)
+    holiday = np.fromiter((day in holidays for day in axis.date), dtype=bool, count=len(axis))
+    day_mark = np.where(sunday, DAY_OFF, np.where(holiday, HOLIDAY, ""))
+    status = np.where(on_vacation, VACATION, np.broadcast_to(day_mark, on_vacation.shape))
+    return pd.DataFrame(status, index=list(members), columns=columns)
+
+
+def vacation_status_grid(members, start_date, end_date, vacation_data, holidays=(), mark_sundays=False):
+    dates, workers = vacation_rows(vacation_data)
+    return status_grid(members, start_date, end_date, dates, workers, holidays, mark_sundays)
+
+
+def day_labels(columns):
+    # "2024-09-01" -> "01(일)"
+    days = pd.to_datetime(pd.Index(columns))
+    return list(days.strftime("%d") + "(" + WEEKDAY_NAMES[days.weekday] + ")")
+
+
+# 화면 표시: 상태를 한 글자 코드로 보내고, 보이는 행/열만 브라우저에서 그림
+STATUS_CODES = {"": "0", VACATION: "1", HOLIDAY: "2", DAY_OFF: "3"}
+
+
+def grid_payload(grid):
+    # 근무자마다 날짜 수 길이의 코드 문자열 하나 (예: "0010003")
+    codes = np.vectorize(STATUS_CODES.get, otypes=[object])(grid.to_numpy())
+    return {
+        "members": [str(member) for member in grid.index],
+        "columns": [str(column) for column in grid.columns],
+        "codes": ["".join(row) for row in codes],
+    }
+
+
+_GRID_TEMPLATE = """
+<style>
+    body { margin: 0; }
+    #grid { position: relative; overflow: auto; height: __HEIGHT__px; font: 11px Arial, sans-serif; }
+    #grid .layer { position: absolute; }
+    #grid .cell { position: absolute; box-sizing: border-box; width: __CELL_WIDTH__px; height: __ROW_HEIGHT__px;
+                  line-height: __ROW_HEIGHT__px; text-align: center; border: 1px solid #eee; background: #fff; }
+    #grid .head { font-weight: bold; background: #f2f2f2; }
+    #grid .name { width: __NAME_WIDTH__px; text-align: left; padding-left: 4px; overflow: hidden; white-space: nowrap; }
+    #grid .c0::after { content: "__EMPTY__"; color: #ddd; }
+    #grid .c1::after { content: "●"; color: red; }
+    #grid .c2::after { content: "⚪"; color: green; }
+    #grid .c3::after { content: "x"; }
+</style>
+<div id="grid">
+    <div id="spacer"></div>
+    <div id="body" class="layer"></div>
+    <div id="rows" class="layer"></div>
+    <div id="cols" class="layer"></div>
+    <div id="corner" class="layer"></div>
+</div>
+<script>
+    const data = __PAYLOAD__;
+    const NAME_W = __NAME_WIDTH__, CELL_W = __CELL_WIDTH__, ROW_H = __ROW_HEIGHT__, OVERSCAN = 4;
+    const grid = document.getElementById("grid");
+    const layers = ["body", "rows", "cols", "corner"].map(id => document.getElementById(id));
+    const nRows = data.members.length, nCols = data.columns.length;
+    const escape = s => s.replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+    const members = data.members.map(escape), columns = data.columns.map(escape);
+    const spacer = document.getElementById("spacer");
+    spacer.style.width = (NAME_W + nCols * CELL_W) + "px";
+    spacer.style.height = ((nRows + 1) * ROW_H) + "px";
+
+    function cell(x, y, cls, text) {
+        return '<div class="cell ' + cls + '" style="left:' + x + "px;top:" + y + 'px">' + text + "</div>";
+    }
+
+    let frame = null;
+    function render() {
+        frame = null;
+        const top = grid.scrollTop, left = grid.scrollLeft;
+        const r0 = Math.max(0, Math.floor(top / ROW_H) - OVERSCAN);
+        const r1 = Math.min(nRows, Math.ceil((top + grid.clientHeight) / ROW_H) + OVERSCAN);
+        const c0 = Math.max(0, Math.floor(left / CELL_W) - OVERSCAN);
+        const c1 = Math.min(nCols, Math.ceil((left + grid.clientWidth) / CELL_W) + OVERSCAN);
+        const body = [], rows = [], cols = [];
+        for (let r = r0; r < r1; r++) {
+            const y = (r + 1) * ROW_H, codes = data.codes[r];
+            rows.push(cell(left, y, "name head", members[r]));
+            for (let c = c0; c < c1; c++) { body.push(cell(NAME_W + c * CELL_W, y, "c" + codes[c], "")); }
+        }
+        for (let c = c0; c < c1; c++) { cols.push(cell(NAME_W + c * CELL_W, top, "head", columns[c])); }
+        layers[0].innerHTML = body.join("");
+        layers[1].innerHTML = rows.join("");
+        layers[2].innerHTML = cols.join("");
+        layers[3].innerHTML = cell(left, top, "name head", "");
+    }
+    grid.addEventListener("scroll", () => { if (frame === null) { frame = requestAnimationFrame(render); } });
+    render();
+</script>
+"""
+
+
+def client_grid_html(payload, max_height=400, empty="", name_width=80, cell_width=42, row_height=20):
+    # 컴포넌트 높이 (components.html 의 height 로 사용). 가로 스크롤바 자리 포함
+    height = min(max_height, (len(payload["members"]) + 1) * row_height + 20)
+    payload_json = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    html = (
+        _GRID_TEMPLATE.replace("__HEIGHT__", str(height))
+        .replace("__NAME_WIDTH__", str(name_width))
+        .replace("__CELL_WIDTH__", str(cell_width))
+        .replace("__ROW_HEIGHT__", str(row_height))
+        .replace("__EMPTY__", empty)
+        .replace("__PAYLOAD__", payload_json)
+    )
+    return html, height
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from vacation_schema import ENTRY_TABLE_NAME, IMPORT_TABLE_NAME, ROSTER_TABLE_NAME, ensure_vacation_schema, to_ordinal
+
+# 예전처럼 페이지마다 따로 쓰던 휴가 DB 파일을 통합 DB 로 가져오기 (파일·테이블마다 한 번)
+# 예) python vacation_import.py vacation.db
+#     python vacation_import.py vacation.db --source other.db:vacation_days:본점
+# 앱은 처음 실행할 때 페이지에 적힌 이전 파일을 자동으로 가져오므로 보통은 직접 실행할 필요가 없습니다.
+LEGACY_SOURCES = [
+    ("environment_team_schedule.db", "vacation_days", "환경팀"),
+    ("allocation_data.db", "allocation_days", "팀장"),
+]
+
+
+def read_legacy_table(source_file, table_name):
+    # [(날짜 문자열, 근무자)] (버전 0 테이블이든 버전 1 호환 뷰든 같은 모양). 파일이나 테이블이 없으면 None
+    if not os.path.exists(source_file):
+        return None
+    # 읽기 전용으로 열어 원본 파일은 바꾸지 않음
+    conn = sqlite3.connect(Path(source_file).resolve().as_uri() + "?mode=ro", uri=True)
+    c = conn.cursor()
+    try:
+        c.execute("SELECT type FROM sqlite_master WHERE name = ? AND type IN ('table', 'view')", (table_name,))
+        if c.fetchone() is None:
+            return None
+        c.execute(f"SELECT date, worker FROM {table_name} ORDER BY id")
+        return c.fetchall()
+    finally:
+        conn.close()
+
+
+def import_vacation_file(db_file, source_file, table_name, team, force=False):
+    # db_file 은 ensure_vacation_schema 를 거친 통합 DB
+    # (가져온 행 수, 날짜를 해석할 수 없거나 근무자가 빈 행 수). 이미 가져왔거나 가져올 것이 없으면 None
+    source = os.path.abspath(source_file)
+    if source == os.path.abspath(db_file):
+        raise ValueError("가져올 파일과 통합 DB 파일이 같습니다")
+    rows = read_legacy_table(source_file, table_name)
+    if rows is None:
+        return None
+
+    entries, skipped = [], 0
+    for day, worker in rows:
+        try:
+            day = to_ordinal(str(day).strip())
+        except ValueError:
+            day = None
+        if day is None or worker is None:
+            skipped += 1
+        else:
+            entries.append((day, worker))
+
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    c = conn.cursor()
+    try:
+        # 가져오기 기록 확인과 기록을 한 트랜잭션으로 (여러 프로세스가 동시에 시작해도 한 번만)
+        c.execute("BEGIN IMMEDIATE")
+        c.execute(f"SELECT 1 FROM {IMPORT_TABLE_NAME} WHERE source = ? AND table_name = ?", (source, table_name))
+        if c.fetchone() is not None and not force:
+            c.execute("ROLLBACK")
+            return None
+        c.executemany(
+            f"INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) VALUES (?, ?)",
+            [(team, worker) for worker in dict.fromkeys(worker for _, worker in entries)],
+        )
+        c.executemany(
+            f"INSERT OR IGNORE INTO {ENTRY_TABLE_NAME} (team, day, worker) "
+            f"SELECT ?, ?, id FROM {ROSTER_TABLE_NAME} WHERE team = ? AND name = ?",
+            [(team, day, team, worker) for day, worker in entries],
+        )
+        c.execute(
+            f"INSERT OR REPLACE INTO {IMPORT_TABLE_NAME} (source, table_name, team, rows, imported_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (source, table_name, team, len(entries), time.time()),
+        )
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return len(entries), skipped
+
+
+def parse_source(value):
+    # "파일:테이블:팀"
+    parts = value.rsplit(":", 2)
+    if len(parts) != 3 or not all(parts):
+        raise argparse.ArgumentTypeError(f"'파일:테이블:팀' 형식이어야 합니다: {value}")
+    return tuple(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 휴가 DB 파일을 통합 DB 로 가져오기")
+    parser.add_argument("db", help="통합 휴가 DB 파일 (secrets 의 database.file_path)")
+    parser.add_argument(
+        "--source",
+        action="append",
+        type=parse_source,
+        help="가져올 파일:테이블:팀 (여러 번 지정 가능, 기본: 앱 페이지 파일)",
+    )
+    parser.add_argument("--force", action="store_true", help="이미 가져온 파일도 다시 가져오기 (중복은 하나만 남음)")
+    args = parser.parse_args(argv)
+
+    ensure_vacation_schema(args.db)
+    for source_file, table_name, team in args.source or LEGACY_SOURCES:
+        imported = import_vacation_file(args.db, source_file, table_name, team, args.force)
+        if imported is None:
+            print(f"[건너뜀] {source_file} {table_name} (없거나 이미 가져옴)")
+        else:
+            print(
+                f"[가져옴] {source_file} {table_name} -> {team}: {imported[0]}건 (해석할 수 없는 {imported[1]}건 제외)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
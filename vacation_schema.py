@@ -0,0 +1,256 @@
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+# 휴가 테이블 스키마 (PRAGMA user_version 으로 버전 관리)
+# 버전 0: {table} (id, date TEXT, worker TEXT) — 인덱스 없이 문자열 비교로 전체 검색
+# 버전 1: 날짜는 서수(date.toordinal()) 정수, 근무자는 명단(roster) 번호
+#   vacation_roster  (id, team, name)          UNIQUE (team, name)
+#   vacation_entries (id, team, day, worker)   UNIQUE (team, day, worker) + (team, worker, day)
+#   {table}          기존 (id, date, worker) 형태의 호환 뷰. INSERT / DELETE / UPDATE 는 트리거로 새 테이블에 반영
+# 기존 테이블은 {table}_v0 로 이름만 바꿔 남겨 둡니다 (날짜를 해석할 수 없는 행은 옮기지 않고 여기에만 남음).
+# 버전 2: 여러 팀이 DB 파일 하나를 함께 사용
+#   vacation_views   (name, team)               호환 뷰마다 어느 팀의 휴가인지 (버전 1 의 뷰는 팀 = 뷰 이름)
+#   vacation_imports (source, table_name, ...)  다른 DB 파일에서 가져온 기록 (vacation_import, 파일마다 한 번)
+SCHEMA_VERSION = 2
+ROSTER_TABLE_NAME = "vacation_roster"
+ENTRY_TABLE_NAME = "vacation_entries"
+VIEW_TABLE_NAME = "vacation_views"
+IMPORT_TABLE_NAME = "vacation_imports"
+# SQLite julianday 와 date.toordinal() 의 차이 (julianday('0001-01-01') = 1721425.5, 서수 1)
+JULIAN_DAY_OFFSET = 1721424.5
+
+
+def to_ordinal(day):
+    # "YYYY-MM-DD" / date -> 서수
+    if isinstance(day, datetime):
+        return day.date().toordinal()
+    if isinstance(day, date):
+        return day.toordinal()
+    return datetime.strptime(day, "%Y-%m-%d").toordinal()
+
+
+def from_ordinal(day):
+    return date.fromordinal(day).strftime("%Y-%m-%d")
+
+
+def _sql_day(expression):
+    # 문자열 날짜 -> 서수 (해석할 수 없으면 NULL)
+    return f"CAST(julianday(date({expression})) - {JULIAN_DAY_OFFSET} AS INTEGER)"
+
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _object_type(c, name):
+    c.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def _create_tables(c):
+    c.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {ROSTER_TABLE_NAME} (
+            id INTEGER PRIMARY KEY,
+            team TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (team, name)
+        )
+    """
+    )
+    c.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {ENTRY_TABLE_NAME} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            worker INTEGER NOT NULL REFERENCES {ROSTER_TABLE_NAME} (id)
+        )
+    """
+    )
+    # 팀·기간 조회와 중복 검사는 첫 번째, 근무자별 조회는 두 번째 인덱스만 읽음
+    c.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{ENTRY_TABLE_NAME}_team_day_worker "
+        f"ON {ENTRY_TABLE_NAME} (team, day, worker)"
+    )
+    c.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{ENTRY_TABLE_NAME}_team_worker_day "
+        f"ON {ENTRY_TABLE_NAME} (team, worker, day)"
+    )
+    c.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {VIEW_TABLE_NAME} (
+            name TEXT PRIMARY KEY,
+            team TEXT NOT NULL
+        )
+    """
+    )
+    c.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {IMPORT_TABLE_NAME} (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            team TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            imported_at REAL NOT NULL,
+            PRIMARY KEY (source, table_name)
+        )
+    """
+    )
+
+
+def _register_v1_views(c):
+    # 버전 1 에서 만든 호환 뷰 (팀 = 뷰 이름)
+    c.execute(
+        f"INSERT OR IGNORE INTO {VIEW_TABLE_NAME} (name, team) "
+        f"SELECT name, name FROM sqlite_master WHERE type = 'view' AND sql LIKE '%{ENTRY_TABLE_NAME}%'"
+    )
+
+
+def _move_team(c, old_team, new_team):
+    # old_team 의 명단과 휴가를 new_team 으로 합침 (new_team 에 이미 있는 (날짜, 근무자) 는 하나만 남김)
+    c.execute(
+        f"INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) "
+        f"SELECT ?, name FROM {ROSTER_TABLE_NAME} WHERE team = ? ORDER BY id",
+        (new_team, old_team),
+    )
+    c.execute(
+        f"""
+        UPDATE OR IGNORE {ENTRY_TABLE_NAME}
+        SET team = ?, worker = (
+            SELECT n.id FROM {ROSTER_TABLE_NAME} o JOIN {ROSTER_TABLE_NAME} n ON n.team = ? AND n.name = o.name
+            WHERE o.id = {ENTRY_TABLE_NAME}.worker
+        )
+        WHERE team = ?
+    """,
+        (new_team, new_team, old_team),
+    )
+    c.execute(f"DELETE FROM {ENTRY_TABLE_NAME} WHERE team = ?", (old_team,))
+    c.execute(f"DELETE FROM {ROSTER_TABLE_NAME} WHERE team = ?", (old_team,))
+
+
+def _migrate_table(c, table_name, team):
+    # 버전 0 테이블의 행을 새 테이블로 옮기고 {table}_v0 로 이름 변경
+    c.execute(
+        f"INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) "
+        f"SELECT ?, worker FROM {table_name} GROUP BY worker ORDER BY MIN(id)",
+        (team,),
+    )
+    c.execute(
+        f"""
+        INSERT OR IGNORE INTO {ENTRY_TABLE_NAME} (team, day, worker)
+        SELECT ?, {_sql_day("v.date")}, r.id
+        FROM {table_name} v JOIN {ROSTER_TABLE_NAME} r ON r.team = ? AND r.name = v.worker
+        WHERE {_sql_day("v.date")} IS NOT NULL
+        ORDER BY v.id
+    """,
+        (team, team),
+    )
+    c.execute(f"ALTER TABLE {table_name} RENAME TO {table_name}_v0")
+
+
+def _create_compat_view(c, table_name, team):
+    # 기존 문자열 API (SELECT date, worker FROM {table} ... / INSERT / DELETE) 를 그대로 쓸 수 있게 하는 뷰
+    team_sql = _quote(team)
+    c.execute(
+        f"""
+        CREATE VIEW {table_name} AS
+        SELECT e.id AS id, date(e.day + {JULIAN_DAY_OFFSET}) AS date, r.name AS worker
+        FROM {ENTRY_TABLE_NAME} e JOIN {ROSTER_TABLE_NAME} r ON r.id = e.worker
+        WHERE e.team = {team_sql}
+    """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER {table_name}_insert INSTEAD OF INSERT ON {table_name}
+        BEGIN
+            SELECT RAISE(ABORT, 'invalid date') WHERE {_sql_day("NEW.date")} IS NULL;
+            INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) VALUES ({team_sql}, NEW.worker);
+            INSERT OR IGNORE INTO {ENTRY_TABLE_NAME} (team, day, worker)
+            SELECT {team_sql}, {_sql_day("NEW.date")}, id FROM {ROSTER_TABLE_NAME}
+            WHERE team = {team_sql} AND name = NEW.worker;
+        END
+    """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER {table_name}_delete INSTEAD OF DELETE ON {table_name}
+        BEGIN
+            DELETE FROM {ENTRY_TABLE_NAME} WHERE id = OLD.id;
+        END
+    """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER {table_name}_update INSTEAD OF UPDATE ON {table_name}
+        BEGIN
+            SELECT RAISE(ABORT, 'invalid date') WHERE {_sql_day("NEW.date")} IS NULL;
+            INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) VALUES ({team_sql}, NEW.worker);
+            UPDATE OR IGNORE {ENTRY_TABLE_NAME}
+            SET day = {_sql_day("NEW.date")},
+                worker = (SELECT id FROM {ROSTER_TABLE_NAME} WHERE team = {team_sql} AND name = NEW.worker)
+            WHERE id = OLD.id;
+        END
+    """
+    )
+
+
+def _ensure_compat_view(c, table_name, team):
+    object_type = _object_type(c, table_name)
+    c.execute(f"SELECT team FROM {VIEW_TABLE_NAME} WHERE name = ?", (table_name,))
+    row = c.fetchone()
+    registered = row[0] if row else None
+    if object_type == "view":
+        if registered is None or registered == team:
+            return  # 이미 맞는 뷰 (등록되지 않은 뷰는 직접 만든 것이므로 건드리지 않음)
+        # 팀 이름이 바뀐 뷰: 같은 팀을 쓰는 다른 뷰가 없으면 데이터도 새 팀으로 옮김
+        c.execute(f"SELECT 1 FROM {VIEW_TABLE_NAME} WHERE team = ? AND name != ?", (registered, table_name))
+        if c.fetchone() is None:
+            _move_team(c, registered, team)
+        c.execute(f"DROP VIEW {table_name}")  # INSTEAD OF 트리거도 함께 삭제
+    elif object_type == "table":
+        _migrate_table(c, table_name, team)
+    _create_compat_view(c, table_name, team)
+    c.execute(f"INSERT OR REPLACE INTO {VIEW_TABLE_NAME} (name, team) VALUES (?, ?)", (table_name, team))
+
+
+def is_vacation_database(db_file):
+    # 이미 통합(버전 2 이상)된 DB 파일인지 읽기 전용으로 확인 (파일을 만들거나 이전하지 않음)
+    if not os.path.exists(db_file):
+        return False
+    conn = sqlite3.connect(Path(db_file).resolve().as_uri() + "?mode=ro", uri=True)
+    c = conn.cursor()
+    try:
+        c.execute("PRAGMA user_version")
+        return c.fetchone()[0] >= SCHEMA_VERSION and _object_type(c, ENTRY_TABLE_NAME) == "table"
+    except sqlite3.DatabaseError:
+        return False  # SQLite 파일이 아님
+    finally:
+        conn.close()
+
+
+def ensure_vacation_schema(db_file, views=None):
+    # 버전 확인 / 이전을 한 트랜잭션으로 처리 (여러 프로세스가 동시에 열어도 한 번만 이전)
+    # views: {호환 뷰(기존 테이블) 이름: 팀}. 기존 테이블이면 그 팀으로 옮기고 같은 이름의 뷰를 만듦
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("PRAGMA user_version")
+        version = c.fetchone()[0]
+        _create_tables(c)
+        if version == 1:
+            _register_v1_views(c)
+        for table_name, team in (views or {}).items():
+            _ensure_compat_view(c, table_name, team)
+        if version < SCHEMA_VERSION:
+            c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
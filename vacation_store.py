@@ -0,0 +1,282 @@
+import sqlite3
+import threading
+from datetime import date, datetime
+from types import MappingProxyType
+
+from vacation_import import import_vacation_file
+from vacation_schema import ENTRY_TABLE_NAME, ROSTER_TABLE_NAME, ensure_vacation_schema, from_ordinal, to_ordinal
+
+
+def day_key(day):
+    # 휴가 날짜 키는 "YYYY-MM-DD" 문자열로 통일 (date 객체, "20240901", "2024-9-1" 형식도 허용)
+    # DB 에 저장되는 서수와 항상 같은 날짜가 되도록 서수를 거쳐 만듦. 날짜가 아니면 ValueError
+    if not isinstance(day, (date, datetime)):
+        day = str(day).strip()
+        if len(day) == 8 and day.isdigit():
+            day = datetime.strptime(day, "%Y%m%d")
+    return from_ordinal(to_ordinal(day))
+
+
+class VacationDatabase:
+    # 여러 팀의 휴가가 함께 들어 있는 DB 파일 하나 (팀마다 VacationStore 를 하나씩 사용)
+    # - 스키마 확인 / 이전 / 이전 파일 가져오기는 등록된 팀을 모아 프로세스에서 한 번만
+    # - select() 로 여러 팀의 휴가를 한 번에 조회
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.views = {}  # 호환 뷰(기존 테이블) 이름 -> 팀
+        self.legacy_files = {}  # (이전 파일, 테이블) -> 팀
+        self.schema_checked = False
+        self.lock = threading.RLock()
+
+    def register(self, team, table_name=None, legacy=None):
+        # table_name: 이 파일에 있던 기존 테이블 (같은 이름의 호환 뷰로 남김)
+        # legacy: (다른 DB 파일, 테이블). 처음 스키마를 확인할 때 한 번 가져옴 (vacation_import)
+        with self.lock:
+            if table_name and self.views.get(table_name) != team:
+                self.views[table_name] = team
+                self.schema_checked = False
+            if legacy and self.legacy_files.get(tuple(legacy)) != team:
+                self.legacy_files[tuple(legacy)] = team
+                self.schema_checked = False
+
+    def ensure_schema(self):
+        with self.lock:
+            if not self.schema_checked:
+                ensure_vacation_schema(self.db_file, self.views)
+                for (source_file, table_name), team in self.legacy_files.items():
+                    import_vacation_file(self.db_file, source_file, table_name, team)
+                self.schema_checked = True
+
+    def connect(self):
+        self.ensure_schema()
+        return sqlite3.connect(self.db_file)
+
+    def teams(self):
+        conn = self.connect()
+        c = conn.cursor()
+        c.execute(f"SELECT DISTINCT team FROM {ROSTER_TABLE_NAME} ORDER BY team")
+        teams = [row[0] for row in c.fetchall()]
+        conn.close()
+        return teams
+
+    def select(self, start_date=None, end_date=None, teams=None):
+        # 기간(포함)의 팀별 휴가 {팀: {날짜: [근무자, ...]}} (teams 가 없으면 모든 팀)
+        query = (
+            f"SELECT e.team, e.day, r.name FROM {ENTRY_TABLE_NAME} e JOIN {ROSTER_TABLE_NAME} r ON r.id = e.worker "
+            "WHERE e.day BETWEEN ? AND ?"
+        )
+        params = [
+            to_ordinal(day_key(start_date)) if start_date else 1,
+            to_ordinal(day_key(end_date)) if end_date else date.max.toordinal(),
+        ]
+        if teams is not None:
+            teams = list(teams)
+            query += f" AND e.team IN ({', '.join('?' * len(teams))})"
+            params += teams
+        conn = self.connect()
+        c = conn.cursor()
+        c.execute(query + " ORDER BY e.team, e.day, e.id", params)
+        selected = {}
+        for team, day, worker in c.fetchall():
+            selected.setdefault(team, {}).setdefault(from_ordinal(day), []).append(worker)
+        conn.close()
+        return selected
+
+
+class VacationStore:
+    # 한 팀의 휴가에 대한 프로세스 공용 저장소
+    # - 처음 사용할 때 DB 에서 한 번만 읽고, 이후 변경은 DB 와 메모리에 함께 기록 (write-through)
+    # - 변경될 때마다 version 이 올라가고 구독자에게 알림
+    # - snapshot() 은 버전마다 한 번 만든 읽기 전용 dict 를 모든 세션이 함께 사용
+    # - DB 에는 날짜 서수 / 명단 번호로 저장 (vacation_schema), 밖으로는 "YYYY-MM-DD" 문자열 API 그대로
+    def __init__(self, database, team):
+        self.database = database
+        self.team = team
+        self.version = 0
+        self.days = None
+        self._snapshot = None
+        self.subscribers = []
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+
+    def ensure_schema(self):
+        # 같은 DB 파일을 쓰는 모든 팀이 함께 한 번만 확인
+        self.database.ensure_schema()
+
+    def _connect(self):
+        return self.database.connect()
+
+    def _ensure_loaded(self):
+        if self.days is not None:
+            return
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute(
+            f"SELECT e.day, r.name FROM {ENTRY_TABLE_NAME} e JOIN {ROSTER_TABLE_NAME} r ON r.id = e.worker "
+            "WHERE e.team = ? ORDER BY e.id",
+            (self.team,),
+        )
+        rows = c.fetchall()
+        conn.close()
+        self.days = {}
+        for day, worker in rows:
+            workers = self.days.setdefault(from_ordinal(day), [])
+            if worker not in workers:
+                workers.append(worker)
+
+    def _bump(self):
+        self.version += 1
+        self._snapshot = None
+        self.changed.notify_all()
+        for callback in list(self.subscribers):
+            callback(self.version)
+
+    def reload(self):
+        # 다른 프로세스가 DB 를 직접 고친 경우에만 사용
+        with self.lock:
+            self.days = None
+            self._ensure_loaded()
+            self._bump()
+
+    def snapshot(self):
+        # {날짜: (근무자, ...)} 읽기 전용. 같은 버전이면 같은 객체를 돌려줍니다.
+        with self.lock:
+            self._ensure_loaded()
+            if self._snapshot is None:
+                self._snapshot = MappingProxyType({day: tuple(workers) for day, workers in self.days.items()})
+            return self._snapshot
+
+    def select(self, start_date=None, end_date=None, workers=None):
+        # 기간(포함)과 근무자로 거른 {날짜: [근무자, ...]} (호출한 쪽에서 고쳐도 되는 새 dict)
+        start = day_key(start_date) if start_date else None
+        end = day_key(end_date) if end_date else None
+        workers = None if workers is None else set(workers)
+        selected = {}
+        for day, day_workers in self.snapshot().items():
+            if (start and day < start) or (end and day > end):
+                continue
+            members = [worker for worker in day_workers if workers is None or worker in workers]
+            if members:
+                selected[day] = members
+        return selected
+
+    def add_many(self, pairs):
+        # (날짜, 근무자) 목록을 한 번에 저장하고 새로 추가된 개수를 돌려줍니다.
+        with self.lock:
+            self._ensure_loaded()
+            added = []
+            for day, worker in pairs:
+                day = day_key(day)  # 날짜 형식이 아니면 ValueError
+                if worker not in self.days.get(day, []) and (day, worker) not in added:
+                    added.append((day, worker))
+            if not added:
+                return 0
+            # DB 에 먼저 기록하고 성공하면 메모리에 반영
+            conn = self._connect()
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {ROSTER_TABLE_NAME} (team, name) VALUES (?, ?)",
+                [(self.team, worker) for worker in dict.fromkeys(worker for _, worker in added)],
+            )
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {ENTRY_TABLE_NAME} (team, day, worker) "
+                f"SELECT ?, ?, id FROM {ROSTER_TABLE_NAME} WHERE team = ? AND name = ?",
+                [(self.team, to_ordinal(day), self.team, worker) for day, worker in added],
+            )
+            conn.commit()
+            conn.close()
+            for day, worker in added:
+                self.days.setdefault(day, []).append(worker)
+            self._bump()
+            return len(added)
+
+    def add(self, day, worker):
+        return self.add_many([(day, worker)]) > 0
+
+    def remove(self, day, worker):
+        day = day_key(day)
+        with self.lock:
+            self._ensure_loaded()
+            conn = self._connect()
+            conn.execute(
+                f"DELETE FROM {ENTRY_TABLE_NAME} WHERE team = ? AND day = ? "
+                f"AND worker = (SELECT id FROM {ROSTER_TABLE_NAME} WHERE team = ? AND name = ?)",
+                (self.team, to_ordinal(day), self.team, worker),
+            )
+            conn.commit()
+            conn.close()
+            if worker in self.days.get(day, []):
+                self.days[day].remove(worker)
+                if not self.days[day]:
+                    del self.days[day]
+                self._bump()
+
+    def remove_range(self, start_date, end_date):
+        # 기간(포함) 안의 휴가를 모두 지우고 지운 개수를 돌려줍니다.
+        start, end = day_key(start_date), day_key(end_date)
+        with self.lock:
+            self._ensure_loaded()
+            conn = self._connect()
+            c = conn.cursor()
+            c.execute(
+                f"DELETE FROM {ENTRY_TABLE_NAME} WHERE team = ? AND day BETWEEN ? AND ?",
+                (self.team, to_ordinal(start), to_ordinal(end)),
+            )
+            deleted_count = c.rowcount
+            conn.commit()
+            conn.close()
+            for day in [day for day in self.days if start <= day <= end]:
+                del self.days[day]
+            if deleted_count:
+                self._bump()
+            return deleted_count
+
+    def clear(self):
+        with self.lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {ENTRY_TABLE_NAME} WHERE team = ?", (self.team,))
+            conn.commit()
+            conn.close()
+            self.days = {}
+            self._bump()
+
+    def subscribe(self, callback):
+        # callback(version) 을 변경마다 호출. 구독 해제 함수를 돌려줍니다.
+        with self.lock:
+            self.subscribers.append(callback)
+
+        def unsubscribe():
+            with self.lock:
+                if callback in self.subscribers:
+                    self.subscribers.remove(callback)
+
+        return unsubscribe
+
+    def wait_for_change(self, version, timeout=None):
+        # version 이후 변경이 생기거나 timeout 이 지나면 현재 version 을 돌려줍니다.
+        with self.lock:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+_databases = {}
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vacation_database(db_file):
+    # DB 파일마다 프로세스 전체에서 하나만 사용
+    with _stores_lock:
+        if db_file not in _databases:
+            _databases[db_file] = VacationDatabase(db_file)
+        return _databases[db_file]
+
+
+def get_vacation_store(db_file, team, table_name=None, legacy=None):
+    # (DB 파일, 팀) 마다 프로세스 전체에서 하나만 사용 (Streamlit 세션들과 Flask 스레드가 공유)
+    database = get_vacation_database(db_file)
+    database.register(team, table_name, legacy)
+    with _stores_lock:
+        key = (db_file, team)
+        if key not in _stores:
+            _stores[key] = VacationStore(database, team)
+        return _stores[key]
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+import holidays
+
+# 한국의 공휴일 정보를 가져옵니다.
+kr_holidays = holidays.KR()
+
+
+class WorkCalendar:
+    # 기간 내 날짜와 근무일을 한 번만 계산해 여러 팀·여러 스케줄러가 읽기 전용으로 공유합니다.
+    # - workdays: 월~토 중 선택된 휴일을 제외한 날 (청소 스케줄, 팀장 업무 배치 기준)
+    # - shift_workdays: workdays 중 공휴일도 제외한 날 (환경팀 근무 기준)
+    def __init__(self, start_date, end_date, selected_holidays=()):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.selected_holidays = frozenset(selected_holidays)
+
+        num_days = (end_date - start_date).days + 1
+        self.dates = tuple(start_date + timedelta(days=i) for i in range(num_days))
+        self.workdays = tuple(d for d in self.dates if d.weekday() < 6 and d not in self.selected_holidays)
+        self.kr_holidays = frozenset(d for d in self.dates if d in kr_holidays)
+        self.shift_workdays = tuple(d for d in self.workdays if d not in self.kr_holidays)
+
+    def cleaning_schedule(self, workers):
+        # app.generate_schedule 와 같은 형태: {근무일: [근무자, ...]}
+        return {day: list(workers) for day in self.workdays}
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from vacation_grid import vacation_rows
+
+# 근무일/근무 가능일 통계를 날짜 루프 없이 numpy 영업일 함수로 계산
+# 근무일: 월~토 중 선택된 휴일을 제외한 날 (opt_job_schedule.is_workday 와 같은 기준)
+WEEKMASK = "1111110"
+
+
+def _holiday_array(selected_holidays):
+    return np.array(sorted(selected_holidays), dtype="datetime64[D]")
+
+
+def workday_array(start_date, end_date, selected_holidays=()):
+    # 기간(포함) 안의 근무일 (datetime64[D] 배열, .astype(object) 하면 date 목록)
+    days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+    return days[np.is_busday(days, weekmask=WEEKMASK, holidays=_holiday_array(selected_holidays))]
+
+
+def availability_matrix(members, days, vacation_data):
+    # (근무자 × days) bool 행렬, True = 근무 가능 (휴가 아님). days 는 정렬된 날짜 배열
+    days = np.asarray(days, dtype="datetime64[D]")
+    names = pd.Index(members).unique()
+    on_vacation = np.zeros((len(names), len(days)), dtype=bool)
+    dates, workers = vacation_rows(vacation_data)
+    if len(dates) and len(days):
+        vacation_days = dates.astype("datetime64[D]")
+        cols = np.searchsorted(days, vacation_days).clip(max=len(days) - 1)
+        rows = names.get_indexer(workers)
+        valid = (days[cols] == vacation_days) & (rows >= 0)
+        on_vacation[rows[valid], cols[valid]] = True
+    # 같은 이름이 목록에 여러 번 있어도 members 순서대로 행을 돌려줌
+    return ~on_vacation[names.get_indexer(members)]
+
+
+def available_day_counts(members, workdays, vacation_data):
+    # 근무자별 근무 가능일 수 (int 배열)
+    return availability_matrix(members, workdays, vacation_data).sum(axis=1)
+
+
+def member_work_stats(start_date, end_date, members, vacation_data, selected_holidays=(), task_count=3):
+    # 근무자별 근무일 수, 업무별 목표 (근무일 / 업무 수), 팀 전체 대비 비율
+    holiday_days = _holiday_array(selected_holidays)
+    total_workdays = np.busday_count(
+        np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1, weekmask=WEEKMASK, holidays=holiday_days
+    )
+    days = workday_array(start_date, end_date, selected_holidays)
+    working_days = total_workdays - (~availability_matrix(members, days, vacation_data)).sum(axis=1)
+    team_total = working_days.sum()
+    return pd.DataFrame(
+        {
+            "working_days": working_days,
+            "target_per_task": working_days / task_count,
+            "ratio": working_days / team_total if team_total else np.zeros(len(members)),
+        },
+        index=list(members),
+    )
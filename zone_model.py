@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+
+
+class Zone:
+    # 청소 구역 하나의 설정
+    # - capacity: {최소 인원수: 배정 인원} 형태의 계단식 규칙 (예: {1: 1, 4: 2} → 1~3명일 때 1명, 4명 이상 2명)
+    #             None 이면 다른 구역에 배정하고 남은 인원을 모두 받는 구역
+    # - weight: 공평성 계산 시 이 구역 1회 청소의 가중치
+    def __init__(self, name, capacity=None, weight=1, label=None):
+        self.name = name
+        self.capacity = None if capacity is None else {int(k): int(v) for k, v in capacity.items()}
+        self.weight = weight
+        self.label = label or f"{name}구역"
+
+    @property
+    def is_remainder(self):
+        return self.capacity is None
+
+    def capacity_for(self, headcount):
+        count = 0
+        for threshold in sorted(self.capacity):
+            if headcount >= threshold:
+                count = self.capacity[threshold]
+        return count
+
+
+class ZoneConfig:
+    def __init__(self, zones):
+        self.zones = list(zones)
+        if sum(zone.is_remainder for zone in self.zones) != 1:
+            raise ValueError("남은 인원을 받는 구역(capacity 없음)이 정확히 하나 있어야 합니다.")
+        self.names = [zone.name for zone in self.zones]
+        self.weights = np.array([zone.weight for zone in self.zones], dtype=np.float64)
+        self.remainder_index = next(i for i, zone in enumerate(self.zones) if zone.is_remainder)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def to_dict(self):
+        # load_zone_config / zone_config_from_dict 와 같은 형식 (작업 입력, 캐시 키 등에 사용)
+        return {
+            "zones": [
+                {"name": zone.name, "capacity": zone.capacity, "weight": zone.weight, "label": zone.label}
+                for zone in self.zones
+            ]
+        }
+
+    def compile_capacity(self, max_headcount):
+        # table[인원수, 구역] -> 배정 인원. 고정 구역을 설정 순서대로 채우고 나머지는 remainder 구역에 배정
+        table = np.zeros((max_headcount + 1, len(self.zones)), dtype=np.int64)
+        for headcount in range(max_headcount + 1):
+            remaining = headcount
+            for i, zone in enumerate(self.zones):
+                if zone.is_remainder:
+                    continue
+                count = min(zone.capacity_for(headcount), remaining)
+                table[headcount, i] = count
+                remaining -= count
+            table[headcount, self.remainder_index] = remaining
+        return table
+
+    def daily_capacity(self, headcounts):
+        # 날짜별 인원수 배열 -> (날짜 수, 구역 수) 배정 인원 배열
+        headcounts = np.asarray(headcounts, dtype=np.int64)
+        max_headcount = int(headcounts.max()) if len(headcounts) else 0
+        return self.compile_capacity(max_headcount)[headcounts]
+
+
+# 기존 A/B 2구역 규칙: B 구역은 3명 이하일 때 1명, 4명 이상일 때 2명, 나머지는 A 구역
+DEFAULT_ZONE_CONFIG = ZoneConfig(
+    [
+        Zone("A", label="1구역(A)"),
+        Zone("B", capacity={1: 1, 4: 2}, label="2구역(B)"),
+    ]
+)
+
+
+def load_zone_config(path=None, default=DEFAULT_ZONE_CONFIG):
+    # 설정 파일(JSON)에서 구역 목록을 읽어옵니다.
+    # 예: {"zones": [{"name": "A", "label": "1구역(A)"}, {"name": "B", "capacity": {"1": 1, "4": 2}, "weight": 1}]}
+    if path is None or not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return zone_config_from_dict(json.load(f))
+
+
+def zone_config_from_dict(config):
+    return ZoneConfig(
+        Zone(
+            zone["name"],
+            capacity=zone.get("capacity"),
+            weight=zone.get("weight", 1),
+            label=zone.get("label"),
+        )
+        for zone in config["zones"]
+    )